@@ -0,0 +1,211 @@
+"""
+バッチ実行モジュール
+設定ファイル（JSON）の読み込みと、完了したステージの出力を保存して
+再実行時に続きから再開するためのチェックポイントを提供する
+"""
+
+from datetime import datetime
+from typing import Callable, Dict, Optional
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+# チェックポイントのマニフェストファイル名
+CHECKPOINT_MANIFEST = 'checkpoint.json'
+
+
+def load_batch_config(
+    defaults: Dict,
+    config_path: Optional[str] = None,
+    overrides: Optional[Dict] = None
+) -> Dict:
+    """
+    既定値 → 設定ファイル → コマンドライン引数 の順に設定を重ねる
+    
+    Args:
+        defaults: 設定項目と既定値（ここにない項目は設定ファイルで指定できない）
+        config_path: JSON形式の設定ファイルのパス
+        overrides: コマンドライン引数など（値がNoneの項目は無視する）
+    """
+    config = dict(defaults)
+    if config_path:
+        with open(config_path, encoding='utf-8') as f:
+            values = json.load(f)
+        unknown = sorted(set(values) - set(defaults))
+        if unknown:
+            raise ValueError(f"設定ファイルに不明な項目があります: {', '.join(unknown)}")
+        config.update(values)
+    for key, value in (overrides or {}).items():
+        if key in defaults and value is not None:
+            config[key] = value
+    return config
+
+
+def file_signature(path: Optional[str]) -> Optional[str]:
+    """
+    入力ファイルのパス・サイズ・更新時刻からなる識別子（ファイルがなければNone）
+    
+    ディレクトリの場合は中のファイルすべてを対象にする
+    """
+    if not path or not Path(path).exists():
+        return None
+    target = Path(path).resolve()
+    files = sorted(target.rglob('*')) if target.is_dir() else [target]
+    parts = [
+        f"{file}:{file.stat().st_size}:{file.stat().st_mtime_ns}"
+        for file in files if file.is_file()
+    ]
+    return hashlib.sha1('\n'.join(parts).encode()).hexdigest()
+
+
+def stage_key(*parts) -> str:
+    """
+    ステージの入力（前のステージのキー・入力ファイル・設定）から決まるキー
+    
+    前のステージのキーを含めることで、上流が変わると後続のステージもすべて無効になる
+    """
+    payload = json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+
+def _restore_list_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Parquetから読むと配列になるリスト列（スキルのリストなど）をlistに戻す
+    """
+    for column in df.columns:
+        if df[column].dtype != object:
+            continue
+        values = df[column].dropna()
+        if len(values) and isinstance(values.iloc[0], np.ndarray):
+            df[column] = df[column].map(lambda value: value.tolist() if isinstance(value, np.ndarray) else value)
+    return df
+
+
+class StageCheckpoint:
+    """完了したステージの出力を保存・復元するクラス"""
+    
+    def __init__(self, directory: Optional[str], resume: bool = True):
+        """
+        初期化
+        
+        Args:
+            directory: チェックポイントの保存先（Noneの場合は何も保存しない）
+            resume: Falseの場合、保存済みのチェックポイントを使わずに最初から実行する
+        """
+        self.directory = Path(directory) if directory else None
+        self.stages: Dict[str, Dict] = {}
+        if self.directory is not None and resume:
+            manifest = self.directory / CHECKPOINT_MANIFEST
+            if manifest.exists():
+                with open(manifest, encoding='utf-8') as f:
+                    self.stages = json.load(f)['stages']
+    
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None
+    
+    def is_complete(self, stage: str, key: str) -> bool:
+        """
+        同じキーで完了したステージのチェックポイントがあるか
+        """
+        record = self.stages.get(stage)
+        return record is not None and record['key'] == key
+    
+    def frame_path(self, stage: str, name: str) -> Path:
+        """
+        ステージで保存したDataFrameのパス
+        """
+        return self.directory / stage / f'{name}.parquet'
+    
+    def file_path(self, stage: str, name: str) -> Path:
+        """
+        ステージで保存したDataFrame以外のファイル（語彙など）のパス
+        """
+        return self.directory / stage / name
+    
+    def load_frame(self, stage: str, name: str) -> pd.DataFrame:
+        """
+        保存済みのDataFrameを読み込む
+        """
+        df = pd.read_parquet(self.frame_path(stage, name), memory_map=True)
+        return _restore_list_columns(df)
+    
+    def has_frame(self, stage: str, name: str) -> bool:
+        """
+        ステージでDataFrameを保存したか
+        """
+        return name in self.stages[stage]['frames']
+    
+    def data(self, stage: str) -> Dict:
+        """
+        ステージの完了時に記録した値（件数など）
+        """
+        return self.stages[stage].get('data', {})
+    
+    def save(
+        self,
+        stage: str,
+        key: str,
+        frames: Optional[Dict[str, Optional[pd.DataFrame]]] = None,
+        data: Optional[Dict] = None,
+        files: Optional[Dict[str, Callable[[str], None]]] = None
+    ):
+        """
+        ステージの出力を保存し、マニフェストに完了を記録
+        
+        出力を一時ディレクトリに書き終えてから置き換えるため、途中で失敗しても
+        壊れたチェックポイントは残らない
+        
+        Args:
+            frames: 保存するDataFrame（Noneの値は保存しない）
+            data: JSONで記録する値
+            files: DataFrame以外の出力（ファイル名 → 指定したパスに書き込む関数）
+        """
+        if not self.enabled:
+            return
+        staging = self.directory / f'.{stage}.tmp'
+        if staging.exists():
+            shutil.rmtree(staging)
+        staging.mkdir(parents=True)
+        names = []
+        for name, df in (frames or {}).items():
+            if df is not None:
+                df.to_parquet(staging / f'{name}.parquet', index=False)
+                names.append(name)
+        for name, write in (files or {}).items():
+            write(str(staging / name))
+        
+        # 置き換えの途中で失敗した場合に古い記録が残らないよう、先に完了の記録を消す
+        if self.stages.pop(stage, None) is not None:
+            self._write_manifest()
+        target = self.directory / stage
+        if target.exists():
+            shutil.rmtree(target)
+        os.replace(staging, target)
+        
+        self.stages[stage] = {
+            'key': key,
+            'frames': names,
+            'files': list(files or {}),
+            'data': data or {},
+            'completed_at': datetime.now().isoformat(timespec='seconds'),
+        }
+        self._write_manifest()
+        print(f"   💾 Checkpoint saved: {stage}")
+    
+    def _write_manifest(self):
+        """
+        マニフェストを一時ファイル経由で置き換える
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        manifest = self.directory / CHECKPOINT_MANIFEST
+        temporary = manifest.with_suffix('.json.tmp')
+        with open(temporary, 'w', encoding='utf-8') as f:
+            json.dump({'stages': self.stages}, f, indent=2, ensure_ascii=False)
+        os.replace(temporary, manifest)
@@ -0,0 +1,559 @@
+#!/usr/bin/env python3
+"""
+ベンチマークスクリプト
+合成データを使って、データ統合処理の実行時間を計測する
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from pipeline_metrics import PipelineMetrics
+
+
+SKILLS = [
+    'Python', 'SQL', 'Java', 'JavaScript', 'CSS', 'AI', 'Data Science',
+    'Machine Learning', 'React', 'C++', 'Go', 'TensorFlow', 'Docker',
+    'AWS', 'Kubernetes', 'HTML', 'TypeScript', 'Rust', 'Scala', 'Spark'
+]
+
+# スイート用の合成データで使うスキル（先頭ほど出現頻度が高い）
+SUITE_SKILLS = SKILLS + [
+    'Excel', 'Tableau', 'Power BI', 'R', 'Statistics', 'Deep Learning', 'PyTorch',
+    'NLP', 'Computer Vision', 'Node.js', 'Angular', 'Vue', 'PostgreSQL', 'MongoDB',
+    'Redis', 'Kafka', 'Airflow', 'Hadoop', 'Azure', 'GCP', 'Linux', 'Git',
+    'Terraform', 'CI/CD', 'Swift', 'Kotlin', 'PHP', 'Ruby', 'C#', '.NET',
+    'Figma', 'Agile', 'Communication', 'Project Management', 'Snowflake', 'dbt',
+    'Looker', 'Pandas', 'NumPy', 'Scikit-learn',
+]
+
+# 職種名と給与の中央値（USD）
+JOB_TITLES = {
+    'Data Scientist': 120000,
+    'Data Engineer': 115000,
+    'Data Analyst': 80000,
+    'Machine Learning Engineer': 140000,
+    'Software Engineer': 125000,
+    'Frontend Developer': 100000,
+    'Backend Developer': 110000,
+    'DevOps Engineer': 120000,
+    'Product Manager': 130000,
+    'Research Scientist': 145000,
+}
+
+# LinkedIn側の職種名の表記ゆれ（給与データとの曖昧一致の負荷を再現する）
+TITLE_PREFIXES = ['', '', '', 'Senior ', 'Sr. ', 'Lead ', 'Junior ', 'Principal ']
+
+# --rowsの省略表記
+SCALE_SUFFIXES = {'k': 1000, 'm': 1000000}
+
+
+def load_script_module(filename: str, module_name: str):
+    """
+    ハイフン付きのスクリプトファイルをモジュールとして読み込む
+    """
+    spec = importlib.util.spec_from_file_location(
+        module_name, Path(__file__).with_name(filename)
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def parse_scale(value: str) -> int:
+    """
+    "10k"や"1m"のような行数の表記を整数に変換
+    """
+    value = value.strip().lower()
+    if value and value[-1] in SCALE_SUFFIXES:
+        return int(float(value[:-1]) * SCALE_SUFFIXES[value[-1]])
+    return int(value)
+
+
+def zipf_weights(count: int, exponent: float = 1.1) -> np.ndarray:
+    """
+    順位のべき乗に反比例する出現確率（少数のスキルに人気が集中する分布）
+    """
+    weights = 1 / np.arange(1, count + 1) ** exponent
+    return weights / weights.sum()
+
+
+def random_skill_strings(
+    rng: np.random.Generator,
+    count: int,
+    min_size: int = 2,
+    max_size: int = 7,
+    exponent: float = 1.1,
+    block_size: int = 100000
+) -> np.ndarray:
+    """
+    Zipf分布に従うスキルを重複なしに選び、カンマ区切りの文字列の配列を作成
+    """
+    log_weights = np.log(zipf_weights(len(SUITE_SKILLS), exponent))
+    sizes = rng.integers(min_size, max_size + 1, size=count)
+    skills = np.array(SUITE_SKILLS, dtype=object)
+    result = np.empty(count, dtype=object)
+    # Gumbel-topkで重み付きの非復元抽出をまとめて行う（メモリを抑えるためブロックごと）
+    for start in range(0, count, block_size):
+        end = min(start + block_size, count)
+        keys = log_weights[None, :] - np.log(-np.log(rng.random((end - start, len(SUITE_SKILLS)))))
+        order = np.argsort(-keys, axis=1)
+        result[start:end] = [
+            ', '.join(skills[row[:size]]) for row, size in zip(order, sizes[start:end])
+        ]
+    return result
+
+
+def make_benchmark_datasets(num_rows: int, seed: int = 0) -> Dict[str, pd.DataFrame]:
+    """
+    Job Recommendation・LinkedIn・Salaryの3つの合成データセットを作成
+    
+    Job Recommendationの行数をnum_rowsとし、ユーザー数は1/20、
+    ユニークな求人数は1/10、LinkedInの求人数は1/5、給与データは1/50の規模にする
+    """
+    rng = np.random.default_rng(seed)
+    num_users = max(1, num_rows // 20)
+    num_jobs = max(1, num_rows // 10)
+    num_postings = max(1, num_rows // 5)
+    num_salaries = max(len(JOB_TITLES), num_rows // 50)
+    
+    user_skills = random_skill_strings(rng, num_users, 1, 8)
+    job_requirements = random_skill_strings(rng, num_jobs)
+    user_ids = rng.integers(1, num_users + 1, size=num_rows)
+    # 人気の求人ほど多くのユーザーに表示される
+    job_ids = np.minimum(rng.zipf(1.3, size=num_rows), num_jobs)
+    match_scores = rng.random(num_rows).round(2)
+    jobs = pd.DataFrame({
+        'User_ID': user_ids,
+        'User_Skills': user_skills[user_ids - 1],
+        'Job_ID': job_ids,
+        'Job_Requirements': job_requirements[job_ids - 1],
+        'Match_Score': match_scores,
+        'Recommended': (match_scores > 0.8).astype(int),
+    })
+    
+    titles = np.array(list(JOB_TITLES), dtype=object)
+    prefixes = np.array(TITLE_PREFIXES, dtype=object)
+    posting_titles = (
+        prefixes[rng.integers(0, len(prefixes), size=num_postings)]
+        + titles[rng.integers(0, len(titles), size=num_postings)]
+    )
+    linkedin = pd.DataFrame({
+        'job_id': np.arange(100000, 100000 + num_postings),
+        'job_title': posting_titles,
+        'company_name': [f'Company {i}' for i in rng.integers(0, max(1, num_postings // 20), size=num_postings)],
+        'location': rng.choice(['Tokyo', 'Osaka', 'Remote', 'Kyoto', 'Fukuoka'], size=num_postings),
+        'job_requirements': random_skill_strings(rng, num_postings),
+    })
+    
+    salary_titles = titles[rng.integers(0, len(titles), size=num_salaries)]
+    medians = np.array([JOB_TITLES[title] for title in salary_titles])
+    salary = pd.DataFrame({
+        'work_year': rng.integers(2020, 2025, size=num_salaries),
+        'experience_level': rng.choice(['EN', 'MI', 'SE', 'EX'], size=num_salaries),
+        'job_title': salary_titles,
+        'salary_in_usd': (medians * rng.lognormal(0, 0.25, size=num_salaries)).round(),
+    })
+    
+    return {'jobs': jobs, 'linkedin': linkedin, 'salary': salary}
+
+
+def make_synthetic_datasets(num_jobs: int, num_postings: int, seed: int = 0):
+    """
+    Job RecommendationとLinkedInの合成データを作成
+    """
+    rng = np.random.default_rng(seed)
+    
+    def random_requirements(count: int) -> List[str]:
+        sizes = rng.integers(2, 7, size=count)
+        return [', '.join(rng.choice(SKILLS, size=size, replace=False)) for size in sizes]
+    
+    job_df = pd.DataFrame({
+        'User_ID': rng.integers(1, max(2, num_jobs // 10), size=num_jobs),
+        'Job_ID': np.arange(num_jobs),
+        'Job_Requirements': random_requirements(num_jobs),
+    })
+    linkedin_df = pd.DataFrame({
+        'job_id': np.arange(100000, 100000 + num_postings),
+        'job_title': [f'Job {i}' for i in range(num_postings)],
+        'job_requirements': random_requirements(num_postings),
+    })
+    return job_df, linkedin_df
+
+
+def make_job_dataset(num_users: int, jobs_per_user: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Job Recommendation Dataset形式（ユーザー×求人の行）の合成データを作成
+    """
+    rng = np.random.default_rng(seed)
+    num_rows = num_users * jobs_per_user
+    
+    def random_requirements(count: int) -> List[str]:
+        sizes = rng.integers(2, 7, size=count)
+        return [', '.join(rng.choice(SKILLS, size=size, replace=False)) for size in sizes]
+    
+    num_jobs = max(jobs_per_user, num_users // 2)
+    job_requirements = np.array(random_requirements(num_jobs), dtype=object)
+    user_skills = np.array(random_requirements(num_users), dtype=object)
+    user_ids = np.repeat(np.arange(1, num_users + 1), jobs_per_user)
+    job_ids = rng.integers(1, num_jobs + 1, size=num_rows)
+    match_scores = rng.random(num_rows).round(2)
+    
+    return pd.DataFrame({
+        'User_ID': user_ids,
+        'User_Skills': user_skills[user_ids - 1],
+        'Job_ID': job_ids,
+        'Job_Requirements': job_requirements[job_ids - 1],
+        'Match_Score': match_scores,
+        'Recommended': (match_scores > 0.8).astype(int),
+    })
+
+
+def bench_log_generation(num_users: int, jobs_per_user: int) -> List[Dict]:
+    """
+    generate_realistic_logsの従来方式とベクトル化方式を比較
+    """
+    logs = load_script_module('generate-user-logs.py', 'generate_user_logs')
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        csv_path = Path(tmpdir) / 'jobs.csv'
+        make_job_dataset(num_users, jobs_per_user).to_csv(csv_path, index=False)
+        generator = logs.UserInteractionLogGenerator(str(csv_path))
+    
+    results = []
+    baseline = None
+    for method in ['loop', 'vectorized']:
+        np.random.seed(0)
+        start = time.perf_counter()
+        logs_df = generator.generate_realistic_logs(seed=0, method=method)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        
+        # 統計的に同等であることを確認するための指標
+        results.append({
+            'method': method,
+            'seconds': round(elapsed, 4),
+            'speedup': round(baseline / elapsed, 2),
+            'logs': len(logs_df),
+            'like_rate': round(float((logs_df['action'] == 'like').mean()), 4),
+            'mean_match_score': round(float(logs_df['match_score'].mean()), 4),
+            'mean_swipe_duration_ms': round(float(logs_df['swipe_duration_ms'].mean()), 1),
+        })
+    return results
+
+
+def bench_matching_workers(
+    num_jobs: int,
+    num_postings: int,
+    worker_counts: List[int],
+    tolerance: float = 0.7
+) -> List[Dict]:
+    """
+    match_jobs_by_skillsの並列実行をワーカー数ごとに計測
+    
+    シグネチャにまとめるとその場で構築したインデックスを使うため、dedupe=Falseで
+    読み込み済みのLinkedIn Datasetのインデックスに対する行ごとのマッチングを計測する
+    """
+    integrate = load_script_module('integrate-datasets.py', 'integrate_datasets')
+    job_df, linkedin_df = make_synthetic_datasets(num_jobs, num_postings)
+    
+    integrator = integrate.DatasetIntegrator()
+    integrator.job_recommendation_df = job_df
+    integrator.linkedin_jobs_df = linkedin_df
+    # インデックス構築は計測対象から外す
+    integrator.build_linkedin_skill_index()
+    
+    results = []
+    baseline = None
+    reference = None
+    for workers in worker_counts:
+        start = time.perf_counter()
+        mapping = integrator.match_jobs_by_skills(tolerance=tolerance, workers=workers, dedupe=False)
+        elapsed = time.perf_counter() - start
+        
+        if reference is None:
+            reference = mapping
+            baseline = elapsed
+        elif mapping != reference:
+            raise AssertionError(f"workers={workers} の結果が一致しません")
+        
+        results.append({
+            'workers': workers,
+            'seconds': round(elapsed, 4),
+            'speedup': round(baseline / elapsed, 2),
+            'matched_jobs': len(mapping),
+        })
+    return results
+
+
+def output_bytes(path: Path) -> int:
+    """
+    出力ファイル（ディレクトリの場合は中のファイルすべて）の合計サイズ
+    """
+    files = path.rglob('*') if path.is_dir() else [path]
+    return sum(file.stat().st_size for file in files if file.is_file())
+
+
+def environment_info() -> Dict:
+    """
+    比較のために実行環境とコミットを記録
+    """
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=Path(__file__).parent, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def bench_suite(
+    num_rows: int,
+    seed: int = 0,
+    matching_methods: Optional[List[str]] = None,
+    workers: int = 1,
+    log_users_per_block: int = 10000
+) -> Dict:
+    """
+    合成データで主要な処理を順に実行し、ステージごとの計測結果を返す
+    
+    - 読み込み（CSV）
+    - match_jobs_by_skills（方式ごと）
+    - integrate_datasets
+    - 保存（CSV / Parquet / パーティション分割Parquet）
+    - generate_realistic_logs とシャードへの書き出し
+    """
+    integrate = load_script_module('integrate-datasets.py', 'integrate_datasets')
+    logs = load_script_module('generate-user-logs.py', 'generate_user_logs')
+    matching_methods = matching_methods or ['index', 'bitset', 'matrix']
+    metrics = PipelineMetrics(verbose=True, track_rss=True)
+    
+    print(f"\n🔨 Synthesizing datasets ({num_rows:,} rows, seed={seed})...")
+    datasets = make_benchmark_datasets(num_rows, seed)
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        workdir = Path(tmpdir)
+        paths = {}
+        for name, df in datasets.items():
+            paths[name] = workdir / f'{name}.csv'
+            df.to_csv(paths[name], index=False)
+        del datasets
+        
+        integrator = integrate.DatasetIntegrator(metrics=metrics)
+        with metrics.stage('load'):
+            integrator.load_job_recommendation(str(paths['jobs']))
+            integrator.load_linkedin_jobs(str(paths['linkedin']))
+            integrator.load_salary_data(str(paths['salary']))
+        
+        for method in matching_methods:
+            with metrics.stage(f'match_{method}'):
+                integrator.match_jobs_by_skills(method=method, top_k=1, workers=workers if method == 'index' else 1)
+        
+        with metrics.stage('integrate'):
+            integrator.integrate_datasets(workers=workers)
+        
+        for format, filename in [
+            ('csv', 'integrated.csv'),
+            ('parquet', 'integrated.parquet'),
+            ('parquet_partitioned', 'integrated_partitioned'),
+        ]:
+            with metrics.stage(f'save_{format}') as record:
+                integrator.save_integrated_dataset(str(workdir / filename), format=format)
+                record['output_bytes'] = output_bytes(workdir / filename)
+        
+        # スター形式（求人の次元表と細いファクト表）
+        integrator.integrated_df = None
+        with metrics.stage('integrate_star'):
+            integrator.integrate_star_schema(workers=workers)
+        with metrics.stage('save_star') as record:
+            integrator.save_integrated_dataset(str(workdir / 'integrated_star'), format='star')
+            record['output_bytes'] = output_bytes(workdir / 'integrated_star')
+        del integrator
+        
+        with metrics.stage('logs'):
+            generator = logs.UserInteractionLogGenerator(str(paths['jobs']), metrics=metrics)
+            generator.generate_realistic_logs(
+                seed=seed, workers=workers, users_per_block=log_users_per_block,
+                base_date=datetime(2025, 1, 1)
+            )
+        with metrics.stage('log_shards'):
+            generator.write_log_shards(
+                generator.iter_realistic_log_batches(
+                    seed=seed, workers=workers, users_per_block=log_users_per_block,
+                    base_date=datetime(2025, 1, 1)
+                ),
+                str(workdir / 'log_shards'),
+                format='parquet'
+            )
+    
+    metrics.print_summary()
+    return {
+        'benchmark': 'suite',
+        'rows': num_rows,
+        'seed': seed,
+        'workers': workers,
+        'environment': environment_info(),
+        **metrics.to_dict(),
+    }
+
+
+def stage_records(stages: List[Dict]) -> Dict[Tuple[str, int], Dict]:
+    """
+    ステージの計測結果を (ステージ名, 何回目の実行か) をキーにした辞書にする
+    """
+    records = {}
+    occurrences: Dict[str, int] = {}
+    for record in stages:
+        occurrences[record['stage']] = occurrences.get(record['stage'], 0) + 1
+        records[(record['stage'], occurrences[record['stage']])] = record
+    return records
+
+
+def compare_results(baseline_path: str, current_path: str, threshold: float = 0.1) -> List[Dict]:
+    """
+    2つのスイートの結果をステージごとに比較し、経過時間の比を表示
+    
+    同じ名前のステージが複数回記録されている場合（入れ子のステージが繰り返し実行された場合など）は、
+    それぞれ何回目の実行かで対応させる（2回目以降は "stage #2" のように表示する）
+    
+    Args:
+        threshold: この割合より遅くなったステージを回帰として表示する
+    """
+    runs = []
+    for path in [baseline_path, current_path]:
+        with open(path, encoding='utf-8') as f:
+            result = json.load(f)
+        # suite以外のベンチマークも含む出力の場合はsuiteの結果を使う
+        runs.append(stage_records(result.get('suite', result)['stages']))
+    baseline, current = runs
+    
+    print(f"\n📊 {baseline_path} → {current_path}")
+    print(f"   {'stage':<40} {'before(s)':>10} {'after(s)':>10} {'ratio':>8}")
+    rows = []
+    for key in list(baseline) + [key for key in current if key not in baseline]:
+        stage, occurrence = key
+        if occurrence > 1:
+            stage = f'{stage} #{occurrence}'
+        before = baseline.get(key, {}).get('wall_seconds')
+        after = current.get(key, {}).get('wall_seconds')
+        ratio = after / before if before and after is not None else None
+        rows.append({'stage': stage, 'before': before, 'after': after, 'ratio': ratio})
+        
+        marker = ''
+        if ratio is not None and ratio > 1 + threshold:
+            marker = ' ⚠️'
+        elif ratio is not None and ratio < 1 - threshold:
+            marker = ' 🚀'
+        print(
+            f"   {stage:<40} {(f'{before:.3f}' if before is not None else '-'):>10}"
+            f" {(f'{after:.3f}' if after is not None else '-'):>10}"
+            f" {(f'{ratio:.2f}x' if ratio is not None else '-'):>8}{marker}"
+        )
+    return rows
+
+
+def main():
+    """
+    メイン実行関数
+    """
+    parser = argparse.ArgumentParser(description='データ統合処理のベンチマーク')
+    parser.add_argument('--jobs', type=int, default=20000, help='ユニークなJob_IDの数')
+    parser.add_argument('--postings', type=int, default=50000, help='LinkedInの求人数')
+    parser.add_argument(
+        '--workers', type=int, nargs='+',
+        default=sorted({1, 2, 4, os.cpu_count() or 1}),
+        help='計測するワーカー数'
+    )
+    parser.add_argument('--users', type=int, default=20000, help='ログ生成のユーザー数')
+    parser.add_argument('--jobs-per-user', type=int, default=30, help='ユーザーあたりの行数')
+    parser.add_argument(
+        '--bench', nargs='+', choices=['matching', 'logs', 'suite'], default=['matching', 'logs'],
+        help='実行するベンチマーク'
+    )
+    parser.add_argument(
+        '--rows', type=parse_scale, default=parse_scale('10k'),
+        help='suiteで合成するJob Recommendation Datasetの行数（例: 10k, 1m, 10m）'
+    )
+    parser.add_argument('--seed', type=int, default=0, help='合成データの乱数シード')
+    parser.add_argument(
+        '--methods', nargs='+', choices=['index', 'bitset', 'matrix', 'exact'],
+        default=['index', 'bitset', 'matrix'],
+        help='suiteで計測するマッチング方式（大きな規模では遅い方式を外す）'
+    )
+    parser.add_argument('--output', help='結果を保存するJSONファイル')
+    parser.add_argument(
+        '--compare', nargs=2, metavar=('BASELINE', 'CURRENT'),
+        help='保存済みのsuiteの結果を比較して終了する'
+    )
+    parser.add_argument('--threshold', type=float, default=0.1, help='回帰とみなす遅くなった割合')
+    args = parser.parse_args()
+    
+    if args.compare:
+        compare_results(*args.compare, threshold=args.threshold)
+        return
+    
+    print("=" * 60)
+    print("⏱️  データ統合ベンチマーク")
+    print("=" * 60)
+    
+    output = {}
+    if 'suite' in args.bench:
+        # suiteのワーカー数は--workersの最大値を使う
+        result = bench_suite(
+            args.rows, seed=args.seed, matching_methods=args.methods, workers=max(args.workers)
+        )
+        output['suite'] = result
+    
+    if 'matching' in args.bench:
+        results = bench_matching_workers(args.jobs, args.postings, args.workers)
+        output['matching_workers'] = results
+        
+        print(f"\n📊 match_jobs_by_skills ({args.jobs:,} jobs × {args.postings:,} postings)")
+        print(f"   {'workers':>8} {'seconds':>10} {'speedup':>8}")
+        for result in results:
+            print(f"   {result['workers']:>8} {result['seconds']:>10.3f} {result['speedup']:>7.2f}x")
+    
+    if 'logs' in args.bench:
+        results = bench_log_generation(args.users, args.jobs_per_user)
+        output['log_generation'] = results
+        
+        print(f"\n📊 generate_realistic_logs ({args.users:,} users × {args.jobs_per_user} rows)")
+        print(f"   {'method':>10} {'seconds':>10} {'speedup':>8} {'logs':>10} {'like_rate':>10}")
+        for result in results:
+            print(
+                f"   {result['method']:>10} {result['seconds']:>10.3f} {result['speedup']:>7.2f}x"
+                f" {result['logs']:>10,} {result['like_rate']:>10.3f}"
+            )
+    
+    if args.output:
+        # suiteだけを実行した場合は、--compareでそのまま比較できる形で保存する
+        result = output['suite'] if list(output) == ['suite'] else output
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+        print(f"\n💾 Results saved to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+協調フィルタリングモデル構築スクリプト
+インタラクションログから暗黙的フィードバックのALSモデルを学習し、
+ユーザーごとの推薦リストを事前計算する
+"""
+
+import pandas as pd
+import numpy as np
+from scipy import sparse
+from typing import Dict, List, Optional
+import argparse
+import json
+from pathlib import Path
+
+from interaction_logs import read_new_logs
+
+
+class CollaborativeFilteringModelBuilder:
+    """暗黙的フィードバックALSモデルの構築クラス"""
+    
+    def __init__(self, logs_df: pd.DataFrame):
+        """
+        初期化
+        
+        Args:
+            logs_df: user_id, job_id, action を含むインタラクションログ
+        """
+        self.logs_df = logs_df
+        self.user_ids: Optional[np.ndarray] = None
+        self.job_ids: Optional[np.ndarray] = None
+        self.confidence: Optional[sparse.csr_matrix] = None
+        self.preference: Optional[sparse.csr_matrix] = None
+        self.user_factors: Optional[np.ndarray] = None
+        self.job_factors: Optional[np.ndarray] = None
+    
+    def build_interaction_matrix(self, alpha: float = 40.0, dislike_weight: float = 0.5):
+        """
+        ログを疎なユーザー×求人行列に変換
+        
+        - preference: likeがあれば1、それ以外は0
+        - confidence: 1 + alpha × (like数 + dislike_weight × dislike数) から1を引いた値
+          （観測のない組み合わせの信頼度1は学習時に全体で扱う）
+        
+        dislikeは「好まない」ことを確信度付きで表す観測として扱う
+        """
+        print("\n🔨 Building user × job interaction matrix...")
+        
+        user_codes, self.user_ids = pd.factorize(self.logs_df['user_id'], sort=True)
+        job_codes, self.job_ids = pd.factorize(self.logs_df['job_id'], sort=True)
+        self.user_ids = np.asarray(self.user_ids)
+        self.job_ids = np.asarray(self.job_ids)
+        shape = (len(self.user_ids), len(self.job_ids))
+        
+        actions = self.logs_df['action'].to_numpy()
+        likes = (actions == 'like').astype(np.float32)
+        dislikes = (actions == 'dislike').astype(np.float32)
+        
+        # 同じ(user, job)の重複は合算される。両方の行列を同じ座標から作るので非ゼロ構造は一致する
+        like_counts = sparse.csr_matrix((likes, (user_codes, job_codes)), shape=shape)
+        weights = sparse.csr_matrix(
+            (likes + dislike_weight * dislikes, (user_codes, job_codes)), shape=shape
+        )
+        like_counts.sum_duplicates()
+        weights.sum_duplicates()
+        
+        self.confidence = weights.astype(np.float32)
+        self.confidence.data *= alpha
+        # dislikeのみの組み合わせはpreference=0の観測になる
+        self.preference = like_counts.astype(np.float32)
+        self.preference.data = (like_counts.data > 0).astype(np.float32)
+        
+        density = self.confidence.nnz / max(shape[0] * shape[1], 1)
+        print(f"   ✅ {shape[0]:,} users × {shape[1]:,} jobs, {self.confidence.nnz:,} entries ({density:.4%})")
+    
+    def train(
+        self,
+        factors: int = 32,
+        regularization: float = 0.1,
+        iterations: int = 10,
+        seed: Optional[int] = None
+    ):
+        """
+        交互最小二乗法（ALS）でユーザー・求人の因子を学習
+        
+        ユーザー u の因子は (YᵀY + Yᵀ(Cᵤ - I)Y + λI) xᵤ = YᵀCᵤpᵤ を解いて求める。
+        YᵀYは全ユーザーで共通なので1回だけ計算し、各ユーザーでは観測のある
+        求人の行だけを使う（Hu, Koren, Volinsky 2008）
+        """
+        if self.confidence is None:
+            raise ValueError("先にbuild_interaction_matrix()を実行してください")
+        
+        print(f"\n🏋️  Training ALS ({factors} factors, {iterations} iterations)...")
+        
+        rng = np.random.default_rng(seed)
+        num_users, num_jobs = self.confidence.shape
+        user_factors = rng.normal(0, 0.01, size=(num_users, factors))
+        job_factors = rng.normal(0, 0.01, size=(num_jobs, factors))
+        
+        confidence_t = self.confidence.T.tocsr()
+        preference_t = self.preference.T.tocsr()
+        
+        for iteration in range(iterations):
+            _als_step(user_factors, job_factors, self.confidence, self.preference, regularization)
+            _als_step(job_factors, user_factors, confidence_t, preference_t, regularization)
+            loss = self._loss(user_factors, job_factors, regularization)
+            print(f"   Iteration {iteration + 1}/{iterations}: loss={loss:,.2f}")
+        
+        self.user_factors = user_factors.astype(np.float32)
+        self.job_factors = job_factors.astype(np.float32)
+    
+    def _loss(self, user_factors: np.ndarray, job_factors: np.ndarray, regularization: float) -> float:
+        """
+        観測のある組み合わせでの重み付き二乗誤差と正則化項（学習の進み具合の確認用）
+        """
+        # skipのみの組み合わせは明示的な0として格納されているため、nonzero()ではなく格納済みの位置を使う
+        rows = np.repeat(np.arange(self.confidence.shape[0]), np.diff(self.confidence.indptr))
+        cols = self.confidence.indices
+        predictions = np.einsum('ij,ij->i', user_factors[rows], job_factors[cols])
+        errors = (self.confidence.data + 1) * (self.preference.data - predictions) ** 2
+        return float(errors.sum() + regularization * (
+            (user_factors ** 2).sum() + (job_factors ** 2).sum()
+        ))
+    
+    def recommend_all(self, top_k: int = 50, batch_size: int = 4096) -> Dict[str, np.ndarray]:
+        """
+        全ユーザーの上位K件の推薦を計算（操作済みの求人は除く）
+        
+        Returns:
+            job_ids: (ユーザー数, K) のint64配列（足りない場合は-1）
+            scores: (ユーザー数, K) のfloat32配列
+        """
+        if self.user_factors is None:
+            raise ValueError("先にtrain()を実行してください")
+        
+        print(f"\n📋 Precomputing top-{top_k} recommendations per user...")
+        
+        num_users, num_jobs = len(self.user_ids), len(self.job_ids)
+        k = min(top_k, num_jobs)
+        job_ids = np.full((num_users, top_k), -1, dtype=np.int64)
+        scores = np.full((num_users, top_k), np.nan, dtype=np.float32)
+        
+        for start in range(0, num_users, batch_size):
+            stop = min(start + batch_size, num_users)
+            batch_scores = self.user_factors[start:stop] @ self.job_factors.T
+            
+            # 操作済みの求人は推薦しない
+            seen = self.confidence[start:stop].tocoo()
+            batch_scores[seen.row, seen.col] = -np.inf
+            
+            top = np.argpartition(-batch_scores, k - 1, axis=1)[:, :k]
+            top_scores = np.take_along_axis(batch_scores, top, axis=1)
+            order = np.argsort(-top_scores, axis=1)
+            top = np.take_along_axis(top, order, axis=1)
+            top_scores = np.take_along_axis(top_scores, order, axis=1)
+            
+            valid = np.isfinite(top_scores)
+            job_ids[start:stop, :k] = np.where(valid, self.job_ids[top], -1)
+            scores[start:stop, :k] = np.where(valid, top_scores, np.nan)
+        
+        print(f"   ✅ Computed recommendations for {num_users:,} users")
+        return {'job_ids': job_ids, 'scores': scores}
+    
+    def save(self, output_dir: str, recommendations: Dict[str, np.ndarray], params: Dict):
+        """
+        因子と推薦リストを.npy形式で保存（np.load(mmap_mode='r')でそのまま参照できる）
+        """
+        print(f"\n💾 Saving model to {output_dir}...")
+        output = Path(output_dir)
+        output.mkdir(parents=True, exist_ok=True)
+        
+        np.save(output / 'user_ids.npy', self.user_ids.astype(np.int64))
+        np.save(output / 'job_ids.npy', self.job_ids.astype(np.int64))
+        np.save(output / 'user_factors.npy', self.user_factors)
+        np.save(output / 'job_factors.npy', self.job_factors)
+        np.save(output / 'recommendations.npy', recommendations['job_ids'])
+        np.save(output / 'recommendation_scores.npy', recommendations['scores'])
+        
+        with open(output / 'model.json', 'w', encoding='utf-8') as f:
+            json.dump({
+                'num_users': int(len(self.user_ids)),
+                'num_jobs': int(len(self.job_ids)),
+                'num_interactions': int(self.confidence.nnz),
+                'top_k': int(recommendations['job_ids'].shape[1]),
+                **params,
+            }, f, indent=2, ensure_ascii=False)
+        
+        print(f"   ✅ Saved successfully!")
+
+
+def _als_step(
+    solve_factors: np.ndarray,
+    fixed_factors: np.ndarray,
+    confidence: sparse.csr_matrix,
+    preference: sparse.csr_matrix,
+    regularization: float
+):
+    """
+    fixed_factorsを固定して、solve_factorsの各行をその場で更新する
+    """
+    factors = fixed_factors.shape[1]
+    gram = fixed_factors.T @ fixed_factors + regularization * np.eye(factors)
+    indptr, indices = confidence.indptr, confidence.indices
+    
+    for row in range(solve_factors.shape[0]):
+        start, stop = indptr[row], indptr[row + 1]
+        if start == stop:
+            solve_factors[row] = 0.0
+            continue
+        observed = fixed_factors[indices[start:stop]]
+        extra_confidence = confidence.data[start:stop]
+        preferences = preference.data[start:stop]
+        
+        # (YᵀY + Yᵀ(Cᵤ - I)Y + λI) xᵤ = YᵀCᵤpᵤ
+        a = gram + (observed.T * extra_confidence) @ observed
+        b = observed.T @ ((extra_confidence + 1) * preferences)
+        solve_factors[row] = np.linalg.solve(a, b)
+
+
+def load_recommendations(model_dir: str) -> Dict[str, np.ndarray]:
+    """
+    保存済みの推薦リストをメモリマップで読み込む
+    """
+    model_path = Path(model_dir)
+    return {
+        name: np.load(model_path / f"{name}.npy", mmap_mode='r')
+        for name in ['user_ids', 'recommendations', 'recommendation_scores']
+    }
+
+
+def recommend_for_user(model: Dict[str, np.ndarray], user_id: int) -> List[Dict]:
+    """
+    事前計算した推薦リストからユーザーの推薦を引く（全求人の走査は行わない）
+    """
+    position = int(np.searchsorted(model['user_ids'], user_id))
+    if position >= len(model['user_ids']) or model['user_ids'][position] != user_id:
+        return []
+    job_ids = model['recommendations'][position]
+    scores = model['recommendation_scores'][position]
+    return [
+        {'job_id': int(job_id), 'score': float(score)}
+        for job_id, score in zip(job_ids, scores)
+        if job_id >= 0
+    ]
+
+
+def main():
+    """
+    メイン実行関数
+    """
+    parser = argparse.ArgumentParser(description='協調フィルタリングモデル構築ツール')
+    parser.add_argument('logs', help='ログファイル（CSV/Parquet）またはシャードのディレクトリ')
+    parser.add_argument('--output-dir', default='cf_model', help='モデルの出力先')
+    parser.add_argument('--factors', type=int, default=32, help='因子の次元数')
+    parser.add_argument('--regularization', type=float, default=0.1, help='正則化係数')
+    parser.add_argument('--alpha', type=float, default=40.0, help='信頼度のスケール')
+    parser.add_argument('--dislike-weight', type=float, default=0.5, help='dislikeの信頼度の重み')
+    parser.add_argument('--iterations', type=int, default=10, help='ALSの反復回数')
+    parser.add_argument('--top-k', type=int, default=50, help='ユーザーごとの推薦件数')
+    parser.add_argument('--seed', type=int, help='乱数シード')
+    args = parser.parse_args()
+    
+    print("=" * 60)
+    print("🚀 協調フィルタリングモデル構築ツール")
+    print("=" * 60)
+    
+    logs_df, _ = read_new_logs(args.logs, {})
+    print(f"   ✅ Loaded {len(logs_df):,} logs")
+    
+    builder = CollaborativeFilteringModelBuilder(logs_df)
+    builder.build_interaction_matrix(alpha=args.alpha, dislike_weight=args.dislike_weight)
+    builder.train(
+        factors=args.factors,
+        regularization=args.regularization,
+        iterations=args.iterations,
+        seed=args.seed
+    )
+    recommendations = builder.recommend_all(top_k=args.top_k)
+    builder.save(args.output_dir, recommendations, {
+        'factors': args.factors,
+        'regularization': args.regularization,
+        'alpha': args.alpha,
+        'dislike_weight': args.dislike_weight,
+        'iterations': args.iterations,
+    })
+    
+    print("\n" + "=" * 60)
+    print("✅ 完了!")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+スキル類似検索インデックス構築スクリプト
+求人のJob_RequirementsをTF-IDFで重み付けしたスキルベクトルに変換し、
+新規ユーザーのUser_Skillsから近い求人を引くためのIVFインデックスを作成する
+"""
+
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Optional, Sequence, Union
+import argparse
+import json
+import time
+from pathlib import Path
+
+from scipy import sparse
+
+from skill_vocab import SkillVocabulary
+
+
+class SkillIndexBuilder:
+    """TF-IDFスキルベクトルとIVFインデックスの構築クラス"""
+    
+    def __init__(self, job_df: pd.DataFrame):
+        """
+        初期化
+        
+        Args:
+            job_df: Job_ID, Job_Requirements を含む求人データ（Job_IDの重複は最初の行を使う）
+        """
+        jobs = job_df.drop_duplicates('Job_ID')[['Job_ID', 'Job_Requirements']]
+        self.job_ids = jobs['Job_ID'].to_numpy(dtype=np.int64)
+        self.requirements = jobs['Job_Requirements']
+        self.vocabulary = SkillVocabulary()
+        self.idf: Optional[np.ndarray] = None
+        self.vectors: Optional[sparse.csr_matrix] = None
+        self.centroids: Optional[np.ndarray] = None
+        self.assignments: Optional[np.ndarray] = None
+    
+    def build_vectors(self) -> sparse.csr_matrix:
+        """
+        求人ごとのTF-IDFスキルベクトル（L2正規化済み、float32のCSR行列）を作成
+        
+        スキルは1求人に1回しか現れないのでTFは0/1。
+        IDFは log((1 + 求人数) / (1 + 出現求人数)) + 1 とする。
+        1求人のスキルは数個なので、求人数 × 語彙数の密な行列は作らない
+        """
+        print("\n🔨 Building TF-IDF skill vectors...")
+        
+        indptr, indices = self.vocabulary.encode_many(self.requirements)
+        indices = indices.astype(np.int64)
+        
+        num_jobs = len(self.job_ids)
+        document_frequency = np.bincount(indices, minlength=len(self.vocabulary))
+        self.idf = (np.log((1 + num_jobs) / (1 + document_frequency)) + 1).astype(np.float32)
+        
+        data = self.idf[indices]
+        norms = np.sqrt(np.bincount(
+            np.repeat(np.arange(num_jobs), np.diff(indptr)), weights=data.astype(np.float64) ** 2,
+            minlength=num_jobs
+        ))
+        data = data / np.repeat(np.where(norms > 0, norms, 1), np.diff(indptr))
+        self.vectors = sparse.csr_matrix(
+            (data.astype(np.float32), indices, indptr), shape=(num_jobs, len(self.vocabulary))
+        )
+        
+        print(f"   ✅ {num_jobs:,} jobs × {len(self.vocabulary):,} skills")
+        return self.vectors
+    
+    def build_ivf(self, num_lists: Optional[int] = None, iterations: int = 10, seed: Optional[int] = 0):
+        """
+        球面k-meansでベクトルをクラスタに分け、転置リスト（IVF）を作成
+        
+        検索時はクエリに近いnprobe個のクラスタだけを走査する。
+        num_listsを省略した場合は √求人数 を使う
+        """
+        if self.vectors is None:
+            self.build_vectors()
+        
+        num_jobs = self.vectors.shape[0]
+        num_lists = max(1, min(num_lists or int(np.sqrt(num_jobs)), num_jobs))
+        print(f"\n🗂️  Clustering into {num_lists:,} lists ({iterations} iterations)...")
+        
+        rng = np.random.default_rng(seed)
+        centroids = self.vectors[rng.choice(num_jobs, size=num_lists, replace=False)].toarray()
+        for _ in range(iterations):
+            assignments = _nearest_centroids(self.vectors, centroids)
+            # クラスタ × 求人の所属行列との積で、クラスタごとのベクトルの和を求める
+            membership = sparse.csr_matrix(
+                (np.ones(num_jobs, dtype=np.float32), (assignments, np.arange(num_jobs))),
+                shape=(num_lists, num_jobs)
+            )
+            sums = (membership @ self.vectors).toarray()
+            counts = np.bincount(assignments, minlength=num_lists)
+            # 空になったクラスタはランダムな求人で置き直す
+            empty = counts == 0
+            sums[empty] = self.vectors[rng.choice(num_jobs, size=int(empty.sum()))].toarray()
+            centroids = _normalize_rows(sums)
+        
+        self.centroids = centroids
+        self.assignments = _nearest_centroids(self.vectors, centroids)
+        sizes = np.bincount(self.assignments, minlength=num_lists)
+        print(f"   ✅ List sizes: min={sizes.min():,}, median={int(np.median(sizes)):,}, max={sizes.max():,}")
+    
+    def list_layout(self):
+        """
+        クラスタ順の並び替えインデックスと、各クラスタの開始位置（長さ num_lists + 1）を返す
+        """
+        order = np.argsort(self.assignments, kind='stable')
+        offsets = np.zeros(len(self.centroids) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(np.bincount(self.assignments, minlength=len(self.centroids)))
+        return order, offsets
+    
+    def save(self, output_dir: str):
+        """
+        インデックスを.npy形式で保存（SkillIndex.loadでメモリマップして使う）
+        
+        ベクトルはクラスタ順に並べ替えたCSR形式（vector_indptr, vector_indices, vector_data）で
+        保存し、各クラスタが連続した行（と連続した非ゼロ要素）になるようにする
+        """
+        if self.centroids is None:
+            self.build_ivf()
+        
+        print(f"\n💾 Saving index to {output_dir}...")
+        output = Path(output_dir)
+        output.mkdir(parents=True, exist_ok=True)
+        
+        order, offsets = self.list_layout()
+        
+        vectors = self.vectors[order]
+        np.save(output / 'vector_indptr.npy', vectors.indptr.astype(np.int64))
+        np.save(output / 'vector_indices.npy', vectors.indices.astype(np.uint16))
+        np.save(output / 'vector_data.npy', vectors.data.astype(np.float32))
+        np.save(output / 'job_ids.npy', self.job_ids[order])
+        np.save(output / 'centroids.npy', self.centroids)
+        np.save(output / 'list_offsets.npy', offsets)
+        np.save(output / 'idf.npy', self.idf)
+        self.vocabulary.save(str(output / 'vocabulary.json'))
+        
+        with open(output / 'index.json', 'w', encoding='utf-8') as f:
+            json.dump({
+                'num_jobs': int(len(self.job_ids)),
+                'num_lists': int(len(self.centroids)),
+            }, f, indent=2, ensure_ascii=False)
+        
+        print(f"   ✅ Saved successfully!")
+
+
+class SkillIndex:
+    """保存済みIVFインデックスに対する検索クラス"""
+    
+    def __init__(
+        self,
+        vector_indptr: np.ndarray,
+        vector_indices: np.ndarray,
+        vector_data: np.ndarray,
+        job_ids: np.ndarray,
+        centroids: np.ndarray,
+        list_offsets: np.ndarray,
+        idf: np.ndarray,
+        vocabulary: SkillVocabulary
+    ):
+        # 求人ベクトル（クラスタ順のCSR形式）
+        self.vector_indptr = vector_indptr
+        self.vector_indices = vector_indices
+        self.vector_data = vector_data
+        self.job_ids = job_ids
+        self.centroids = centroids
+        self.list_offsets = list_offsets
+        self.idf = idf
+        self.vocabulary = vocabulary
+    
+    @classmethod
+    def load(cls, index_dir: str, mmap: bool = True) -> 'SkillIndex':
+        """
+        保存済みインデックスを読み込む（ベクトルと求人IDはメモリマップ）
+        """
+        path = Path(index_dir)
+        mmap_mode = 'r' if mmap else None
+        return cls(
+            vector_indptr=np.load(path / 'vector_indptr.npy', mmap_mode=mmap_mode),
+            vector_indices=np.load(path / 'vector_indices.npy', mmap_mode=mmap_mode),
+            vector_data=np.load(path / 'vector_data.npy', mmap_mode=mmap_mode),
+            job_ids=np.load(path / 'job_ids.npy', mmap_mode=mmap_mode),
+            centroids=np.load(path / 'centroids.npy'),
+            list_offsets=np.load(path / 'list_offsets.npy'),
+            idf=np.load(path / 'idf.npy'),
+            vocabulary=SkillVocabulary.load(str(path / 'vocabulary.json')),
+        )
+    
+    @classmethod
+    def from_builder(cls, builder: SkillIndexBuilder) -> 'SkillIndex':
+        """
+        構築直後のインデックスをディスクを経由せずに検索用に変換
+        """
+        order, offsets = builder.list_layout()
+        vectors = builder.vectors[order]
+        return cls(
+            vector_indptr=vectors.indptr.astype(np.int64),
+            vector_indices=vectors.indices.astype(np.uint16),
+            vector_data=vectors.data,
+            job_ids=builder.job_ids[order],
+            centroids=builder.centroids,
+            list_offsets=offsets,
+            idf=builder.idf,
+            vocabulary=builder.vocabulary,
+        )
+    
+    def encode(self, skills: Union[str, Sequence[str]]) -> np.ndarray:
+        """
+        スキルリストをクエリベクトルに変換（語彙にないスキルは無視）
+        """
+        codes = self.vocabulary.encode(skills, add=False)
+        query = np.zeros(len(self.idf), dtype=np.float32)
+        query[codes] = self.idf[codes]
+        norm = np.linalg.norm(query)
+        return query / norm if norm > 0 else query
+    
+    def query(
+        self,
+        skills: Union[str, Sequence[str]],
+        top_k: int = 10,
+        nprobe: int = 8
+    ) -> List[Dict]:
+        """
+        スキルリストにコサイン類似度が高い求人を上位K件返す
+        
+        Args:
+            skills: カンマ区切りの文字列またはスキルのリスト
+            top_k: 返す件数
+            nprobe: 走査するクラスタ数（大きいほど正確で遅い）
+        """
+        vector = self.encode(skills)
+        if not vector.any():
+            return []
+        
+        nprobe = min(nprobe, len(self.centroids))
+        lists = np.argpartition(-(self.centroids @ vector), nprobe - 1)[:nprobe]
+        rows = np.concatenate([
+            np.arange(self.list_offsets[i], self.list_offsets[i + 1]) for i in lists
+        ])
+        scores = np.concatenate([
+            self._row_scores(self.list_offsets[i], self.list_offsets[i + 1], vector) for i in lists
+        ])
+        return self._top_k(rows, scores, top_k)
+    
+    def query_exact(self, skills: Union[str, Sequence[str]], top_k: int = 10) -> List[Dict]:
+        """
+        全求人との総当たりで上位K件を返す（再現率の評価用）
+        """
+        vector = self.encode(skills)
+        if not vector.any():
+            return []
+        return self._top_k(np.arange(len(self.job_ids)), self._row_scores(0, len(self.job_ids), vector), top_k)
+    
+    def _row_scores(self, start: int, stop: int, query: np.ndarray) -> np.ndarray:
+        """
+        start〜stop行の求人ベクトルとクエリの内積（各行の非ゼロ要素だけを読む）
+        """
+        indptr = np.asarray(self.vector_indptr[start:stop + 1])
+        indices = self.vector_indices[indptr[0]:indptr[-1]]
+        data = self.vector_data[indptr[0]:indptr[-1]]
+        rows = np.repeat(np.arange(stop - start), np.diff(indptr))
+        return np.bincount(rows, weights=data * query[indices], minlength=stop - start)
+    
+    def _top_k(self, rows: np.ndarray, scores: np.ndarray, top_k: int) -> List[Dict]:
+        """
+        スコアの上位K件を類似度の降順で返す
+        """
+        k = min(top_k, len(rows))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [
+            {'job_id': int(self.job_ids[rows[i]]), 'similarity': float(scores[i])}
+            for i in top
+        ]
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """
+    行ごとにL2正規化（ゼロベクトルはそのまま）
+    """
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return (matrix / np.where(norms > 0, norms, 1)).astype(np.float32)
+
+
+def _nearest_centroids(
+    vectors: sparse.csr_matrix,
+    centroids: np.ndarray,
+    batch_size: int = 65536
+) -> np.ndarray:
+    """
+    各ベクトルに最も近い（内積が最大の）クラスタ番号を返す
+    """
+    num_vectors = vectors.shape[0]
+    assignments = np.empty(num_vectors, dtype=np.int64)
+    for start in range(0, num_vectors, batch_size):
+        stop = min(start + batch_size, num_vectors)
+        assignments[start:stop] = np.argmax(vectors[start:stop] @ centroids.T, axis=1)
+    return assignments
+
+
+def recall_at_k(index: SkillIndex, queries: List, top_k: int = 10, nprobe: int = 8) -> float:
+    """
+    総当たり検索に対するRecall@Kを計算
+    
+    同じ類似度の求人が複数ある場合はどれを返しても正解なので、
+    総当たりのK件目の類似度以上の求人を正解として数える
+    """
+    hits = 0
+    total = 0
+    for skills in queries:
+        exact = index.query_exact(skills, top_k)
+        if not exact:
+            continue
+        threshold = exact[-1]['similarity'] - 1e-6
+        approximate = index.query(skills, top_k, nprobe)
+        hits += sum(result['similarity'] >= threshold for result in approximate)
+        total += len(exact)
+    return hits / total if total else 1.0
+
+
+def main():
+    """
+    メイン実行関数
+    """
+    parser = argparse.ArgumentParser(description='スキル類似検索インデックス構築ツール')
+    parser.add_argument('--input', default='Job Datsset.csv', help='Job Recommendation Datasetのパス')
+    parser.add_argument('--output-dir', default='skill_index', help='インデックスの出力先')
+    parser.add_argument('--lists', type=int, help='クラスタ数（省略時は√求人数）')
+    parser.add_argument('--iterations', type=int, default=10, help='k-meansの反復回数')
+    parser.add_argument('--nprobe', type=int, default=8, help='検索時に走査するクラスタ数')
+    parser.add_argument('--top-k', type=int, default=10, help='検索結果の件数')
+    parser.add_argument('--queries', type=int, default=1000, help='評価に使うUser_Skillsの件数')
+    parser.add_argument('--query', help='検索するスキル（例: "Python, SQL"）')
+    args = parser.parse_args()
+    
+    print("=" * 60)
+    print("🚀 スキル類似検索インデックス構築ツール")
+    print("=" * 60)
+    
+    print(f"\n📂 Loading {args.input}...")
+    job_df = pd.read_csv(args.input)
+    print(f"   ✅ Loaded {len(job_df):,} records")
+    
+    builder = SkillIndexBuilder(job_df)
+    builder.build_vectors()
+    builder.build_ivf(num_lists=args.lists, iterations=args.iterations)
+    builder.save(args.output_dir)
+    
+    index = SkillIndex.load(args.output_dir)
+    
+    # 実際のUser_Skillsをクエリにして再現率と応答時間を計測
+    if 'User_Skills' in job_df.columns and args.queries > 0:
+        user_skills = job_df['User_Skills'].dropna().drop_duplicates()
+        queries = user_skills.sample(min(args.queries, len(user_skills)), random_state=0).tolist()
+        
+        start = time.perf_counter()
+        for skills in queries:
+            index.query(skills, args.top_k, args.nprobe)
+        latency_ms = (time.perf_counter() - start) / max(len(queries), 1) * 1000
+        recall = recall_at_k(index, queries, args.top_k, args.nprobe)
+        
+        print(f"\n📊 Evaluation ({len(queries):,} queries, nprobe={args.nprobe}):")
+        print(f"   Recall@{args.top_k}: {recall:.3f}")
+        print(f"   Mean latency: {latency_ms:.3f} ms/query")
+    
+    if args.query:
+        print(f"\n🔍 Top {args.top_k} jobs for \"{args.query}\":")
+        for result in index.query(args.query, args.top_k, args.nprobe):
+            print(f"   Job {result['job_id']}: {result['similarity']:.3f}")
+    
+    print("\n" + "=" * 60)
+    print("✅ 完了!")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
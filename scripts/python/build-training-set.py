@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+学習データ作成スクリプト
+インタラクションログのlikeを正例とし、ユーザーがまだ見ていない求人から負例をK件ずつ
+サンプリングして、(ユーザー, 正例の求人, 負例の求人 × K) の学習データを作成する
+
+出力は固定行数のシャード（構造化配列の.npy）で、np.loadのメモリマップでそのまま読める
+"""
+
+import pandas as pd
+import numpy as np
+from datetime import datetime
+from typing import Dict, Iterator, Optional, Tuple
+import argparse
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+
+from interaction_logs import pair_keys, read_new_logs
+from pipeline_metrics import PipelineMetrics
+
+
+# 1ユーザー・1正例あたりの負例の数
+NUM_NEGATIVES = 4
+
+# 1シャードの行数
+SHARD_SIZE = 65536
+
+# 学習データのマニフェストファイル名
+TRAINING_MANIFEST = 'manifest.json'
+
+# 既に見た求人を引いた場合に引き直す最大回数
+MAX_RESAMPLE_ROUNDS = 32
+
+
+def training_dtype(num_negatives: int) -> np.dtype:
+    """
+    1行（ユーザー, 正例, 負例 × K）の構造化配列の型
+    """
+    return np.dtype([
+        ('user_id', np.int32),
+        ('positive', np.int32),
+        ('negatives', np.int32, (num_negatives,)),
+    ])
+
+
+def build_alias_table(weights: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Voseのエイリアス法の表を作成（重みに比例した確率でO(1)サンプリングするため）
+    
+    Returns:
+        (各列をそのまま採用する確率, 採用しない場合の代わりの列)
+    """
+    count = len(weights)
+    scaled = np.asarray(weights, dtype=np.float64) * count / np.sum(weights)
+    probability = np.ones(count, dtype=np.float64)
+    alias = np.arange(count, dtype=np.int64)
+    
+    small = [int(i) for i in np.flatnonzero(scaled < 1.0)]
+    large = [int(i) for i in np.flatnonzero(scaled >= 1.0)]
+    while small and large:
+        less, more = small.pop(), large.pop()
+        probability[less] = scaled[less]
+        alias[less] = more
+        scaled[more] = scaled[more] + scaled[less] - 1.0
+        (small if scaled[more] < 1.0 else large).append(more)
+    # 残りは浮動小数点誤差の範囲で1なので、そのまま採用する
+    return probability, alias
+
+
+def alias_sample(
+    rng: np.random.Generator,
+    probability: np.ndarray,
+    alias: np.ndarray,
+    size
+) -> np.ndarray:
+    """
+    エイリアス表からsize個の列番号をまとめてサンプリング
+    """
+    columns = rng.integers(0, len(probability), size=size)
+    accept = rng.random(size=size) < probability[columns]
+    return np.where(accept, columns, alias[columns])
+
+
+def iter_training_shards(dataset_dir: str) -> Iterator[np.ndarray]:
+    """
+    学習データのシャードを順にメモリマップで読み込む（pandasを使わない）
+    """
+    path = Path(dataset_dir)
+    with open(path / TRAINING_MANIFEST, encoding='utf-8') as f:
+        manifest = json.load(f)
+    for shard in manifest['shards']:
+        yield np.load(path / shard['file'], mmap_mode='r')
+
+
+class TrainingSetBuilder:
+    """負例サンプリング付きの学習データ作成クラス"""
+    
+    def __init__(
+        self,
+        num_negatives: int = NUM_NEGATIVES,
+        sampling: str = 'popularity',
+        seed: Optional[int] = 0,
+        metrics: Optional[PipelineMetrics] = None
+    ):
+        """
+        初期化
+        
+        Args:
+            num_negatives: 1つの正例あたりの負例の数
+            sampling: 'popularity'（ログでの出現回数 + 1 に比例）または'uniform'
+            seed: 乱数シード（Noneの場合は毎回異なる）
+            metrics: 各ステージの計測結果の記録先（省略時は新しく作成）
+        """
+        if sampling not in ('popularity', 'uniform'):
+            raise ValueError(f"未対応のサンプリング方法です: {sampling}")
+        self.num_negatives = num_negatives
+        self.sampling = sampling
+        self.seed = seed
+        self.metrics = metrics or PipelineMetrics()
+    
+    def latest_interactions(self, logs_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        (ユーザー, 求人) ごとに最新のアクションだけを残す（時刻がなければ後のログを新しいとみなす）
+        """
+        if 'timestamp' in logs_df.columns:
+            timestamps = pd.to_datetime(logs_df['timestamp'], format='ISO8601', errors='coerce')
+            logs_df = logs_df.assign(timestamp=timestamps).sort_values(
+                'timestamp', kind='stable', na_position='first'
+            )
+        keys = pair_keys(logs_df['user_id'].to_numpy(), logs_df['job_id'].to_numpy())
+        return logs_df[~pd.Series(keys).duplicated(keep='last').to_numpy()]
+    
+    def sample_negatives(
+        self,
+        rng: np.random.Generator,
+        user_ids: np.ndarray,
+        job_ids: np.ndarray,
+        weights: np.ndarray,
+        seen: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        正例ごとにK件の負例をサンプリングし、そのユーザーが見た求人を引いた分だけ引き直す
+        
+        Args:
+            user_ids: 正例のユーザー
+            job_ids: 負例の候補の求人（カタログ）
+            weights: 候補の重み
+            seen: ユーザーが見た (ユーザー, 求人) のキー（ソート済み）
+        
+        Returns:
+            (負例の求人ID（行数 × K）, 引き直しても見ていない求人が引けなかった行のマスク)
+        """
+        probability, alias = build_alias_table(weights)
+        shape = (len(user_ids), self.num_negatives)
+        negatives = alias_sample(rng, probability, alias, shape)
+        users = np.broadcast_to(np.asarray(user_ids, dtype=np.int64)[:, None], shape)
+        
+        rejected = np.zeros(shape, dtype=bool)
+        pending = np.ones(shape, dtype=bool)
+        for round_number in range(MAX_RESAMPLE_ROUNDS + 1):
+            # 前の回で引き直したものだけを、見た求人でないか確認する
+            keys = pair_keys(users[pending], job_ids[negatives[pending]])
+            positions = np.minimum(np.searchsorted(seen, keys), max(len(seen) - 1, 0))
+            hit = seen[positions] == keys if len(seen) else np.zeros(len(keys), dtype=bool)
+            rejected[:] = False
+            rejected[pending] = hit
+            if not rejected.any() or round_number == MAX_RESAMPLE_ROUNDS:
+                break
+            negatives[rejected] = alias_sample(rng, probability, alias, int(rejected.sum()))
+            pending = rejected.copy()
+        return job_ids[negatives], rejected.any(axis=1)
+    
+    def build(
+        self,
+        logs_path: str,
+        jobs_path: str,
+        output_dir: str,
+        shard_size: int = SHARD_SIZE
+    ) -> Dict:
+        """
+        ログとカタログから学習データを作成してシャードに保存
+        
+        Args:
+            logs_path: インタラクションログ（CSV、Parquet、シャード出力ディレクトリ、
+                またはcompact-logs.pyのlatest.parquet）
+            jobs_path: 求人カタログ（Job_IDを含むCSVまたはParquet）
+            output_dir: シャードとマニフェストの出力先
+            shard_size: 1シャードの行数（最後のシャードだけ少なくなる）
+        """
+        rng = np.random.default_rng(self.seed)
+        
+        with self.metrics.stage('load_logs') as record:
+            logs_df, _ = read_new_logs(logs_path, {}, optional_columns=['timestamp'])
+            record['rows'] = len(logs_df)
+        with self.metrics.stage('load_jobs') as record:
+            job_ids = _read_job_ids(jobs_path)
+            record['rows'] = len(job_ids)
+        print(f"   ✅ {len(logs_df):,} logs, {len(job_ids):,} jobs in catalogue")
+        
+        with self.metrics.stage('positives', rows=len(logs_df)):
+            latest = self.latest_interactions(logs_df)
+            seen = np.unique(pair_keys(latest['user_id'], latest['job_id']))
+            positives = latest[latest['action'] == 'like']
+            order = rng.permutation(len(positives))
+            users = positives['user_id'].to_numpy(dtype=np.int64)[order]
+            liked = positives['job_id'].to_numpy(dtype=np.int64)[order]
+        
+        if self.sampling == 'popularity':
+            popularity = pd.Index(job_ids).get_indexer(logs_df['job_id'].to_numpy(dtype=np.int64))
+            weights = np.bincount(popularity[popularity >= 0], minlength=len(job_ids)) + 1.0
+        else:
+            weights = np.ones(len(job_ids), dtype=np.float64)
+        
+        print(f"\n🎲 Sampling {self.num_negatives} {self.sampling} negatives for {len(users):,} positives...")
+        with self.metrics.stage('sample', rows=len(users)):
+            negatives, exhausted = self.sample_negatives(rng, users, job_ids, weights, seen)
+            users, liked, negatives = users[~exhausted], liked[~exhausted], negatives[~exhausted]
+        
+        with self.metrics.stage('save', rows=len(users)):
+            manifest = self._save(output_dir, users, liked, negatives, shard_size, {
+                'logs': logs_path,
+                'jobs': jobs_path,
+                'num_negatives': self.num_negatives,
+                'sampling': self.sampling,
+                'seed': self.seed,
+                'num_jobs': int(len(job_ids)),
+                'dropped_examples': int(exhausted.sum()),
+            })
+        print(f"   ✅ {manifest['num_examples']:,} examples in {len(manifest['shards'])} shards")
+        return manifest
+    
+    def _save(
+        self,
+        output_dir: str,
+        users: np.ndarray,
+        positives: np.ndarray,
+        negatives: np.ndarray,
+        shard_size: int,
+        info: Dict
+    ) -> Dict:
+        """
+        学習データを固定行数のシャードに分けて一時ディレクトリに書き、出力先を置き換える
+        """
+        output = Path(output_dir)
+        staging = output.with_name(output.name + '.tmp')
+        if staging.exists():
+            shutil.rmtree(staging)
+        staging.mkdir(parents=True)
+        
+        dtype = training_dtype(self.num_negatives)
+        shards = []
+        for number, start in enumerate(range(0, len(users), shard_size)):
+            stop = min(start + shard_size, len(users))
+            rows = np.empty(stop - start, dtype=dtype)
+            rows['user_id'] = users[start:stop]
+            rows['positive'] = positives[start:stop]
+            rows['negatives'] = negatives[start:stop]
+            name = f'part-{number:05d}.npy'
+            np.save(staging / name, rows)
+            shards.append({'file': name, 'rows': int(stop - start)})
+        
+        manifest = {
+            **info,
+            'num_examples': int(len(users)),
+            'shard_size': shard_size,
+            'dtype': [[name, str(dtype.fields[name][0])] for name in dtype.names],
+            'shards': shards,
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+        }
+        with open(staging / TRAINING_MANIFEST, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+        
+        if output.exists():
+            shutil.rmtree(output)
+        os.replace(staging, output)
+        return manifest
+
+
+def _read_job_ids(path: str) -> np.ndarray:
+    """
+    求人カタログのJob_ID（重複なし、出現順）を読み込む
+    """
+    if path.endswith('.csv'):
+        df = pd.read_csv(path, usecols=['Job_ID'])
+    else:
+        df = pd.read_parquet(path, columns=['Job_ID'])
+    return df['Job_ID'].drop_duplicates().to_numpy(dtype=np.int64)
+
+
+def main():
+    """
+    メイン実行関数
+    """
+    parser = argparse.ArgumentParser(description='学習データ作成ツール')
+    parser.add_argument('logs', help='インタラクションログ（CSV、Parquetまたはシャード出力ディレクトリ）')
+    parser.add_argument('--jobs', default='Job Datsset.csv', help='求人カタログ（Job_IDを含むCSVまたはParquet）')
+    parser.add_argument('--output-dir', default='training_set', help='シャードの出力先')
+    parser.add_argument('--negatives', type=int, default=NUM_NEGATIVES, help='1つの正例あたりの負例の数')
+    parser.add_argument(
+        '--sampling', choices=['popularity', 'uniform'], default='popularity',
+        help='負例のサンプリング方法（popularity: ログでの出現回数に比例）'
+    )
+    parser.add_argument('--shard-size', type=int, default=SHARD_SIZE, help='1シャードの行数')
+    parser.add_argument('--seed', type=int, default=0, help='乱数シード')
+    parser.add_argument('--metrics', help='ステージごとの計測結果を保存するJSONファイル')
+    args = parser.parse_args()
+    
+    print("=" * 60)
+    print("🚀 学習データ作成ツール")
+    print("=" * 60)
+    
+    # 計測結果を保存する場合だけ、ステージごとの表示とピークRSSの計測を有効にする
+    metrics = PipelineMetrics(verbose=bool(args.metrics), track_rss=bool(args.metrics))
+    builder = TrainingSetBuilder(
+        num_negatives=args.negatives, sampling=args.sampling, seed=args.seed, metrics=metrics
+    )
+    start = time.perf_counter()
+    manifest = builder.build(args.logs, args.jobs, args.output_dir, shard_size=args.shard_size)
+    
+    if args.metrics:
+        metrics.print_summary()
+        metrics.save(args.metrics)
+    
+    print("\n" + "=" * 60)
+    print(f"✅ 完了! ({time.perf_counter() - start:.1f}s)")
+    print("=" * 60)
+    print(f"\n📁 出力ディレクトリ: {args.output_dir}")
+    if manifest['dropped_examples']:
+        print(f"⚠️  {manifest['dropped_examples']:,} examples dropped (no unseen jobs left for the user)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+ユーザーフィード事前計算スクリプト
+統合データセットとインタラクションログから、ユーザーごとのスワイプ用フィード
+（ランキング済みの求人IDと求人の要約。スワイプ済みの求人は除く）を事前計算する
+
+新しいログが追加された場合は、前回処理した位置（ウォーターマーク）以降のログだけを読み、
+スワイプしたユーザーのフィードだけを作り直す
+"""
+
+import pandas as pd
+import numpy as np
+from datetime import datetime
+from typing import Dict, Optional
+import argparse
+import json
+import time
+from pathlib import Path
+
+from batch_pipeline import file_signature
+from interaction_logs import pair_keys, read_new_logs
+from integrated_dataset import read_integrated_dataset
+from pipeline_metrics import PipelineMetrics
+
+
+# 1ユーザーのフィードに載せる求人数
+FEED_SIZE = 50
+
+# 統合データセットの列 → フィードに載せる求人の要約のフィールド
+JOB_SUMMARY_FIELDS = {
+    'Job_ID': 'job_id',
+    'job_title': 'title',
+    'company_name': 'company',
+    'location': 'location',
+    'avg_salary_usd': 'salary_usd',
+    'Job_Requirements': 'skills',
+}
+
+# フィード作成に使う統合データセットの列
+CANDIDATE_COLUMNS = ['User_ID', 'Job_ID', 'Match_Score', 'Recommended']
+
+
+class UserFeedBuilder:
+    """ユーザーごとのフィードの事前計算クラス"""
+    
+    def __init__(self, output_dir: str, feed_size: int = FEED_SIZE, metrics: Optional[PipelineMetrics] = None):
+        """
+        初期化
+        
+        Args:
+            output_dir: フィードと状態（候補・スワイプ済み・ウォーターマーク）の保存先
+            feed_size: 1ユーザーのフィードに載せる求人数
+            metrics: 各ステージの計測結果の記録先（省略時は新しく作成）
+        """
+        self.output = Path(output_dir)
+        self.feed_size = feed_size
+        self.metrics = metrics or PipelineMetrics()
+        self.manifest: Optional[Dict] = None
+        manifest_path = self.output / 'manifest.json'
+        if manifest_path.exists():
+            with open(manifest_path, encoding='utf-8') as f:
+                self.manifest = json.load(f)
+    
+    def rank_candidates(self, integrated_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        ユーザーごとの候補の求人を、Recommended → Match_Score の順にランキング
+        
+        Returns:
+            User_ID, Job_ID, scoreの表（ユーザー順・ランキング順に並ぶ）
+        """
+        candidates = integrated_df[CANDIDATE_COLUMNS].drop_duplicates(['User_ID', 'Job_ID'])
+        candidates = pd.DataFrame({
+            'User_ID': candidates['User_ID'].to_numpy(dtype=np.int32),
+            'Job_ID': candidates['Job_ID'].to_numpy(dtype=np.int32),
+            # Match_Scoreは0〜1なので、Recommended=1の求人が必ず上位になる
+            'score': (
+                candidates['Match_Score'].fillna(0).to_numpy(dtype=np.float32)
+                + candidates['Recommended'].fillna(0).to_numpy(dtype=np.float32)
+            ),
+        })
+        order = np.lexsort((candidates['Job_ID'], -candidates['score'], candidates['User_ID']))
+        return candidates.iloc[order].reset_index(drop=True)
+    
+    def job_summaries(self, integrated_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        フィードに載せる求人の要約（Job_IDごとに1行）
+        """
+        columns = [column for column in JOB_SUMMARY_FIELDS if column in integrated_df.columns]
+        jobs = integrated_df[columns].drop_duplicates('Job_ID').rename(columns=JOB_SUMMARY_FIELDS)
+        return jobs.sort_values('job_id').reset_index(drop=True)
+    
+    def select_feeds(self, candidates: pd.DataFrame, swiped: np.ndarray) -> pd.DataFrame:
+        """
+        スワイプ済みの求人を除き、ユーザーごとに上位feed_size件を選ぶ
+        
+        Args:
+            candidates: rank_candidatesの結果（の一部）
+            swiped: スワイプ済みの組のキー（pair_keys）
+        
+        Returns:
+            user_id, rank, job_id, scoreの縦長の表
+        """
+        keys = pair_keys(candidates['User_ID'].to_numpy(), candidates['Job_ID'].to_numpy())
+        remaining = candidates[~np.isin(keys, swiped)]
+        ranks = remaining.groupby('User_ID', sort=False).cumcount().to_numpy()
+        selected = remaining[ranks < self.feed_size]
+        return pd.DataFrame({
+            'user_id': selected['User_ID'].to_numpy(),
+            'rank': ranks[ranks < self.feed_size].astype(np.int16),
+            'job_id': selected['Job_ID'].to_numpy(),
+            'score': selected['score'].to_numpy(),
+        })
+    
+    def build(self, integrated_path: str, logs_path: Optional[str] = None) -> Dict:
+        """
+        全ユーザーのフィードを作り直す
+        """
+        print(f"\n🔨 Building feeds for all users (feed size {self.feed_size})...")
+        with self.metrics.stage('load_integrated') as record:
+            integrated_df = read_integrated_dataset(
+                integrated_path, columns=set(CANDIDATE_COLUMNS) | set(JOB_SUMMARY_FIELDS)
+            )
+            record['rows'] = len(integrated_df)
+        
+        with self.metrics.stage('rank_candidates', rows=len(integrated_df)):
+            candidates = self.rank_candidates(integrated_df)
+            jobs = self.job_summaries(integrated_df)
+        del integrated_df
+        
+        watermark: Dict[str, int] = {}
+        swiped = np.empty(0, dtype=np.int64)
+        if logs_path:
+            with self.metrics.stage('load_logs') as record:
+                logs_df, watermark = read_new_logs(logs_path, {})
+                swiped = np.unique(pair_keys(logs_df['user_id'], logs_df['job_id']))
+                record['rows'] = len(logs_df)
+        
+        with self.metrics.stage('select_feeds', rows=len(candidates)):
+            feeds = self.select_feeds(candidates, swiped)
+        
+        self.output.mkdir(parents=True, exist_ok=True)
+        candidates.to_parquet(self.output / 'candidates.parquet', index=False)
+        jobs.to_parquet(self.output / 'jobs.parquet', index=False)
+        changed_users = np.unique(candidates['User_ID'].to_numpy())
+        return self._save(feeds, swiped, changed_users, watermark, {
+            'integrated': integrated_path,
+            'integrated_signature': file_signature(integrated_path),
+            'logs': logs_path,
+            'mode': 'full',
+        })
+    
+    def refresh(self, logs_path: str) -> Dict:
+        """
+        前回のウォーターマーク以降のログだけを読み、スワイプしたユーザーのフィードだけを作り直す
+        """
+        print("\n🔄 Refreshing feeds from new logs...")
+        with self.metrics.stage('load_logs') as record:
+            logs_df, watermark = read_new_logs(logs_path, self.manifest['watermark'])
+            record['rows'] = len(logs_df)
+        print(f"   📊 New logs: {len(logs_df):,}")
+        
+        feeds = pd.read_parquet(self.output / 'feeds.parquet')
+        swiped = np.load(self.output / 'swiped.npy')
+        if len(logs_df) == 0:
+            return self._save(feeds, swiped, np.empty(0, dtype=np.int32), watermark, {'mode': 'refresh'})
+        
+        with self.metrics.stage('select_feeds') as record:
+            new_keys = pair_keys(logs_df['user_id'], logs_df['job_id'])
+            swiped = np.union1d(swiped, new_keys)
+            changed_users = np.unique(logs_df['user_id'].to_numpy(dtype=np.int32))
+            
+            # 変化したユーザーの候補だけを読み込んで選び直す
+            candidates = pd.read_parquet(
+                self.output / 'candidates.parquet',
+                filters=[('User_ID', 'in', changed_users.tolist())]
+            )
+            refreshed = self.select_feeds(candidates, swiped)
+            feeds = pd.concat(
+                [feeds[~feeds['user_id'].isin(changed_users)], refreshed], ignore_index=True
+            ).sort_values(['user_id', 'rank'], kind='stable').reset_index(drop=True)
+            record['rows'] = len(candidates)
+        
+        return self._save(feeds, swiped, changed_users, watermark, {'mode': 'refresh'})
+    
+    def run(self, integrated_path: str, logs_path: Optional[str] = None, full: bool = False) -> Dict:
+        """
+        前回の状態が使える場合は差分更新、そうでなければ全件を作り直す
+        
+        統合データセットやフィードの件数が変わった場合は全件を作り直す
+        """
+        reusable = (
+            not full
+            and self.manifest is not None
+            and logs_path is not None
+            and self.manifest['feed_size'] == self.feed_size
+            and self.manifest['logs'] == logs_path
+            and self.manifest['integrated_signature'] == file_signature(integrated_path)
+        )
+        if reusable:
+            return self.refresh(logs_path)
+        return self.build(integrated_path, logs_path)
+    
+    def _save(
+        self,
+        feeds: pd.DataFrame,
+        swiped: np.ndarray,
+        changed_users: np.ndarray,
+        watermark: Dict[str, int],
+        info: Dict
+    ) -> Dict:
+        """
+        フィード・スワイプ済みの組・更新したユーザー・マニフェストを保存
+        """
+        with self.metrics.stage('save', rows=len(feeds)):
+            feeds.to_parquet(self.output / 'feeds.parquet', index=False)
+            np.save(self.output / 'swiped.npy', swiped)
+            # export-to-firestore.py --changed-onlyで、更新したフィードだけを書き込むために使う
+            np.save(self.output / 'changed_users.npy', changed_users.astype(np.int32))
+            
+            manifest = {**(self.manifest or {}), **info}
+            manifest.update({
+                'feed_size': self.feed_size,
+                'watermark': watermark,
+                'num_users': int(feeds['user_id'].nunique()),
+                'num_swiped': int(len(swiped)),
+                'changed_users': int(len(changed_users)),
+                'updated_at': datetime.now().isoformat(timespec='seconds'),
+            })
+            with open(self.output / 'manifest.json', 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=2, ensure_ascii=False)
+            self.manifest = manifest
+        
+        print(f"   ✅ {manifest['changed_users']:,} feeds updated ({manifest['num_users']:,} users total)")
+        return manifest
+
+
+def main():
+    """
+    メイン実行関数
+    """
+    parser = argparse.ArgumentParser(description='ユーザーフィード事前計算ツール')
+    parser.add_argument('integrated', help='統合データセット（CSV、Parquetまたはパーティション分割したディレクトリ）')
+    parser.add_argument('--logs', help='インタラクションログ（CSV、Parquetまたはシャード出力ディレクトリ）')
+    parser.add_argument('--output-dir', default='user_feeds', help='フィードと状態の保存先')
+    parser.add_argument('--feed-size', type=int, default=FEED_SIZE, help='1ユーザーのフィードに載せる求人数')
+    parser.add_argument('--full', action='store_true', help='差分更新せずに全件を作り直す')
+    parser.add_argument('--metrics', help='ステージごとの計測結果を保存するJSONファイル')
+    args = parser.parse_args()
+    
+    print("=" * 60)
+    print("🚀 ユーザーフィード事前計算ツール")
+    print("=" * 60)
+    
+    # 計測結果を保存する場合だけ、ステージごとの表示とピークRSSの計測を有効にする
+    metrics = PipelineMetrics(verbose=bool(args.metrics), track_rss=bool(args.metrics))
+    builder = UserFeedBuilder(args.output_dir, feed_size=args.feed_size, metrics=metrics)
+    start = time.perf_counter()
+    manifest = builder.run(args.integrated, args.logs, full=args.full)
+    
+    if args.metrics:
+        metrics.print_summary()
+        metrics.save(args.metrics)
+    
+    print("\n" + "=" * 60)
+    print(f"✅ 完了! ({manifest['mode']}, {time.perf_counter() - start:.1f}s)")
+    print("=" * 60)
+    print(f"\n📁 出力ディレクトリ: {args.output_dir}")
+    print("💡 export-to-firestore.py --feeds でuser_feedsコレクションに書き込めます")
+
+
+if __name__ == '__main__':
+    main()
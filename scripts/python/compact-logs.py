@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+インタラクションログ集約スクリプト
+追記のみのインタラクションログ（generate-user-logs.pyの出力や、user_interactionsから
+書き出したスワイプ）を、(ユーザー, 求人) ごとの最新のアクションと、
+求人別・ユーザー別の日次・時間別の集計表に畳み込む
+
+前回処理した位置（ウォーターマーク）以降のログだけを読み、既存の集計表に足し込む
+"""
+
+import pandas as pd
+import numpy as np
+from datetime import datetime
+from typing import Dict, Optional
+import argparse
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+
+from interaction_logs import read_new_logs
+from pipeline_metrics import PipelineMetrics
+
+
+# 集計するアクション（アクション → 集計表の列名）
+ACTIONS = {
+    'like': 'likes',
+    'dislike': 'dislikes',
+    'skip': 'skips',
+}
+
+# 集計の単位（名前 → 時刻の切り捨て単位。numpyのdatetime64の単位）
+ROLLUP_GRAINS = {
+    'daily': 'D',
+    'hourly': 'h',
+}
+
+# 集計の軸（名前 → キーの列）
+ROLLUP_KEYS = {
+    'job': 'job_id',
+    'user': 'user_id',
+}
+
+# 最新のアクションの表に残す列（timestamp, swipe_duration_msはログにあれば使う）
+LATEST_COLUMNS = ['user_id', 'job_id', 'action', 'timestamp', 'swipe_duration_ms']
+
+# 集計表の加算できる列（平均は合計と件数から求める）
+ROLLUP_SUM_COLUMNS = list(ACTIONS.values()) + ['events', 'swipe_duration_ms_sum', 'swipe_duration_count']
+
+
+def prepare_events(events: pd.DataFrame) -> pd.DataFrame:
+    """
+    ログを集計用の加算できる列（アクションごとの件数・スワイプ時間の合計と件数）に変換
+    
+    時刻のないログは集計の対象外とする
+    """
+    timestamps = events['timestamp'].to_numpy(dtype='datetime64[ns]')
+    valid = ~np.isnat(timestamps)
+    events = events[valid]
+    duration = pd.to_numeric(events['swipe_duration_ms'], errors='coerce')
+    action_codes = pd.Categorical(events['action'], categories=list(ACTIONS)).codes
+    prepared = pd.DataFrame({
+        'user_id': events['user_id'].to_numpy(),
+        'job_id': events['job_id'].to_numpy(),
+        'timestamp': timestamps[valid],
+        'events': np.ones(len(events), dtype=np.int64),
+        'swipe_duration_ms_sum': duration.fillna(0).to_numpy(dtype=np.float64),
+        'swipe_duration_count': duration.notna().to_numpy(dtype=np.int64),
+    })
+    for code, column in enumerate(ACTIONS.values()):
+        prepared[column] = (action_codes == code).astype(np.int64)
+    return prepared
+
+
+def rollup_events(prepared: pd.DataFrame, key: str, grain: str) -> pd.DataFrame:
+    """
+    prepare_eventsで変換したログを、キーと期間ごとに集計
+    
+    Args:
+        key: 集計の軸の列（'job_id'または'user_id'）
+        grain: 時刻の切り捨て単位（'D'や'h'）
+    """
+    periods = prepared['timestamp'].to_numpy().astype(f'datetime64[{grain}]').astype('datetime64[ns]')
+    table = prepared[[key] + ROLLUP_SUM_COLUMNS].assign(period=periods)
+    return table.groupby([key, 'period'])[ROLLUP_SUM_COLUMNS].sum().reset_index()
+
+
+def merge_rollups(previous: Optional[pd.DataFrame], delta: pd.DataFrame, key: str) -> pd.DataFrame:
+    """
+    既存の集計表に新しいログの集計を足し込み、スワイプ時間の平均を計算し直す
+    """
+    table = delta
+    if previous is not None:
+        table = pd.concat([previous[[key, 'period'] + ROLLUP_SUM_COLUMNS], delta], ignore_index=True)
+        table = table.groupby([key, 'period'])[ROLLUP_SUM_COLUMNS].sum().reset_index()
+    count = table['swipe_duration_count'].to_numpy()
+    table['mean_swipe_duration_ms'] = np.where(
+        count > 0, table['swipe_duration_ms_sum'].to_numpy() / np.maximum(count, 1), np.nan
+    )
+    return table
+
+
+class LogCompactor:
+    """インタラクションログの畳み込みと差分集計のクラス"""
+    
+    def __init__(self, output_dir: str, metrics: Optional[PipelineMetrics] = None):
+        """
+        初期化
+        
+        Args:
+            output_dir: 最新のアクション・集計表・ウォーターマークの保存先
+            metrics: 各ステージの計測結果の記録先（省略時は新しく作成）
+        """
+        self.output = Path(output_dir)
+        self.metrics = metrics or PipelineMetrics()
+        self.manifest: Optional[Dict] = None
+        manifest_path = self.output / 'manifest.json'
+        if manifest_path.exists():
+            with open(manifest_path, encoding='utf-8') as f:
+                self.manifest = json.load(f)
+    
+    @staticmethod
+    def rollup_name(by: str, grain: str) -> str:
+        """
+        集計表のファイル名（例: job_daily.parquet）
+        """
+        return f'{by}_{grain}.parquet'
+    
+    def read_table(self, name: str) -> Optional[pd.DataFrame]:
+        """
+        保存済みの表を読み込む（まだなければNone）
+        """
+        path = self.output / name
+        return pd.read_parquet(path) if path.exists() else None
+    
+    def compact(self, previous: Optional[pd.DataFrame], events: pd.DataFrame) -> pd.DataFrame:
+        """
+        (ユーザー, 求人) ごとに最も新しいアクションだけを残す
+        
+        時刻が同じ（または時刻がない）場合は後から追記されたログを新しいとみなす
+        """
+        latest = events if previous is None else pd.concat([previous, events], ignore_index=True)
+        latest = latest.sort_values('timestamp', kind='stable', na_position='first')
+        latest = latest.drop_duplicates(['user_id', 'job_id'], keep='last')
+        return latest.sort_values(['user_id', 'job_id'], kind='stable').reset_index(drop=True)
+    
+    def run(self, logs_path: str, full: bool = False) -> Dict:
+        """
+        新しいログを読み込み、最新のアクションと集計表を更新する
+        
+        前回と異なるログを指定した場合やfull=Trueの場合は、すべてのログから作り直す
+        """
+        incremental = not full and self.manifest is not None and self.manifest['logs'] == logs_path
+        watermark = self.manifest['watermark'] if incremental else {}
+        print(f"\n🔄 Compacting logs ({'incremental' if incremental else 'full'})...")
+        
+        with self.metrics.stage('load_logs') as record:
+            events, watermark = read_new_logs(
+                logs_path, watermark, optional_columns=['timestamp', 'swipe_duration_ms']
+            )
+            events['timestamp'] = pd.to_datetime(events['timestamp'], format='ISO8601', errors='coerce')
+            record['rows'] = len(events)
+        print(f"   📊 New logs: {len(events):,}")
+        if incremental and len(events) == 0:
+            return self._save_manifest({**self.manifest, 'mode': 'incremental', 'new_rows': 0})
+        
+        tables: Dict[str, pd.DataFrame] = {}
+        with self.metrics.stage('compact', rows=len(events)):
+            previous = self.read_table('latest.parquet') if incremental else None
+            tables['latest.parquet'] = self.compact(previous, events[LATEST_COLUMNS])
+        
+        with self.metrics.stage('rollup', rows=len(events)):
+            prepared = prepare_events(events)
+            for by, key in ROLLUP_KEYS.items():
+                for grain, unit in ROLLUP_GRAINS.items():
+                    name = self.rollup_name(by, grain)
+                    previous = self.read_table(name) if incremental else None
+                    tables[name] = merge_rollups(previous, rollup_events(prepared, key, unit), key)
+        
+        rows_processed = (self.manifest['rows_processed'] if incremental else 0) + len(events)
+        return self._save(tables, {
+            'logs': logs_path,
+            'mode': 'incremental' if incremental else 'full',
+            'watermark': watermark,
+            'rows_processed': int(rows_processed),
+            'new_rows': int(len(events)),
+            'pairs': int(len(tables['latest.parquet'])),
+        })
+    
+    def _save_manifest(self, manifest: Dict) -> Dict:
+        """
+        新しいログがない場合は、表を書き直さずにマニフェストだけを更新する
+        """
+        manifest['updated_at'] = datetime.now().isoformat(timespec='seconds')
+        temporary = self.output / 'manifest.json.tmp'
+        with open(temporary, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+        os.replace(temporary, self.output / 'manifest.json')
+        self.manifest = manifest
+        print(f"   ✅ No new logs ({manifest['pairs']:,} (user, job) pairs)")
+        return manifest
+    
+    def _save(self, tables: Dict[str, pd.DataFrame], manifest: Dict) -> Dict:
+        """
+        表とマニフェストを一時ディレクトリに書いてから出力先を置き換える
+        
+        途中で失敗しても、集計表とウォーターマークが食い違った状態は残らない
+        （同じログを二重に足し込まない）
+        """
+        with self.metrics.stage('save'):
+            staging = self.output.with_name(self.output.name + '.tmp')
+            if staging.exists():
+                shutil.rmtree(staging)
+            staging.mkdir(parents=True)
+            for name, table in tables.items():
+                table.to_parquet(staging / name, index=False)
+            
+            manifest['updated_at'] = datetime.now().isoformat(timespec='seconds')
+            with open(staging / 'manifest.json', 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=2, ensure_ascii=False)
+            
+            if self.output.exists():
+                shutil.rmtree(self.output)
+            os.replace(staging, self.output)
+            self.manifest = manifest
+        
+        print(
+            f"   ✅ {manifest['new_rows']:,} new logs folded into "
+            f"{manifest['pairs']:,} (user, job) pairs ({manifest['rows_processed']:,} logs total)"
+        )
+        return manifest
+
+
+def main():
+    """
+    メイン実行関数
+    """
+    parser = argparse.ArgumentParser(description='インタラクションログ集約ツール')
+    parser.add_argument('logs', help='インタラクションログ（CSV、Parquetまたはシャード出力ディレクトリ）')
+    parser.add_argument('--output-dir', default='log_rollups', help='最新のアクションと集計表の保存先')
+    parser.add_argument('--full', action='store_true', help='差分更新せずにすべてのログから作り直す')
+    parser.add_argument('--metrics', help='ステージごとの計測結果を保存するJSONファイル')
+    args = parser.parse_args()
+    
+    print("=" * 60)
+    print("🚀 インタラクションログ集約ツール")
+    print("=" * 60)
+    
+    # 計測結果を保存する場合だけ、ステージごとの表示とピークRSSの計測を有効にする
+    metrics = PipelineMetrics(verbose=bool(args.metrics), track_rss=bool(args.metrics))
+    compactor = LogCompactor(args.output_dir, metrics=metrics)
+    start = time.perf_counter()
+    manifest = compactor.run(args.logs, full=args.full)
+    
+    if args.metrics:
+        metrics.print_summary()
+        metrics.save(args.metrics)
+    
+    print("\n" + "=" * 60)
+    print(f"✅ 完了! ({manifest['mode']}, {time.perf_counter() - start:.1f}s)")
+    print("=" * 60)
+    print(f"\n📁 出力ディレクトリ: {args.output_dir}")
+    print("   latest.parquet: (user_id, job_id) ごとの最新のアクション")
+    for by in ROLLUP_KEYS:
+        for grain in ROLLUP_GRAINS:
+            print(f"   {LogCompactor.rollup_name(by, grain)}: {by}別・{grain}の集計")
+
+
+if __name__ == '__main__':
+    main()
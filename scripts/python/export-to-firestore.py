@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+"""
+Firestoreエクスポートスクリプト
+統合データセットとユーザーインタラクションログを、jobs / users / user_interactions
+コレクションへまとめて書き込む（scripts/migrate-to-firestore.tsと同じドキュメント形式）。
+build-user-feeds.pyで事前計算したフィードはuser_feedsコレクションに書き込む
+
+google-cloud-firestoreが必要:
+    pip install google-cloud-firestore
+
+FIRESTORE_EMULATOR_HOST（例: localhost:8080）を設定すると、ローカルのエミュレータに書き込む
+"""
+
+import pandas as pd
+import numpy as np
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from pathlib import Path
+
+from integrated_dataset import read_integrated_dataset
+from interaction_logs import log_segments
+from pipeline_metrics import PipelineMetrics
+
+try:
+    from google.cloud import firestore
+except ImportError:  # エクスポートを実行するときだけ必要
+    firestore = None
+
+try:
+    from google.api_core import exceptions as api_exceptions
+    RETRYABLE_ERRORS: Tuple[type, ...] = (
+        api_exceptions.Aborted,
+        api_exceptions.DeadlineExceeded,
+        api_exceptions.InternalServerError,
+        api_exceptions.ResourceExhausted,
+        api_exceptions.ServiceUnavailable,
+        ConnectionError,
+        TimeoutError,
+    )
+except ImportError:
+    RETRYABLE_ERRORS = (ConnectionError, TimeoutError)
+
+
+# Firestoreの1回のバッチ書き込みで扱える操作数の上限
+MAX_BATCH_SIZE = 500
+
+# 統合データセットの列 → jobsコレクションのフィールド（lib/schema.tsのJob）
+JOB_FIELDS = {
+    'Job_ID': 'job_id',
+    'Job_Requirements': 'job_requirements',
+    'job_title': 'job_title',
+    'company_name': 'company_name',
+    'location': 'location',
+    'description': 'job_description',
+    'formatted_work_type': 'employment_type',
+    'formatted_experience_level': 'experience_level',
+    'avg_salary_usd': 'avg_salary_usd',
+    'min_salary_usd': 'min_salary_usd',
+    'max_salary_usd': 'max_salary_usd',
+}
+
+# ユーザーインタラクションログの列 → user_interactionsコレクションのフィールド
+INTERACTION_FIELDS = {
+    'user_id': 'user_id',
+    'job_id': 'job_id',
+    'action': 'action',
+    'timestamp': 'timestamp',
+    'match_score': 'match_score',
+    'swipe_duration_ms': 'swipe_duration_ms',
+}
+
+
+def _column_values(series: pd.Series) -> List:
+    """
+    列の値をFirestoreに書き込めるPythonの値のリストに変換（欠損値 → None）
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        values = list(series.dt.to_pydatetime())
+    else:
+        values = series.astype(object).tolist()
+    missing = series.isna().to_numpy()
+    if missing.any():
+        for position in np.flatnonzero(missing):
+            values[position] = None
+    return values
+
+
+def _documents(df: pd.DataFrame, fields: Dict[str, str], id_column: str) -> Iterator[Tuple[str, Dict]]:
+    """
+    DataFrameの行を (ドキュメントID, フィールド) に変換
+    """
+    columns = [column for column in fields if column in df.columns]
+    names = [fields[column] for column in columns]
+    values = [_column_values(df[column]) for column in columns]
+    for doc_id, row in zip(df[id_column].astype(str).tolist(), zip(*values)):
+        yield doc_id, dict(zip(names, row))
+
+
+def _salary_range(document: Dict) -> Optional[str]:
+    """
+    給与の下限・上限から表示用の給与レンジを作成
+    """
+    low, high = document.get('min_salary_usd'), document.get('max_salary_usd')
+    if low is None or high is None:
+        return None
+    return f"${low:,.0f} - ${high:,.0f}"
+
+
+def job_documents(integrated_df: pd.DataFrame) -> Iterator[Tuple[str, Dict]]:
+    """
+    統合データセットからjobsコレクションのドキュメントを作成（Job_IDごとに1件）
+    """
+    jobs = integrated_df.drop_duplicates('Job_ID')
+    for doc_id, document in _documents(jobs, JOB_FIELDS, 'Job_ID'):
+        document['salary_range'] = _salary_range(document)
+        yield doc_id, document
+
+
+def user_documents(integrated_df: pd.DataFrame) -> Iterator[Tuple[str, Dict]]:
+    """
+    統合データセットからusersコレクションのドキュメントを作成（User_IDごとに1件）
+    """
+    users = integrated_df.drop_duplicates('User_ID')
+    yield from _documents(users, {'User_ID': 'user_id', 'User_Skills': 'user_skills'}, 'User_ID')
+
+
+def interaction_document_ids(logs_df: pd.DataFrame) -> pd.Series:
+    """
+    ログの内容から決まるドキュメントID（ユーザー・求人・時刻）
+    
+    同じログを何度書き込んでも同じドキュメントが上書きされるだけになる
+    """
+    timestamps = pd.to_datetime(logs_df['timestamp']).dt.strftime('%Y%m%dT%H%M%S%f')
+    return (
+        logs_df['user_id'].astype(str) + '_' + logs_df['job_id'].astype(str) + '_' + timestamps
+    )
+
+
+def interaction_documents(log_batches: Iterable[pd.DataFrame]) -> Iterator[Tuple[str, Dict]]:
+    """
+    ログのバッチからuser_interactionsコレクションのドキュメントを作成
+    """
+    for logs_df in log_batches:
+        logs_df = logs_df.assign(
+            _doc_id=interaction_document_ids(logs_df),
+            timestamp=pd.to_datetime(logs_df['timestamp'])
+        )
+        yield from _documents(logs_df, INTERACTION_FIELDS, '_doc_id')
+
+
+def feed_documents(feed_dir: str, changed_only: bool = False) -> Iterator[Tuple[str, Dict]]:
+    """
+    build-user-feeds.pyの出力を、ユーザーごとの1つのドキュメント（user_feeds）に変換
+    
+    フロントエンドはコレクションを走査せず、このドキュメントを1件読むだけでフィードを表示できる
+    
+    Args:
+        changed_only: Trueの場合、直近の実行で更新したユーザーのフィードだけを返す
+    """
+    feed_path = Path(feed_dir)
+    feeds = pd.read_parquet(feed_path / 'feeds.parquet')
+    if changed_only:
+        feeds = feeds[feeds['user_id'].isin(np.load(feed_path / 'changed_users.npy'))]
+    jobs = pd.read_parquet(feed_path / 'jobs.parquet').set_index('job_id', drop=False)
+    with open(feed_path / 'manifest.json', encoding='utf-8') as f:
+        updated_at = datetime.fromisoformat(json.load(f)['updated_at'])
+    
+    summaries = jobs.reindex(feeds['job_id'].to_numpy())
+    summaries = summaries.astype(object).where(summaries.notna(), None).to_dict('records')
+    job_ids = feeds['job_id'].tolist()
+    scores = feeds['score'].round(4).tolist()
+    user_ids = feeds['user_id'].to_numpy()
+    boundaries = np.flatnonzero(np.diff(user_ids)) + 1
+    for start, stop in zip(np.r_[0, boundaries], np.r_[boundaries, len(user_ids)]):
+        jobs_in_feed = [
+            {**summaries[position], 'job_id': job_ids[position], 'match_score': scores[position]}
+            for position in range(start, stop)
+        ]
+        user_id = int(user_ids[start])
+        yield str(user_id), {
+            'user_id': user_id,
+            'job_ids': [job['job_id'] for job in jobs_in_feed],
+            'jobs': jobs_in_feed,
+            'updated_at': updated_at,
+        }
+    
+    if changed_only:
+        # 候補をすべてスワイプしたユーザーは、空のフィードで上書きする
+        for user_id in np.setdiff1d(np.load(feed_path / 'changed_users.npy'), user_ids).tolist():
+            yield str(user_id), {'user_id': user_id, 'job_ids': [], 'jobs': [], 'updated_at': updated_at}
+
+
+def read_log_batches(path: str, chunksize: int = 200000) -> Iterator[pd.DataFrame]:
+    """
+    ユーザーインタラクションログを分割して読み込む
+    
+    Args:
+        path: CSV・Parquetファイル、またはgenerate-user-logs.pyのシャード出力ディレクトリ
+    """
+    for file in log_segments(path):
+        if file.suffix == '.csv':
+            yield from pd.read_csv(file, chunksize=chunksize)
+        else:
+            yield pd.read_parquet(file)
+
+
+def _chunks(documents: Iterable[Tuple[str, Dict]], size: int) -> Iterator[List[Tuple[str, Dict]]]:
+    """
+    ドキュメントの列をsize件ずつのリストに区切る
+    """
+    chunk: List[Tuple[str, Dict]] = []
+    for document in documents:
+        chunk.append(document)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class FirestoreBulkExporter:
+    """Firestoreへのバッチ書き込みを並行して行うクラス"""
+    
+    def __init__(
+        self,
+        client,
+        batch_size: int = MAX_BATCH_SIZE,
+        concurrency: int = 16,
+        max_retries: int = 5,
+        backoff_seconds: float = 0.5,
+        max_backoff_seconds: float = 30.0
+    ):
+        """
+        初期化
+        
+        Args:
+            client: firestore.AsyncClient（テストでは同じインターフェースの代替オブジェクト）
+            batch_size: 1回のバッチ書き込みのドキュメント数（最大500）
+            concurrency: 同時に実行するバッチ書き込みの数
+            max_retries: 一時的なエラーで再試行する回数
+            backoff_seconds: 最初の再試行までの待ち時間（再試行ごとに2倍、ジッターあり）
+            max_backoff_seconds: 再試行までの待ち時間の上限
+        """
+        if not 1 <= batch_size <= MAX_BATCH_SIZE:
+            raise ValueError(f"batch_sizeは1〜{MAX_BATCH_SIZE}で指定してください")
+        self.client = client
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.retries = 0
+    
+    async def _commit(self, collection, documents: List[Tuple[str, Dict]]):
+        """
+        1バッチ分のドキュメントを書き込む（一時的なエラーは指数バックオフで再試行）
+        """
+        for attempt in range(self.max_retries + 1):
+            batch = self.client.batch()
+            for doc_id, data in documents:
+                batch.set(collection.document(doc_id), data)
+            try:
+                await batch.commit()
+                return
+            except RETRYABLE_ERRORS as e:
+                if attempt == self.max_retries:
+                    raise
+                self.retries += 1
+                delay = min(self.max_backoff_seconds, self.backoff_seconds * 2 ** attempt)
+                print(f"   ⚠️  Batch commit failed ({type(e).__name__}), retrying in {delay:.1f}s...")
+                await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+    
+    async def export(self, collection_name: str, documents: Iterable[Tuple[str, Dict]]) -> Dict:
+        """
+        ドキュメントを順に読みながら、同時にconcurrency個までのバッチ書き込みを実行
+        
+        未完了の書き込みがconcurrency個に達したら次のバッチを作らずに待つため、
+        メモリに載るドキュメントは concurrency × batch_size 件までに収まる
+        
+        Returns:
+            書き込んだドキュメント数・バッチ数・再試行回数・処理時間
+        """
+        collection = self.client.collection(collection_name)
+        retries_before = self.retries
+        start = time.perf_counter()
+        pending = set()
+        written = 0
+        batches = 0
+        try:
+            for chunk in _chunks(documents, self.batch_size):
+                if len(pending) >= self.concurrency:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        task.result()
+                pending.add(asyncio.ensure_future(self._commit(collection, chunk)))
+                written += len(chunk)
+                batches += 1
+                if batches % 200 == 0:
+                    print(f"   {collection_name}: {written:,} documents queued...")
+            if pending:
+                await asyncio.gather(*pending)
+        except BaseException:
+            for task in pending:
+                task.cancel()
+            raise
+        
+        seconds = time.perf_counter() - start
+        print(f"   ✅ {collection_name}: {written:,} documents in {batches:,} batches ({seconds:.1f}s)")
+        return {
+            'documents': written,
+            'batches': batches,
+            'retries': self.retries - retries_before,
+            'seconds': round(seconds, 3),
+        }
+    
+    def export_all(
+        self,
+        collections: Dict[str, Iterable[Tuple[str, Dict]]],
+        metrics: Optional[PipelineMetrics] = None
+    ) -> Dict[str, Dict]:
+        """
+        複数のコレクションを順に書き込む（コレクション名 → ドキュメントの列）
+        """
+        metrics = metrics or PipelineMetrics()
+        
+        async def run() -> Dict[str, Dict]:
+            summary = {}
+            for name, documents in collections.items():
+                print(f"\n📤 Exporting {name}...")
+                with metrics.stage(f'export_{name}') as record:
+                    summary[name] = await self.export(name, documents)
+                    record['rows'] = summary[name]['documents']
+            return summary
+        
+        return asyncio.run(run())
+
+
+def create_client(project: Optional[str] = None):
+    """
+    FirestoreのAsyncClientを作成（FIRESTORE_EMULATOR_HOSTがあればエミュレータに接続）
+    """
+    if firestore is None:
+        raise ImportError(
+            "google-cloud-firestoreがインストールされていません: pip install google-cloud-firestore"
+        )
+    emulator = os.environ.get('FIRESTORE_EMULATOR_HOST')
+    if emulator:
+        print(f"🧪 Using Firestore emulator at {emulator}")
+    project = project or os.environ.get('NEXT_PUBLIC_FIREBASE_PROJECT_ID') or 'job-swipe-app-2025'
+    return firestore.AsyncClient(project=project)
+
+
+def main():
+    """
+    メイン実行関数
+    """
+    parser = argparse.ArgumentParser(description='Firestoreエクスポートツール')
+    parser.add_argument('--integrated', help='統合データセット（CSV、Parquetまたはパーティション分割したディレクトリ）')
+    parser.add_argument('--logs', help='ユーザーインタラクションログ（CSV、Parquetまたはシャード出力ディレクトリ）')
+    parser.add_argument('--feeds', help='build-user-feeds.pyの出力ディレクトリ')
+    parser.add_argument(
+        '--changed-only', action='store_true', help='直近の実行で更新したユーザーのフィードだけを書き込む'
+    )
+    parser.add_argument('--project', help='FirebaseプロジェクトID')
+    parser.add_argument(
+        '--collections', nargs='+', choices=['jobs', 'users', 'user_interactions', 'user_feeds'],
+        default=['jobs', 'users', 'user_interactions', 'user_feeds'],
+        help='書き込むコレクション'
+    )
+    parser.add_argument('--batch-size', type=int, default=MAX_BATCH_SIZE, help='1バッチあたりのドキュメント数')
+    parser.add_argument('--concurrency', type=int, default=16, help='同時に実行するバッチ書き込みの数')
+    parser.add_argument('--max-retries', type=int, default=5, help='一時的なエラーで再試行する回数')
+    parser.add_argument('--metrics', help='ステージごとの計測結果を保存するJSONファイル')
+    args = parser.parse_args()
+    
+    print("=" * 60)
+    print("🚀 Firestoreエクスポートツール")
+    print("=" * 60)
+    
+    collections: Dict[str, Iterable[Tuple[str, Dict]]] = {}
+    if args.integrated and {'jobs', 'users'} & set(args.collections):
+        print(f"📖 Loading integrated dataset from {args.integrated}...")
+        integrated_df = read_integrated_dataset(
+            args.integrated, columns=set(JOB_FIELDS) | {'User_ID', 'User_Skills'}
+        )
+        print(f"   ✅ Loaded {len(integrated_df):,} rows")
+        if 'jobs' in args.collections:
+            collections['jobs'] = job_documents(integrated_df)
+        if 'users' in args.collections:
+            collections['users'] = user_documents(integrated_df)
+    if args.logs and 'user_interactions' in args.collections:
+        collections['user_interactions'] = interaction_documents(read_log_batches(args.logs))
+    
+    if args.feeds and 'user_feeds' in args.collections:
+        collections['user_feeds'] = feed_documents(args.feeds, changed_only=args.changed_only)
+    
+    if not collections:
+        print("\n❌ エクスポートするデータがありません（--integrated / --logs / --feedsを指定してください）")
+        return
+    
+    # 計測結果を保存する場合だけ、ステージごとの表示とピークRSSの計測を有効にする
+    metrics = PipelineMetrics(verbose=bool(args.metrics), track_rss=bool(args.metrics))
+    exporter = FirestoreBulkExporter(
+        create_client(args.project),
+        batch_size=args.batch_size,
+        concurrency=args.concurrency,
+        max_retries=args.max_retries
+    )
+    summary = exporter.export_all(collections, metrics)
+    
+    if args.metrics:
+        metrics.print_summary()
+        metrics.save(args.metrics)
+    
+    print("\n📊 エクスポート完了統計:")
+    for name, stats in summary.items():
+        print(f"   - {name}: {stats['documents']:,}件 (retries: {stats['retries']})")
+    print("\n✨ エクスポートが完了しました！")
+
+
+if __name__ == '__main__':
+    main()
@@ -6,30 +6,187 @@
 
 import pandas as pd
 import numpy as np
+from collections import deque
 from datetime import datetime, timedelta
-from typing import List, Dict
+from typing import List, Dict, Iterable, Iterator, Optional
+import argparse
 import json
+import multiprocessing
+import os
+import shutil
+import sys
+from pathlib import Path
+
+from batch_pipeline import StageCheckpoint, file_signature, load_batch_config, stage_key
+from pipeline_metrics import PipelineMetrics
+from skill_vocab import SkillVocabulary
+
+
+# シャード出力で使える保存形式（シャードを読むinteraction_logs.read_new_logsと同じ）
+SHARD_FORMATS = ('csv', 'parquet')
+
+# ログ生成でワーカープロセスと共有する読み取り専用の状態
+# forkで起動した場合はコピーオンライトで共有され、タスクごとにpickleされない
+_WORKER_STATE: Dict = {}
+
+# バッチ実行の設定項目と既定値（--configのJSONで上書きし、さらにコマンドライン引数で上書きする）
+LOG_GENERATION_DEFAULTS = {
+    'input': 'Job Datsset.csv',
+    'method': 'realistic',
+    'workers': 1,
+    'seed': None,
+    'base_date': None,
+    'output': None,
+    'shard_dir': None,
+    'format': 'csv',
+    'batch_size': 1000000,
+    'checkpoint_dir': None,
+    'metrics': None,
+}
+
+
+def _realistic_log_block(state: Dict, task: tuple) -> pd.DataFrame:
+    """
+    1ブロック分のユーザーのログを、そのブロック専用の乱数列で生成
+    
+    Args:
+        state: 並べ替え済みのデータと生成パラメータ
+        task: (先頭ユーザー番号, 末尾ユーザー番号, SeedSequence)
+    """
+    first_user, last_user, seed_sequence = task
+    rng = np.random.default_rng(seed_sequence)
+    df = state['df']
+    order = state['order']
+    sorted_codes = state['sorted_codes']
+    
+    start, stop = np.searchsorted(sorted_codes, [first_user, last_user])
+    block_codes = sorted_codes[start:stop]
+    
+    # ユーザーが1日あたり見る求人数（ランダム）と、ユーザー内の順位
+    num_views = rng.integers(
+        state['views_per_user_min'],
+        state['views_per_user_max'] + 1,
+        size=last_user - first_user
+    )
+    ranks = np.arange(start, stop) - np.searchsorted(sorted_codes, block_codes)
+    viewed = order[start:stop][ranks < num_views[block_codes - first_user]]
+    
+    viewed_df = df.iloc[viewed]
+    count = len(viewed_df)
+    match_scores = viewed_df['Match_Score'].to_numpy(dtype=float)
+    recommended = viewed_df['Recommended'].to_numpy() == 1
+    
+    # タイムスタンプ: 過去30日間のランダムな時刻
+    offsets = (
+        pd.to_timedelta(rng.integers(0, 30, size=count), unit='D') +
+        pd.to_timedelta(rng.integers(0, 24, size=count), unit='h') +
+        pd.to_timedelta(rng.integers(0, 60, size=count), unit='min')
+    )
+    timestamps = state['base_date'] - offsets
+    
+    # Recommended=1の場合は確実にlike、それ以外はMatch_Scoreに基づく確率で決定
+    like_probability = match_scores * state['like_probability_multiplier']
+    likes = recommended | (rng.random(count) < like_probability)
+    confidence = np.where(recommended, 1.0, like_probability)
+    
+    # スワイプ時間（ミリ秒）- likeは2-10秒、dislikeは0.5-2秒
+    swipe_duration_ms = np.where(
+        likes,
+        rng.integers(2000, 10000, size=count),
+        rng.integers(500, 2000, size=count)
+    )
+    
+    logs = pd.DataFrame({
+        'user_id': viewed_df['User_ID'].to_numpy(dtype=int),
+        'job_id': viewed_df['Job_ID'].to_numpy(dtype=int),
+        'action': np.where(likes, 'like', 'dislike'),
+        'timestamp': timestamps.strftime('%Y-%m-%dT%H:%M:%S.%f'),
+        'match_score': match_scores,
+        'swipe_duration_ms': swipe_duration_ms.astype(int),
+        'confidence': confidence,
+    })
+    if state['include_skills']:
+        logs['user_skills'] = viewed_df['User_Skills'].to_numpy()
+        logs['job_requirements'] = viewed_df['Job_Requirements'].to_numpy()
+    return logs
+
+
+def _init_log_worker(state: Dict):
+    """
+    fork以外の起動方式で、ワーカーごとに一度だけ共有状態を受け取る
+    """
+    _WORKER_STATE.update(state)
+
+
+def _generate_log_block(task: tuple) -> pd.DataFrame:
+    """
+    ワーカープロセスで1ブロック分のログを生成
+    """
+    return _realistic_log_block(_WORKER_STATE, task)
+
+
+def _rebatch(frames: Iterable[pd.DataFrame], batch_size: int) -> Iterator[pd.DataFrame]:
+    """
+    大きさの異なるDataFrameの列を、batch_size行ずつのDataFrameに詰め直す
+    """
+    buffer: List[pd.DataFrame] = []
+    buffered = 0
+    for frame in frames:
+        buffer.append(frame)
+        buffered += len(frame)
+        while buffered >= batch_size:
+            combined = pd.concat(buffer, ignore_index=True)
+            yield combined.iloc[:batch_size].reset_index(drop=True)
+            rest = combined.iloc[batch_size:]
+            buffer = [rest]
+            buffered = len(rest)
+    if buffered > 0:
+        yield pd.concat(buffer, ignore_index=True)
+
+
+def _write_frame(df: pd.DataFrame, path: Path, format: str):
+    """
+    DataFrameをCSVまたはParquetで保存
+    """
+    if format == 'csv':
+        df.to_csv(path, index=False)
+    elif format == 'parquet':
+        df.to_parquet(path, index=False)
+    else:
+        raise ValueError(f"未対応の保存形式です: {format}")
 
 
 class UserInteractionLogGenerator:
     """ユーザーインタラクションログ生成クラス"""
     
-    def __init__(self, csv_path: str):
+    def __init__(self, csv_path: str, metrics: Optional[PipelineMetrics] = None):
         """
         初期化
         
         Args:
-            csv_path: Job Recommendation Datasetのパス
+            csv_path: Job Recommendation Datasetのパス（CSVまたはParquet）
+            metrics: 各ステージの計測結果の記録先（省略時は新しく作成）
         """
+        self.metrics = metrics or PipelineMetrics()
         print(f"📖 Loading dataset from {csv_path}...")
-        self.df = pd.read_csv(csv_path)
+        with self.metrics.stage('load') as record:
+            if str(csv_path).endswith('.parquet'):
+                self.df = pd.read_parquet(csv_path, memory_map=True)
+            else:
+                self.df = pd.read_csv(csv_path)
+            record['rows'] = len(self.df)
         print(f"   ✅ Loaded {len(self.df):,} rows")
     
     def generate_realistic_logs(
         self,
         views_per_user_min: int = 5,
         views_per_user_max: int = 20,
-        like_probability_multiplier: float = 0.9
+        like_probability_multiplier: float = 0.9,
+        seed: Optional[int] = None,
+        method: str = 'vectorized',
+        workers: int = 1,
+        users_per_block: int = 10000,
+        base_date: Optional[datetime] = None
     ) -> pd.DataFrame:
         """
         現実的なユーザーインタラクションログを生成
@@ -38,12 +195,175 @@ class UserInteractionLogGenerator:
             views_per_user_min: ユーザーが1日あたり見る求人の最小数
             views_per_user_max: ユーザーが1日あたり見る求人の最大数
             like_probability_multiplier: like確率の調整係数
+            seed: 乱数シード（'vectorized'方式のみ。Noneの場合は毎回異なる）
+            method: 'vectorized'（一度の並べ替えと配列演算で生成）または
+                'loop'（ユーザーごとに1行ずつ生成する従来の方式）
+            workers: 'vectorized'方式で使うプロセス数
+            users_per_block: 1ブロック（独立した乱数列を持つ単位）あたりのユーザー数
+            base_date: タイムスタンプの基準時刻（Noneの場合は現在時刻）
+        
+        seedとbase_dateが同じであれば、workersの値に関係なく同一のログになる
         
         Returns:
             ユーザーインタラクションログのDataFrame
         """
         print("\n🔨 Generating realistic user interaction logs...")
         
+        with self.metrics.stage('generate_realistic') as record:
+            if method == 'vectorized':
+                logs_df = pd.concat(
+                    list(self._iter_realistic_log_blocks(
+                        views_per_user_min,
+                        views_per_user_max,
+                        like_probability_multiplier,
+                        seed,
+                        users_per_block=users_per_block,
+                        include_skills=True,
+                        workers=workers,
+                        base_date=base_date
+                    )),
+                    ignore_index=True
+                )
+            elif method == 'loop':
+                logs_df = self._generate_realistic_logs_loop(
+                    views_per_user_min,
+                    views_per_user_max,
+                    like_probability_multiplier
+                )
+            else:
+                raise ValueError(f"未対応の生成方式です: {method}")
+            record['rows'] = len(logs_df)
+        
+        print(f"\n✅ Generated {len(logs_df):,} interaction logs")
+        print(f"   - Likes: {(logs_df['action'] == 'like').sum():,} ({(logs_df['action'] == 'like').sum() / len(logs_df) * 100:.1f}%)")
+        print(f"   - Dislikes: {(logs_df['action'] == 'dislike').sum():,} ({(logs_df['action'] == 'dislike').sum() / len(logs_df) * 100:.1f}%)")
+        
+        return logs_df
+    
+    def _iter_realistic_log_blocks(
+        self,
+        views_per_user_min: int,
+        views_per_user_max: int,
+        like_probability_multiplier: float,
+        seed: Optional[int],
+        users_per_block: int,
+        include_skills: bool,
+        workers: int = 1,
+        base_date: Optional[datetime] = None
+    ) -> Iterator[pd.DataFrame]:
+        """
+        ユーザーのまとまり（block）ごとにログを配列演算で生成
+        
+        ユーザーの出現順、ユーザー内ではMatch_Scoreの降順に一度だけ並べる。
+        ブロックの分け方はworkersに依存せず、各ブロックにはseedから
+        SeedSequence.spawnで作った独立した乱数列を割り当てるため、
+        並列実行しても結果は変わらない
+        
+        Args:
+            users_per_block: 1ブロックあたりのユーザー数
+            include_skills: user_skills/job_requirementsの文字列をログに含めるか
+            workers: 2以上の場合はブロックをプロセスプールで並列に生成
+        """
+        df = self.df
+        
+        # ユーザーを初出順に番号付けし、その中でMatch_Scoreが高い順に並べる
+        user_codes, unique_users = pd.factorize(df['User_ID'])
+        order = np.lexsort((-df['Match_Score'].to_numpy(), user_codes))
+        num_users = len(unique_users)
+        
+        state = {
+            'df': df,
+            'order': order,
+            'sorted_codes': user_codes[order],
+            'views_per_user_min': views_per_user_min,
+            'views_per_user_max': views_per_user_max,
+            'like_probability_multiplier': like_probability_multiplier,
+            'base_date': pd.Timestamp(base_date or datetime.now()),
+            'include_skills': include_skills,
+        }
+        
+        first_users = list(range(0, num_users, users_per_block))
+        tasks = [
+            (first_user, min(first_user + users_per_block, num_users), seed_sequence)
+            for first_user, seed_sequence in zip(
+                first_users,
+                np.random.SeedSequence(seed).spawn(len(first_users))
+            )
+        ]
+        
+        if workers <= 1 or len(tasks) <= 1:
+            for task in tasks:
+                yield _realistic_log_block(state, task)
+            return
+        
+        print(f"   ⚙️  Using {workers} workers ({len(tasks)} blocks)")
+        if 'fork' in multiprocessing.get_all_start_methods():
+            # forkした子プロセスはDataFrameをコピーオンライトで共有する
+            context = multiprocessing.get_context('fork')
+            _WORKER_STATE.update(state)
+            pool_args = {}
+        else:
+            context = multiprocessing.get_context()
+            pool_args = {'initializer': _init_log_worker, 'initargs': (state,)}
+        
+        try:
+            with context.Pool(workers, **pool_args) as pool:
+                # 投入済みのブロックを2 × workers個までに抑え、取り出しが遅くても
+                # 結果が親プロセスに溜まり続けないようにする。投入順に取り出すので、
+                # 出力の並びも単一プロセスと同じ
+                pending = deque()
+                for task in tasks:
+                    if len(pending) >= 2 * workers:
+                        yield pending.popleft().get()
+                    pending.append(pool.apply_async(_generate_log_block, (task,)))
+                while pending:
+                    yield pending.popleft().get()
+        finally:
+            _WORKER_STATE.clear()
+    
+    def iter_realistic_log_batches(
+        self,
+        batch_size: int = 1000000,
+        users_per_block: int = 10000,
+        views_per_user_min: int = 5,
+        views_per_user_max: int = 20,
+        like_probability_multiplier: float = 0.9,
+        seed: Optional[int] = None,
+        workers: int = 1,
+        base_date: Optional[datetime] = None
+    ) -> Iterator[pd.DataFrame]:
+        """
+        現実的なログを固定サイズのバッチで順に生成（メモリ使用量はバッチサイズで決まる）
+        
+        スキル文字列は各行に複製せず、user_id/job_idで
+        save_skill_tablesの参照テーブルを引く形にする
+        
+        Args:
+            batch_size: 1バッチの行数（最後のバッチのみ少なくなる）
+            users_per_block: 一度に生成するユーザー数
+            workers: ブロックを並列に生成するプロセス数
+        """
+        blocks = self._iter_realistic_log_blocks(
+            views_per_user_min,
+            views_per_user_max,
+            like_probability_multiplier,
+            seed,
+            users_per_block=users_per_block,
+            include_skills=False,
+            workers=workers,
+            base_date=base_date
+        )
+        return _rebatch(blocks, batch_size)
+    
+    def _generate_realistic_logs_loop(
+        self,
+        views_per_user_min: int,
+        views_per_user_max: int,
+        like_probability_multiplier: float
+    ) -> pd.DataFrame:
+        """
+        ユーザーごとにDataFrameを絞り込んで1行ずつ生成する従来の方式（比較用）
+        """
         logs = []
         unique_users = self.df['User_ID'].unique()
         
@@ -110,12 +430,7 @@ class UserInteractionLogGenerator:
                     'job_requirements': row['Job_Requirements']
                 })
         
-        logs_df = pd.DataFrame(logs)
-        print(f"\n✅ Generated {len(logs_df):,} interaction logs")
-        print(f"   - Likes: {(logs_df['action'] == 'like').sum():,} ({(logs_df['action'] == 'like').sum() / len(logs_df) * 100):.1f}%)")
-        print(f"   - Dislikes: {(logs_df['action'] == 'dislike').sum():,} ({(logs_df['action'] == 'dislike').sum() / len(logs_df) * 100):.1f}%)")
-        
-        return logs_df
+        return pd.DataFrame(logs)
     
     def generate_simple_logs(self) -> pd.DataFrame:
         """
@@ -123,29 +438,142 @@ class UserInteractionLogGenerator:
         """
         print("\n🔨 Generating simple interaction logs...")
         
-        logs = []
+        with self.metrics.stage('generate_simple', rows=len(self.df)):
+            logs_df = pd.concat(
+                list(self._iter_simple_log_blocks(len(self.df) or 1, include_skills=True)),
+                ignore_index=True
+            )
+        print(f"✅ Generated {len(logs_df):,} interaction logs")
         
-        for _, row in self.df.iterrows():
-            # Recommended=1 → like, Recommended=0 → dislike
-            action = 'like' if row['Recommended'] == 1 else 'dislike'
+        return logs_df
+    
+    def iter_simple_log_batches(self, batch_size: int = 1000000) -> Iterator[pd.DataFrame]:
+        """
+        シンプルなログを固定サイズのバッチで順に生成（スキル文字列は含めない）
+        """
+        return self._iter_simple_log_blocks(batch_size, include_skills=False)
+    
+    def _iter_simple_log_blocks(
+        self,
+        rows_per_block: int,
+        include_skills: bool
+    ) -> Iterator[pd.DataFrame]:
+        """
+        元の行を順にrows_per_block行ずつログに変換
+        """
+        for start in range(0, len(self.df), rows_per_block):
+            rows = self.df.iloc[start:start + rows_per_block]
             
+            # Recommended=1 → like, Recommended=0 → dislike
             # タイムスタンプは現在時刻（ダミー）
-            timestamp = datetime.now()
-            
-            logs.append({
-                'user_id': int(row['User_ID']),
-                'job_id': int(row['Job_ID']),
-                'action': action,
-                'timestamp': timestamp.isoformat(),
-                'match_score': float(row['Match_Score']),
-                'user_skills': row['User_Skills'],
-                'job_requirements': row['Job_Requirements']
+            logs = pd.DataFrame({
+                'user_id': rows['User_ID'].to_numpy(dtype=int),
+                'job_id': rows['Job_ID'].to_numpy(dtype=int),
+                'action': np.where(rows['Recommended'].to_numpy() == 1, 'like', 'dislike'),
+                'timestamp': datetime.now().isoformat(),
+                'match_score': rows['Match_Score'].to_numpy(dtype=float),
             })
+            if include_skills:
+                logs['user_skills'] = rows['User_Skills'].to_numpy()
+                logs['job_requirements'] = rows['Job_Requirements'].to_numpy()
+            yield logs
+    
+    def save_skill_tables(self, output_dir: str, format: str = 'parquet'):
+        """
+        ストリーミング出力のログから参照するスキルの表を保存
         
-        logs_df = pd.DataFrame(logs)
-        print(f"✅ Generated {len(logs_df):,} interaction logs")
+        - users: user_id → user_skills
+        - jobs: job_id → job_requirements
+        - user_skills / job_skills: (user_id / job_id, skill_id) の組み合わせ（skill_idはuint16）
+        - skills: skill_id → skill（語彙はvocabulary.jsonにも保存）
         
-        return logs_df
+        同じuser_id/job_idに異なるスキル文字列がある場合は、users/jobsにすべての文字列を残し、
+        user_skills/job_skillsはそれらのスキルの和集合（重複なし）にする
+        """
+        output = Path(output_dir)
+        output.mkdir(parents=True, exist_ok=True)
+        
+        users = self.df[['User_ID', 'User_Skills']].drop_duplicates().rename(
+            columns={'User_ID': 'user_id', 'User_Skills': 'user_skills'}
+        )
+        jobs = self.df[['Job_ID', 'Job_Requirements']].drop_duplicates().rename(
+            columns={'Job_ID': 'job_id', 'Job_Requirements': 'job_requirements'}
+        )
+        
+        # スキル文字列はユニークな値ごとに一度だけ整数コードへ変換
+        vocabulary = SkillVocabulary()
+        tables = [('users', users), ('jobs', jobs)]
+        for name, table, id_column, skill_column in [
+            ('user_skills', users, 'user_id', 'user_skills'),
+            ('job_skills', jobs, 'job_id', 'job_requirements'),
+        ]:
+            indptr, indices = vocabulary.encode_many(table[skill_column])
+            tables.append((name, pd.DataFrame({
+                id_column: np.repeat(table[id_column].to_numpy(), np.diff(indptr)),
+                'skill_id': indices,
+            }).drop_duplicates().reset_index(drop=True)))
+        tables.append(('skills', pd.DataFrame({
+            'skill_id': np.arange(len(vocabulary), dtype=np.uint16),
+            'skill': vocabulary.skills,
+        })))
+        
+        for name, table in tables:
+            _write_frame(table, output / f"{name}.{format}", format)
+        vocabulary.save(str(output / 'vocabulary.json'))
+    
+    def write_log_shards(
+        self,
+        batches: Iterable[pd.DataFrame],
+        output_dir: str,
+        format: str = 'parquet'
+    ) -> Dict:
+        """
+        ログのバッチをそのままシャードファイル（logs/part-00000.parquetなど）に書き出す
+        
+        出力ディレクトリには参照用のusers/jobsの表とmanifest.jsonも保存する。
+        全ログをメモリに集めないため、生成するログの総数に関係なく
+        メモリ使用量は1バッチ分に収まる
+        
+        一時ディレクトリに書いてから出力先を置き換えるため、同じ出力先に
+        バッチサイズや形式を変えて再実行しても前回のシャードは残らない
+        
+        Args:
+            batches: iter_realistic_log_batches / iter_simple_log_batchesの戻り値
+            output_dir: 出力ディレクトリ
+            format: 'parquet'または'csv'
+        
+        Returns:
+            書き出したシャード数と件数の集計
+        """
+        print(f"\n💾 Writing log shards to {output_dir}...")
+        output = Path(output_dir)
+        staging = output.with_name(output.name + '.tmp')
+        if staging.exists():
+            shutil.rmtree(staging)
+        (staging / 'logs').mkdir(parents=True)
+        
+        with self.metrics.stage('write_shards') as record:
+            summary = {'shards': 0, 'total_logs': 0, 'likes': 0, 'dislikes': 0}
+            for shard_index, batch in enumerate(batches):
+                _write_frame(batch, staging / 'logs' / f"part-{shard_index:05d}.{format}", format)
+                summary['shards'] += 1
+                summary['total_logs'] += len(batch)
+                summary['likes'] += int((batch['action'] == 'like').sum())
+                summary['dislikes'] += int((batch['action'] == 'dislike').sum())
+                print(f"   Wrote shard {shard_index} ({summary['total_logs']:,} logs)")
+            
+            self.save_skill_tables(str(staging), format)
+            record['rows'] = summary['total_logs']
+        
+        with open(staging / 'manifest.json', 'w', encoding='utf-8') as f:
+            json.dump({**summary, 'format': format}, f, indent=2, ensure_ascii=False)
+        
+        if output.exists():
+            shutil.rmtree(output)
+        os.replace(staging, output)
+        
+        print(f"   ✅ Saved {summary['total_logs']:,} logs in {summary['shards']} shards")
+        return summary
     
     def save_logs(self, logs_df: pd.DataFrame, output_path: str, format: str = 'csv'):
         """
@@ -158,12 +586,13 @@ class UserInteractionLogGenerator:
         """
         print(f"\n💾 Saving logs to {output_path}...")
         
-        if format == 'csv':
-            logs_df.to_csv(output_path, index=False)
-        elif format == 'json':
-            logs_df.to_json(output_path, orient='records', indent=2)
-        elif format == 'parquet':
-            logs_df.to_parquet(output_path, index=False)
+        with self.metrics.stage('save', rows=len(logs_df)):
+            if format == 'csv':
+                logs_df.to_csv(output_path, index=False)
+            elif format == 'json':
+                logs_df.to_json(output_path, orient='records', indent=2)
+            elif format == 'parquet':
+                logs_df.to_parquet(output_path, index=False)
         
         print(f"   ✅ Saved successfully!")
         
@@ -182,37 +611,157 @@ class UserInteractionLogGenerator:
         print(f"   - Max interactions per user: {user_interactions.max()}")
 
 
+def run_batch(
+    config: Dict,
+    checkpoint: Optional[StageCheckpoint] = None,
+    metrics: Optional[PipelineMetrics] = None
+) -> str:
+    """
+    設定に従って読み込み・ログ生成・保存を順に実行（バッチ実行用）
+    
+    checkpointを指定すると、各ステージ（load, generate, save / write_shards）の完了時に
+    出力をParquetで保存し、再実行時は入力ファイルと設定が同じ完了済みのステージを
+    保存した出力の読み込みで置き換える
+    
+    Args:
+        config: LOG_GENERATION_DEFAULTSと同じ項目の設定
+        checkpoint: チェックポイントの保存先
+        metrics: 各ステージの計測結果の記録先
+    
+    Returns:
+        出力ファイル（シャード出力の場合はディレクトリ）のパス
+    """
+    if config['shard_dir'] and config['format'] not in SHARD_FORMATS:
+        raise ValueError(f"シャード出力の保存形式は{'/'.join(SHARD_FORMATS)}のみ対応しています: {config['format']}")
+    checkpoint = checkpoint or StageCheckpoint(None)
+    base_date = datetime.fromisoformat(config['base_date']) if config['base_date'] else None
+    realistic = config['method'] == 'realistic'
+    
+    # ステージ1: 読み込み
+    load_key = stage_key('load', file_signature(config['input']))
+    if checkpoint.is_complete('load', load_key):
+        print("⏭️  Resuming from checkpoint: load")
+        generator = UserInteractionLogGenerator(str(checkpoint.frame_path('load', 'jobs')), metrics=metrics)
+    else:
+        if not Path(config['input']).exists():
+            raise FileNotFoundError(2, 'No such file', config['input'])
+        generator = UserInteractionLogGenerator(config['input'], metrics=metrics)
+        checkpoint.save('load', load_key, frames={'jobs': generator.df})
+    
+    # ログはワーカー数に依存しないため、workersはキーに含めない
+    generation = [config['method'], config['seed'], config['base_date']]
+    if config['shard_dir']:
+        # バッチごとにシャードファイルへ書き出す（ログ全体はメモリに集めない）
+        shard_key = stage_key('write_shards', load_key, generation, config['shard_dir'],
+                              config['format'], config['batch_size'])
+        if checkpoint.is_complete('write_shards', shard_key) and Path(config['shard_dir']).exists():
+            print(f"⏭️  Resuming from checkpoint: write_shards ({config['shard_dir']})")
+        else:
+            if realistic:
+                batches = generator.iter_realistic_log_batches(
+                    batch_size=config['batch_size'],
+                    seed=config['seed'],
+                    workers=config['workers'],
+                    base_date=base_date
+                )
+            else:
+                batches = generator.iter_simple_log_batches(batch_size=config['batch_size'])
+            summary = generator.write_log_shards(batches, config['shard_dir'], format=config['format'])
+            checkpoint.save('write_shards', shard_key, data=summary)
+        return config['shard_dir']
+    
+    # ステージ2: ログ生成
+    generate_key = stage_key('generate', load_key, generation)
+    if checkpoint.is_complete('generate', generate_key):
+        print("⏭️  Resuming from checkpoint: generate")
+        logs_df = checkpoint.load_frame('generate', 'logs')
+    else:
+        if realistic:
+            logs_df = generator.generate_realistic_logs(
+                views_per_user_min=5,
+                views_per_user_max=20,
+                like_probability_multiplier=0.9,
+                seed=config['seed'],
+                workers=config['workers'],
+                base_date=base_date
+            )
+        else:
+            logs_df = generator.generate_simple_logs()
+        checkpoint.save('generate', generate_key, frames={'logs': logs_df})
+    
+    # ステージ3: 保存（出力が消えていれば書き直す）
+    output_file = config['output'] or f"user_interaction_logs_{config['method']}.{config['format']}"
+    save_key = stage_key('save', generate_key, output_file, config['format'])
+    if checkpoint.is_complete('save', save_key) and Path(output_file).exists():
+        print(f"⏭️  Resuming from checkpoint: save ({output_file})")
+    else:
+        generator.save_logs(logs_df, output_file, format=config['format'])
+        checkpoint.save('save', save_key, data={'output': output_file})
+    return output_file
+
+
 def main():
     """
     メイン実行関数
+    
+    設定はコマンドライン引数か設定ファイル（--config）で指定する。
+    --checkpoint-dirを指定すると、失敗や再実行のときに完了済みのステージから再開する
     """
+    parser = argparse.ArgumentParser(description='ユーザーインタラクションログ生成ツール')
+    parser.add_argument('--config', help='設定ファイル（JSON、項目はLOG_GENERATION_DEFAULTSと同じ）')
+    parser.add_argument('--input', help='Job Recommendation Datasetのパス')
+    parser.add_argument(
+        '--method', choices=['realistic', 'simple'],
+        help='生成方法（realistic: タイムスタンプ・スワイプ時間などを含む、simple: Recommended列をそのまま使用）'
+    )
+    parser.add_argument('--workers', type=int, help='並列に生成するプロセス数')
+    parser.add_argument('--seed', type=int, help='乱数シード')
+    parser.add_argument(
+        '--base-date',
+        help='タイムスタンプの基準時刻（ISO形式）。--seedと合わせて指定すると出力を再現できる'
+    )
+    parser.add_argument('--output', help='出力ファイル（省略時はuser_interaction_logs_<method>.<format>）')
+    parser.add_argument('--shard-dir', help='指定した場合はバッチごとにシャードファイルへ書き出す')
+    parser.add_argument('--format', choices=['csv', 'json', 'parquet'], help='出力形式（--shard-dirではcsvまたはparquet）')
+    parser.add_argument('--batch-size', type=int, help='1シャードあたりの行数')
+    parser.add_argument('--checkpoint-dir', help='完了したステージの出力の保存先')
+    parser.add_argument(
+        '--no-resume', action='store_true', help='保存済みのチェックポイントを使わずに最初から実行する'
+    )
+    parser.add_argument('--metrics', help='ステージごとの計測結果を保存するJSONファイル')
+    parser.add_argument('--profile', action='store_true', help='各ステージをcProfileで計測する')
+    parser.add_argument('--profile-dir', help='cProfileの結果（.prof）の保存先')
+    parser.add_argument('--trace-memory', action='store_true', help='各ステージをtracemallocで計測する')
+    args = parser.parse_args()
+    config = load_batch_config(LOG_GENERATION_DEFAULTS, args.config, vars(args))
+    if config['shard_dir'] and config['format'] not in SHARD_FORMATS:
+        parser.error(f"--shard-dirを指定した場合、--formatは{'/'.join(SHARD_FORMATS)}のみ指定できます")
+    
     print("=" * 60)
     print("🚀 ユーザーインタラクションログ生成ツール")
     print("=" * 60)
     
-    # ログ生成器を初期化
-    generator = UserInteractionLogGenerator('Job Datsset.csv')
+    # 計測結果を保存・プロファイルする場合だけ、ステージごとの表示とピークRSSの計測を有効にする
+    measured = bool(config['metrics'] or args.profile or args.profile_dir or args.trace_memory)
+    metrics = PipelineMetrics(
+        profile=args.profile or bool(args.profile_dir),
+        trace_memory=args.trace_memory,
+        profile_dir=args.profile_dir,
+        verbose=measured,
+        track_rss=measured
+    )
+    checkpoint = StageCheckpoint(config['checkpoint_dir'], resume=not args.no_resume)
     
-    # 生成方法を選択
-    print("\n生成方法を選択してください:")
-    print("1. 現実的なログ生成（推奨）- タイムスタンプ、スワイプ時間など含む")
-    print("2. シンプルなログ生成 - Recommended列をそのまま使用")
-    
-    choice = input("\n選択 (1 or 2, default: 1): ").strip() or "1"
-    
-    if choice == "1":
-        logs_df = generator.generate_realistic_logs(
-            views_per_user_min=5,
-            views_per_user_max=20,
-            like_probability_multiplier=0.9
-        )
-        output_file = 'user_interaction_logs_realistic.csv'
-    else:
-        logs_df = generator.generate_simple_logs()
-        output_file = 'user_interaction_logs_simple.csv'
+    try:
+        output_file = run_batch(config, checkpoint, metrics)
+    except FileNotFoundError as e:
+        print(f"\n❌ 入力ファイルが見つかりません: {e.filename}")
+        sys.exit(1)
     
-    # ログを保存
-    generator.save_logs(logs_df, output_file, format='csv')
+    if measured:
+        metrics.print_summary()
+    if config['metrics']:
+        metrics.save(config['metrics'])
     
     print("\n" + "=" * 60)
     print("✅ 完了!")
@@ -6,30 +6,649 @@
 
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Optional
+from pandas.api.types import union_categoricals
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+from collections import Counter
+import argparse
+import hashlib
 import json
+import multiprocessing
+import os
+import re
+import shutil
+import sys
+import time
 from pathlib import Path
 
+from batch_pipeline import StageCheckpoint, file_signature, load_batch_config, stage_key
+from integrated_dataset import DATASET_INFO_FILE, read_integrated_dataset
+from pipeline_metrics import PipelineMetrics
+from skill_vocab import SkillVocabulary
+
+
+# 分割読み込み時に使うdtype（存在しない列は無視される）
+JOB_RECOMMENDATION_DTYPES = {
+    'User_ID': 'int32',
+    'User_Skills': 'category',
+    'Job_ID': 'int32',
+    'Job_Requirements': 'category',
+    'Match_Score': 'float32',
+    'Recommended': 'int8',
+}
+LINKEDIN_DTYPES = {
+    'company_name': 'category',
+    'location': 'category',
+    'formatted_work_type': 'category',
+    'formatted_experience_level': 'category',
+    'job_requirements': 'category',
+    'requirements': 'category',
+}
+SALARY_DTYPES = {
+    'work_year': 'int16',
+    'experience_level': 'category',
+    'employment_type': 'category',
+    'job_title': 'category',
+    'salary_currency': 'category',
+    'salary_in_usd': 'float64',
+    'employee_residence': 'category',
+    'remote_ratio': 'int16',
+    'company_location': 'category',
+    'company_size': 'category',
+}
+
+# スター形式の出力で、ファクト表の列に使う型
+STAR_FACT_DTYPES = {
+    'User_ID': 'int32',
+    'Job_ID': 'int32',
+    'Match_Score': 'float32',
+    'Recommended': 'int8',
+}
+
+# スター形式の次元表（表名 → (キー, キーごとに1つの値をとる列)）
+STAR_DIMENSIONS = {
+    'users': ('User_ID', ['User_Skills']),
+    'jobs': ('Job_ID', ['Job_Requirements']),
+}
+
+# スター形式の出力のメタデータファイル名
+STAR_SCHEMA_INFO_FILE = '_star_schema.json'
+
+# バッチ実行の設定項目と既定値（--configのJSONで上書きし、さらにコマンドライン引数で上書きする）
+INTEGRATION_DEFAULTS = {
+    'job_recommendation': 'Job Datsset.csv',
+    'linkedin': None,
+    'salary': None,
+    'output': 'integrated_job_dataset.csv',
+    'format': 'csv',
+    'report': 'integration_report.json',
+    'matching_method': 'index',
+    'tolerance': 0.7,
+    'workers': 1,
+    'chunksize': None,
+    'cache_dir': None,
+    'checkpoint_dir': None,
+    'metrics': None,
+}
+
+# Parquetで辞書エンコードするスキル列
+SKILL_COLUMNS = ['User_Skills', 'Job_Requirements']
+
+# 並列マッチングでワーカープロセスと共有する読み取り専用の状態
+# forkで起動した場合はコピーオンライトで共有され、タスクごとにpickleされない
+_WORKER_STATE: Dict = {}
+
+# 職種名の略語（小文字のトークン → 展開後の表記）
+TITLE_ABBREVIATIONS = {
+    'sr': 'senior',
+    'snr': 'senior',
+    'jr': 'junior',
+    'mgr': 'manager',
+    'eng': 'engineer',
+    'engr': 'engineer',
+    'dev': 'developer',
+    'ml': 'machine learning',
+    'swe': 'software engineer',
+    'dir': 'director',
+    'assoc': 'associate',
+}
+
+# 職種名の曖昧一致とみなす類似度（Dice係数）の下限
+SALARY_TITLE_MIN_SIMILARITY = 0.6
+
+# np.bitwise_countがない環境（NumPy 2.0未満）で使うバイトごとのビット数表
+_POPCOUNT_TABLE = np.array([bin(value).count('1') for value in range(256)], dtype=np.uint8)
+
+
+def _is_parquet_path(filepath: str) -> bool:
+    """
+    Parquetファイル、またはパーティション分割されたParquetディレクトリかどうか
+    """
+    path = Path(filepath)
+    return path.suffix == '.parquet' or path.is_dir()
+
+
+def job_bucket(job_ids: pd.Series, num_buckets: int) -> pd.Series:
+    """
+    Job_IDからパーティション番号（バケット）を求める
+    """
+    return (job_ids.astype('int64') % num_buckets).astype('int32')
+
+
+def _read_csv_chunked(filepath: str, chunksize: int, dtype: Dict) -> pd.DataFrame:
+    """
+    CSVを分割して読み込み、category列はカテゴリを統合したうえで連結する
+    
+    チャンクごとにカテゴリが異なるcategory列をそのまま連結するとobject型に
+    戻ってしまうため、union_categoricalsでまとめる
+    """
+    chunks = list(pd.read_csv(filepath, chunksize=chunksize, dtype=dtype))
+    if not chunks:
+        return pd.read_csv(filepath, dtype=dtype)
+    
+    columns = list(chunks[0].columns)
+    categorical = [
+        column for column in columns
+        if isinstance(chunks[0][column].dtype, pd.CategoricalDtype)
+    ]
+    df = pd.concat(
+        [chunk.drop(columns=categorical) for chunk in chunks],
+        ignore_index=True
+    )
+    for column in categorical:
+        df[column] = union_categoricals([chunk[column] for chunk in chunks])
+    return df[columns]
+
+
+def _score_skill_candidates(
+    requirements: List[int],
+    index: Dict,
+    tolerance: float
+) -> List[Dict]:
+    """
+    転置インデックスから候補を集め、tolerance以上のJaccard係数を持つ行だけを返す
+    
+    requirementsは重複のないスキルIDのリスト。
+    
+    Jaccard係数は min(|A|, |B|) / max(|A|, |B|) を超えないため、
+    サイズが離れすぎた行は交差数を数える前に除外する。
+    結果はLinkedIn Datasetの行順に並ぶ（総当たり方式と同じ順序）。
+    """
+    size = len(requirements)
+    if size == 0:
+        return []
+    
+    sizes = index['sizes']
+    postings = [index['postings'][skill] for skill in requirements if skill in index['postings']]
+    hits = np.concatenate(postings) if postings else np.empty(0, dtype=np.int64)
+    
+    if tolerance > 0:
+        # サイズによる枝刈り（浮動小数点誤差を考慮して少し緩める）
+        hit_sizes = sizes[hits]
+        hits = hits[
+            (hit_sizes >= tolerance * size - 1e-9) &
+            (size >= tolerance * hit_sizes - 1e-9)
+        ]
+        positions, intersections = np.unique(hits, return_counts=True)
+    else:
+        # tolerance <= 0 の場合は共通スキルのない行もマッチする
+        positions = np.flatnonzero(sizes > 0)
+        hit_positions, hit_counts = np.unique(hits, return_counts=True)
+        intersections = np.zeros(len(sizes), dtype=np.int64)
+        intersections[hit_positions] = hit_counts
+        intersections = intersections[positions]
+    
+    unions = size + sizes[positions] - intersections
+    similarities = intersections / unions
+    keep = similarities >= tolerance
+    
+    return [
+        {'linkedin_id': linkedin_id, 'similarity': similarity}
+        for linkedin_id, similarity in zip(
+            index['ids'][positions[keep]].tolist(),
+            similarities[keep].tolist()
+        )
+    ]
+
+
+def _popcount(words: np.ndarray) -> np.ndarray:
+    """
+    uint64配列の要素ごとの立っているビット数（uint8）を返す
+    """
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(words)
+    words = np.ascontiguousarray(words, dtype=np.uint64)
+    return _POPCOUNT_TABLE[words.view(np.uint8)].reshape(words.shape + (8,)).sum(axis=-1, dtype=np.uint8)
+
+
+def bitset_intersections(left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """
+    ビットセット（行数 × ワード数のuint64配列）同士の全ペアの共通ビット数を返す
+    
+    ワードごとにAND + popcountして足し合わせるため、一時配列は 左の行数 × 右の行数 に収まる
+    """
+    counts = np.zeros((len(left), len(right)), dtype=np.int32)
+    for word in range(left.shape[1]):
+        counts += _popcount(left[:, word, None] & right[None, :, word])
+    return counts
+
+
+def bitset_jaccard(
+    left: np.ndarray,
+    right: np.ndarray,
+    left_sizes: Optional[np.ndarray] = None,
+    right_sizes: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    ビットセット同士の全ペアのJaccard係数（float32、どちらかが空集合なら0）を返す
+    
+    和集合のサイズは |A| + |B| - |A ∩ B| で求める
+    """
+    if left_sizes is None:
+        left_sizes = _popcount(left).sum(axis=1, dtype=np.int32)
+    if right_sizes is None:
+        right_sizes = _popcount(right).sum(axis=1, dtype=np.int32)
+    intersections = bitset_intersections(left, right)
+    unions = left_sizes[:, None] + right_sizes[None, :] - intersections
+    similarities = intersections / np.maximum(unions, 1)
+    similarities[(left_sizes[:, None] == 0) | (right_sizes[None, :] == 0)] = 0
+    return similarities.astype(np.float32)
+
+
+def skill_signature(skills: List[str]) -> int:
+    """
+    正規化したスキル名のソート済みリストから、スキル集合のシグネチャ（64ビットのハッシュ）を作成
+    
+    スキル語彙のID（実行ごとに変わりうる）ではなくスキル名から作るため、
+    実行をまたいで同じスキル集合は同じシグネチャになる
+    """
+    digest = hashlib.blake2b('\x1f'.join(skills).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little', signed=True)
+
+
+def _collect_matches(
+    job_id_mapping: Dict,
+    job_ids: List,
+    linkedin_ids: List,
+    rows: np.ndarray,
+    cols: np.ndarray,
+    similarities: np.ndarray,
+    top_k: Optional[int]
+):
+    """
+    (Job_IDの行, LinkedInの行, 類似度) の組をjob_id_mappingに追加
+    
+    行ごとに類似度の降順（同点はLinkedInの行順）に並べ、top_k指定時は上位k件に絞る
+    """
+    order = np.lexsort((cols, -similarities, rows))
+    rows, cols, similarities = rows[order], cols[order], similarities[order]
+    if top_k is not None:
+        ranks = np.arange(len(rows)) - np.searchsorted(rows, rows)
+        keep = ranks < top_k
+        rows, cols, similarities = rows[keep], cols[keep], similarities[keep]
+    
+    for row, col, similarity in zip(rows.tolist(), cols.tolist(), similarities.tolist()):
+        job_id_mapping.setdefault(job_ids[row], []).append({
+            'linkedin_id': linkedin_ids[col],
+            'similarity': similarity
+        })
+
+
+def normalize_title_tokens(title: str) -> List[str]:
+    """
+    職種名を小文字の単語に分割し、略語を展開する（"Sr. Data Scientist" → senior, data, scientist）
+    """
+    tokens = []
+    for token in re.findall(r'[a-z0-9+#]+', str(title).lower()):
+        tokens.extend(TITLE_ABBREVIATIONS.get(token, token).split())
+    return tokens
+
+
+def _title_trigrams(tokens: List[str]) -> set:
+    """
+    正規化した職種名の文字3-gramの集合（綴りの揺れの吸収に使う）
+    """
+    text = f"  {' '.join(tokens)} "
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class SalaryTitleIndex:
+    """給与データの職種名に対する曖昧一致の索引"""
+    
+    def __init__(self, titles: List[str], min_similarity: float = SALARY_TITLE_MIN_SIMILARITY):
+        """
+        初期化
+        
+        Args:
+            titles: 給与データの職種名（job_title_normalized）
+            min_similarity: 曖昧一致とみなすDice係数の下限
+        """
+        self.titles = list(titles)
+        self.min_similarity = min_similarity
+        self.exact = {title: position for position, title in enumerate(self.titles)}
+        
+        # 単語と文字3-gramの転置インデックス（職種名の数に比例する大きさ）
+        self.token_sets = [set(normalize_title_tokens(title)) for title in self.titles]
+        self.trigram_sets = [
+            _title_trigrams(normalize_title_tokens(title)) for title in self.titles
+        ]
+        self.token_postings = self._postings(self.token_sets)
+        self.trigram_postings = self._postings(self.trigram_sets)
+    
+    @staticmethod
+    def _postings(sets: List[set]) -> Dict[str, List[int]]:
+        postings: Dict[str, List[int]] = {}
+        for position, items in enumerate(sets):
+            for item in items:
+                postings.setdefault(item, []).append(position)
+        return postings
+    
+    def _best(self, query: set, sets: List[set], postings: Dict[str, List[int]]) -> Optional[Tuple[int, float]]:
+        """
+        共通要素を持つ職種名だけを候補にし、Dice係数が最大のもの（同点は先のもの）を返す
+        """
+        overlaps = Counter()
+        for item in query:
+            overlaps.update(postings.get(item, ()))
+        best = None
+        for position, overlap in overlaps.items():
+            score = 2 * overlap / (len(query) + len(sets[position]))
+            if best is None or (score, -position) > (best[1], -best[0]):
+                best = (position, score)
+        if best is None or best[1] < self.min_similarity:
+            return None
+        return best
+    
+    def match(self, title: str) -> Optional[Tuple[int, float]]:
+        """
+        職種名に対応する給与データの職種の位置と類似度を返す（見つからない場合はNone）
+        
+        小文字化した職種名の完全一致、単語の一致、文字3-gramの一致の順に探す
+        """
+        key = str(title).lower().strip()
+        if key in self.exact:
+            return self.exact[key], 1.0
+        tokens = normalize_title_tokens(title)
+        if not tokens:
+            return None
+        return (
+            self._best(set(tokens), self.token_sets, self.token_postings)
+            or self._best(_title_trigrams(tokens), self.trigram_sets, self.trigram_postings)
+        )
+
+
+def _init_match_worker(state: Dict):
+    """
+    fork以外の起動方式で、ワーカーごとに一度だけ共有状態を受け取る
+    """
+    _WORKER_STATE.update(state)
+
+
+def _match_shard(bounds: tuple) -> List[tuple]:
+    """
+    Job_IDの一部（shard）を共有インデックスに対してマッチングする
+    """
+    start, stop = bounds
+    index = _WORKER_STATE['index']
+    tolerance = _WORKER_STATE['tolerance']
+    results = []
+    for job_id, requirements in zip(
+        _WORKER_STATE['job_ids'][start:stop],
+        _WORKER_STATE['requirement_codes'][start:stop]
+    ):
+        matches = _score_skill_candidates(requirements, index, tolerance)
+        if matches:
+            results.append((job_id, matches))
+    return results
+
+
+def _best_matches(job_id_mapping: Dict) -> Dict:
+    """
+    各Job_IDについて類似度が最も高いマッチ（同点は先に現れたもの）を返す
+    """
+    return {
+        job_id: max(matches, key=lambda m: m['similarity'])
+        for job_id, matches in job_id_mapping.items()
+        if matches
+    }
+
+
+def mapping_to_frame(mapping: Dict) -> pd.DataFrame:
+    """
+    マッチング結果（Job_ID → マッチのリスト）を1マッチ1行の表に変換（リスト内の順序を保つ）
+    """
+    return pd.DataFrame(
+        [
+            (job_id, match['linkedin_id'], match['similarity'])
+            for job_id, matches in mapping.items()
+            for match in matches
+        ],
+        columns=['Job_ID', 'linkedin_id', 'similarity']
+    )
+
+
+def mapping_from_frame(mapping_df: pd.DataFrame) -> Dict:
+    """
+    mapping_to_frameで作成した表をマッチング結果の辞書に戻す
+    """
+    mapping: Dict = {}
+    for job_id, linkedin_id, similarity in zip(
+        mapping_df['Job_ID'].tolist(),
+        mapping_df['linkedin_id'].tolist(),
+        mapping_df['similarity'].tolist()
+    ):
+        mapping.setdefault(job_id, []).append({
+            'linkedin_id': linkedin_id,
+            'similarity': similarity
+        })
+    return mapping
+
+
+def split_star_schema(rows: pd.DataFrame, attributes: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """
+    ユーザー×求人の行と求人単位の情報を、ファクト表と次元表（users, jobs）に分ける
+    
+    スキル列はキー（User_ID / Job_ID）ごとに値が1つに決まる場合だけ次元表に移し、
+    そうでなければファクト表にcategory型で残す（元の行を失わない）。
+    スキルのリスト列（*_List）は文字列から作り直せるため保存しない
+    
+    Args:
+        rows: Job Recommendation Datasetの行
+        attributes: build_job_attributesの結果（Job_IDごとに1行）
+    
+    Returns:
+        {'facts': ..., 'users': ..., 'jobs': ...}
+    """
+    facts = rows[[column for column in rows.columns if not column.endswith('_List')]]
+    tables = {}
+    moved = []
+    for name, (key, columns) in STAR_DIMENSIONS.items():
+        keys = facts[[key]].drop_duplicates()
+        dependent = [
+            column for column in columns
+            if column in facts.columns and len(facts[[key, column]].drop_duplicates()) == len(keys)
+        ]
+        tables[name] = facts[[key] + dependent].drop_duplicates(key).reset_index(drop=True)
+        moved.extend(dependent)
+    
+    # 求人単位の情報をjobs表に結合（列名が重なる場合はワイド形式と同じ接尾辞を付ける）
+    overlap = {
+        column: f'{column}_linkedin' for column in attributes.columns
+        if column != 'Job_ID' and column in rows.columns
+    }
+    tables['jobs'] = tables['jobs'].merge(attributes.rename(columns=overlap), on='Job_ID', how='left')
+    
+    facts = facts.drop(columns=moved)
+    facts = facts.astype({
+        column: dtype for column, dtype in STAR_FACT_DTYPES.items() if column in facts.columns
+    })
+    for column in SKILL_COLUMNS:
+        if column in facts.columns and not isinstance(facts[column].dtype, pd.CategoricalDtype):
+            facts[column] = facts[column].astype('category')
+    tables['facts'] = facts.reset_index(drop=True)
+    tables['columns'] = [column for column in rows.columns if not column.endswith('_List')] + [
+        overlap.get(column, column) for column in attributes.columns if column != 'Job_ID'
+    ]
+    return tables
+
+
+class StarSchemaView:
+    """スター形式の統合データセットを、必要な列だけその場で結合して見せるクラス"""
+    
+    def __init__(self, source: Union[str, Dict]):
+        """
+        初期化
+        
+        Args:
+            source: save_integrated_dataset(format='star')の出力ディレクトリ、
+                またはsplit_star_schemaの結果
+        """
+        self._tables: Dict[str, pd.DataFrame] = {}
+        if isinstance(source, dict):
+            self.path = None
+            self._tables = {name: source[name] for name in ['facts', 'users', 'jobs']}
+            self.columns: List[str] = list(source['columns'])
+        else:
+            self.path = Path(source)
+            with open(self.path / STAR_SCHEMA_INFO_FILE, encoding='utf-8') as f:
+                self.columns = json.load(f)['columns']
+    
+    def table(self, name: str) -> pd.DataFrame:
+        """
+        ファクト表または次元表（初めて使うときにメモリマップで読み込む）
+        """
+        if name not in self._tables:
+            self._tables[name] = pd.read_parquet(self.path / f'{name}.parquet', memory_map=True)
+        return self._tables[name]
+    
+    @property
+    def facts(self) -> pd.DataFrame:
+        return self.table('facts')
+    
+    def __len__(self) -> int:
+        return len(self.facts)
+    
+    def to_wide(self, columns: Optional[List[str]] = None, rows: Optional[slice] = None) -> pd.DataFrame:
+        """
+        ワイド形式（integrate_datasetsの結果と同じ列）のDataFrameを作成
+        
+        Args:
+            columns: 必要な列（省略時はすべての列）。指定した列の次元表だけを結合する
+            rows: ファクト表の行の範囲
+        """
+        columns = self.columns if columns is None else columns
+        facts = self.facts if rows is None else self.facts.iloc[rows]
+        wide = facts[[column for column in facts.columns if column in columns]].reset_index(drop=True)
+        for name, (key, _) in STAR_DIMENSIONS.items():
+            dimension = self.table(name)
+            needed = [column for column in dimension.columns if column != key and column in columns]
+            if not needed:
+                continue
+            positions = pd.Index(dimension[key]).get_indexer(facts[key])
+            joined = dimension[needed].iloc[np.maximum(positions, 0)].reset_index(drop=True)
+            joined[positions < 0] = np.nan
+            wide = pd.concat([wide, joined], axis=1)
+        return wide[[column for column in columns if column in wide.columns]]
+    
+    def iter_wide(self, batch_size: int = 100000, columns: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+        """
+        ワイド形式をbatch_size行ずつ作成（全体を一度にメモリに展開しない）
+        """
+        for start in range(0, len(self), batch_size):
+            yield self.to_wide(columns, rows=slice(start, start + batch_size))
+    
+    def summary(self) -> Dict:
+        """
+        ワイド形式に展開せずに、統合データセットの件数を集計
+        
+        求人単位の列（job_title, avg_salary_usd）は、ファクト表の求人ごとの行数とjobs表の値から数える
+        """
+        rows_per_job = self.facts['Job_ID'].value_counts()
+        jobs = self.table('jobs')
+        summary = {'total_rows': len(self.facts), 'unique_jobs': len(rows_per_job)}
+        for field, column in [('linkedin_matched', 'job_title'), ('salary_matched', 'avg_salary_usd')]:
+            if column in self.facts.columns:
+                summary[field] = int(self.facts[column].notna().sum())
+            elif column in jobs.columns:
+                matched = jobs.loc[jobs[column].notna(), 'Job_ID']
+                summary[field] = int(rows_per_job.reindex(matched, fill_value=0).sum())
+            else:
+                summary[field] = 0
+        return summary
+
+
+def _summarize_integrated(df: pd.DataFrame) -> Dict:
+    """
+    統合データセット（またはその一部）の件数を集計
+    """
+    return {
+        'total_rows': len(df),
+        'unique_jobs': int(df['Job_ID'].nunique()),
+        'linkedin_matched': int(df['job_title'].notna().sum()) if 'job_title' in df else 0,
+        'salary_matched': int(df['avg_salary_usd'].notna().sum()) if 'avg_salary_usd' in df else 0,
+    }
+
 
 class DatasetIntegrator:
     """データセット統合クラス"""
     
-    def __init__(self):
+    def __init__(self, cache_dir: Optional[str] = None, metrics: Optional[PipelineMetrics] = None):
+        """
+        初期化
+        
+        Args:
+            cache_dir: 指定した場合、読み込んだCSVをParquetとして保存し、
+                次回以降はCSVを解析せずにメモリマップで読み込む
+            metrics: 各ステージの計測結果の記録先（省略時は新しく作成）
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.metrics = metrics or PipelineMetrics()
         self.job_recommendation_df: Optional[pd.DataFrame] = None
         self.linkedin_jobs_df: Optional[pd.DataFrame] = None
         self.salary_df: Optional[pd.DataFrame] = None
         self.integrated_df: Optional[pd.DataFrame] = None
+        # スター形式で統合した場合のファクト表と次元表（split_star_schemaの結果）
+        self.star_schema: Optional[Dict] = None
+        self._linkedin_index: Optional[Dict] = None
+        self._salary_cache: Optional[Dict] = None
+        # 直近の給与データ結合の集計（一致率と処理時間）
+        self.salary_stats: Optional[Dict] = None
+        # 直近のスキルマッチングの集計（シグネチャ数と再利用した類似度の数）
+        self.matching_stats: Optional[Dict] = None
+        # スキル語彙（スキル名 ⇔ ID）
+        self.skill_vocabulary = SkillVocabulary()
     
-    def load_job_recommendation(self, filepath: str) -> pd.DataFrame:
+    def load_job_recommendation(
+        self,
+        filepath: str,
+        chunksize: Optional[int] = None
+    ) -> pd.DataFrame:
         """
         現在のJob Recommendation Datasetを読み込む
+        
+        Args:
+            filepath: CSVファイル、Parquetファイルまたはパーティション分割されたディレクトリのパス
+            chunksize: 指定した場合は分割して読み込み、明示的なdtypeとcategory型を使う。
+                スキルは文字列のリスト列を作らず、category型のまま保持する
+                （マッチングではユニークな要件ごとにスキル語彙でコード化される）
         """
         print(f"📖 Loading Job Recommendation Dataset from {filepath}...")
-        df = pd.read_csv(filepath)
         
-        # スキルをリストに変換
-        df['User_Skills_List'] = df['User_Skills'].str.split(', ')
-        df['Job_Requirements_List'] = df['Job_Requirements'].str.split(', ')
+        with self.metrics.stage('load_job_recommendation') as record:
+            df = self._read_source(filepath, chunksize, JOB_RECOMMENDATION_DTYPES)
+            record['rows'] = len(df)
+        
+        with self.metrics.stage('normalize_skills', rows=len(df)):
+            if chunksize is None:
+                # スキルをリストに変換
+                if 'User_Skills_List' not in df.columns:
+                    df['User_Skills_List'] = self.split_skill_column(df['User_Skills'])
+                if 'Job_Requirements_List' not in df.columns:
+                    df['Job_Requirements_List'] = self.split_skill_column(df['Job_Requirements'])
+            else:
+                # 繰り返しの多いスキル文字列はcategory型で1回だけ保持
+                for column in SKILL_COLUMNS:
+                    if column in df.columns and not isinstance(df[column].dtype, pd.CategoricalDtype):
+                        df[column] = df[column].astype('category')
         
         print(f"   ✅ Loaded {len(df)} rows")
         print(f"   📊 Unique Users: {df['User_ID'].nunique()}")
@@ -38,12 +657,22 @@ class DatasetIntegrator:
         self.job_recommendation_df = df
         return df
     
-    def load_linkedin_jobs(self, filepath: str) -> pd.DataFrame:
+    def load_linkedin_jobs(
+        self,
+        filepath: str,
+        chunksize: Optional[int] = None
+    ) -> pd.DataFrame:
         """
         LinkedIn Job Postings Datasetを読み込む
+        
+        Args:
+            filepath: CSVファイルまたはParquetファイルのパス
+            chunksize: 指定した場合は分割して読み込み、繰り返しの多い文字列列をcategory型にする
         """
         print(f"📖 Loading LinkedIn Job Postings from {filepath}...")
-        df = pd.read_csv(filepath)
+        with self.metrics.stage('load_linkedin_jobs') as record:
+            df = self._read_source(filepath, chunksize, LINKEDIN_DTYPES)
+            record['rows'] = len(df)
         
         # job_idを標準化（小文字/大文字の統一）
         if 'job_id' in df.columns:
@@ -56,46 +685,784 @@ class DatasetIntegrator:
         print(f"   📊 Unique Jobs: {df['job_id'].nunique()}")
         
         self.linkedin_jobs_df = df
+        self._linkedin_index = None
         return df
     
-    def load_salary_data(self, filepath: str) -> pd.DataFrame:
+    def load_salary_data(
+        self,
+        filepath: str,
+        chunksize: Optional[int] = None
+    ) -> pd.DataFrame:
         """
         Data Science Job Salaries Datasetを読み込む
+        
+        Args:
+            filepath: CSVファイルまたはParquetファイルのパス
+            chunksize: 指定した場合は分割して読み込み、明示的なdtypeを使う
         """
         print(f"📖 Loading Salary Data from {filepath}...")
-        df = pd.read_csv(filepath)
+        with self.metrics.stage('load_salary') as record:
+            df = self._read_source(filepath, chunksize, SALARY_DTYPES)
+            record['rows'] = len(df)
+        
+        # job_titleを標準化
+        if 'job_title' in df.columns:
+            df['job_title_normalized'] = df['job_title'].str.lower().str.strip()
+        
+        print(f"   ✅ Loaded {len(df)} rows")
+        
+        self.salary_df = df
+        self._salary_cache = None
+        return df
+    
+    def _read_source(
+        self,
+        filepath: str,
+        chunksize: Optional[int],
+        dtype: Dict
+    ) -> pd.DataFrame:
+        """
+        CSVまたはParquetを読み込む
+        
+        Parquetはメモリマップで読み込む。cache_dirが指定されていればCSVの内容を
+        Parquetにキャッシュし、ファイルが変わらない限り次回はCSVを解析しない
+        """
+        if _is_parquet_path(filepath):
+            df = pd.read_parquet(filepath, memory_map=True)
+            return df.drop(columns=['job_bucket'], errors='ignore')
+        
+        cache_path = None
+        if self.cache_dir is not None:
+            stat = os.stat(filepath)
+            key = hashlib.sha1(
+                f"{Path(filepath).resolve()}:{stat.st_size}:{stat.st_mtime_ns}:{chunksize is not None}".encode()
+            ).hexdigest()[:16]
+            cache_path = self.cache_dir / f"{Path(filepath).stem}-{key}.parquet"
+            if cache_path.exists():
+                print(f"   ⚡ Using Parquet cache {cache_path}")
+                return pd.read_parquet(cache_path, memory_map=True)
+        
+        if chunksize is None:
+            df = pd.read_csv(filepath)
+        else:
+            df = _read_csv_chunked(filepath, chunksize, dtype)
+        
+        if cache_path is not None:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            df.to_parquet(cache_path, index=False)
+        return df
+    
+    def split_skill_column(self, column: pd.Series) -> pd.Series:
+        """
+        スキル文字列の列を表示用スキル名のリストの列に変換
+        
+        ユニークな文字列ごとに一度だけ分割し、同じ文字列の行は同じリストを共有する
+        """
+        row_codes, uniques = pd.factorize(column)
+        lists = np.empty(len(uniques) + 1, dtype=object)
+        lists[:-1] = [self.skill_vocabulary.names(requirements) for requirements in uniques]
+        lists[-1] = np.nan
+        return pd.Series(lists[row_codes], index=column.index)
+    
+    def normalize_job_requirements(self, requirements: str) -> List[str]:
+        """
+        スキル要件を正規化してリストに変換（大文字小文字と別名を統一し、重複を除く）
+        """
+        return self.skill_vocabulary.split(requirements)
+    
+    def _linkedin_requirements_column(self, linkedin_jobs_df: Optional[pd.DataFrame] = None) -> Optional[str]:
+        """
+        LinkedIn Datasetのスキル要件カラム名を返す（存在しない場合はNone）
+        
+        Args:
+            linkedin_jobs_df: 対象のLinkedIn Dataset（省略時は読み込み済みのもの）
+        """
+        df = self.linkedin_jobs_df if linkedin_jobs_df is None else linkedin_jobs_df
+        for column in ('job_requirements', 'requirements'):
+            if column in df.columns:
+                return column
+        return None
+    
+    def build_skill_matrices(
+        self,
+        job_requirements: pd.DataFrame,
+        linkedin_jobs_df: Optional[pd.DataFrame] = None
+    ):
+        """
+        Job_RequirementsとLinkedInのスキル要件を共通の語彙でCSR二値行列に変換
+        
+        Args:
+            linkedin_jobs_df: 対象のLinkedIn Dataset（省略時は読み込み済みのもの）
+        
+        Returns:
+            (求人側の行列, LinkedIn側の行列, スキル語彙のリスト)
+        """
+        from scipy import sparse
+        
+        job_parts = self.skill_vocabulary.encode_many(job_requirements['Job_Requirements'])
+        linkedin_parts = self._linkedin_skill_codes(linkedin_jobs_df)
+        
+        def to_csr(parts: tuple) -> 'sparse.csr_matrix':
+            indptr, indices = parts
+            return sparse.csr_matrix(
+                (
+                    np.ones(len(indices), dtype=np.int32),
+                    indices.astype(np.int32),
+                    indptr
+                ),
+                shape=(len(indptr) - 1, len(self.skill_vocabulary))
+            )
+        
+        return to_csr(job_parts), to_csr(linkedin_parts), list(self.skill_vocabulary.skills)
+    
+    def _linkedin_skill_codes(self, linkedin_jobs_df: Optional[pd.DataFrame] = None) -> tuple:
+        """
+        LinkedIn Datasetのスキル要件をCSR形式のスキルID（indptr, indices）に変換
+        """
+        df = self.linkedin_jobs_df if linkedin_jobs_df is None else linkedin_jobs_df
+        column = self._linkedin_requirements_column(df)
+        if column is None:
+            return np.zeros(len(df) + 1, dtype=np.int64), np.empty(0, dtype=np.uint16)
+        return self.skill_vocabulary.encode_many(df[column])
+    
+    def build_skill_bitsets(
+        self,
+        job_requirements: pd.DataFrame,
+        linkedin_jobs_df: Optional[pd.DataFrame] = None
+    ) -> tuple:
+        """
+        Job_RequirementsとLinkedInのスキル要件を共通の語彙でビットセットに変換
+        
+        スキルの種類が64以下なら1行あたりuint64の1ワードに収まる
+        
+        Args:
+            linkedin_jobs_df: 対象のLinkedIn Dataset（省略時は読み込み済みのもの）
+        
+        Returns:
+            (求人側のビットセット, LinkedIn側のビットセット)。形状は 行数 × ワード数
+        """
+        job_parts = self.skill_vocabulary.encode_many(job_requirements['Job_Requirements'])
+        linkedin_parts = self._linkedin_skill_codes(linkedin_jobs_df)
+        # 両方を語彙に登録してからワード数を決める
+        return (
+            self.skill_vocabulary.to_bitsets(*job_parts),
+            self.skill_vocabulary.to_bitsets(*linkedin_parts)
+        )
+    
+    def skill_similarity_matrix(self, left: pd.Series, right: pd.Series) -> np.ndarray:
+        """
+        2つのスキル列の全ペアのJaccard係数行列（float32、形状は len(left) × len(right)）を返す
+        
+        求人×LinkedIn求人や、ユーザーのUser_Skills×求人のJob_Requirementsの比較に使う
+        """
+        left_parts = self.skill_vocabulary.encode_many(left)
+        right_parts = self.skill_vocabulary.encode_many(right)
+        return bitset_jaccard(
+            self.skill_vocabulary.to_bitsets(*left_parts),
+            self.skill_vocabulary.to_bitsets(*right_parts),
+            np.diff(left_parts[0]).astype(np.int32),
+            np.diff(right_parts[0]).astype(np.int32)
+        )
+    
+    def build_linkedin_skill_index(self, linkedin_jobs_df: Optional[pd.DataFrame] = None) -> Dict:
+        """
+        LinkedIn Datasetのスキル転置インデックス（スキルID → 行番号）を構築
+        
+        読み込み済みのLinkedIn Datasetのインデックスは保持して再利用する。
+        linkedin_jobs_dfに別のDataFrame（シグネチャや変更された行だけの表など）を
+        指定した場合は、保持しているインデックスを変えずにその場で構築する
+        """
+        df = self.linkedin_jobs_df if linkedin_jobs_df is None else linkedin_jobs_df
+        if df is None:
+            raise ValueError("LinkedIn Datasetが読み込まれていません")
+        
+        loaded = df is self.linkedin_jobs_df
+        if loaded and self._linkedin_index is not None and self._linkedin_index['source'] is df:
+            return self._linkedin_index
+        
+        indptr, indices = self._linkedin_skill_codes(df)
+        sizes = np.diff(indptr)
+        
+        # スキルIDで安定ソートすると、各スキルの行番号が昇順に連続して並ぶ
+        rows = np.repeat(np.arange(len(df), dtype=np.int64), sizes)
+        order = np.argsort(indices, kind='stable')
+        skill_ids, starts = np.unique(indices[order], return_index=True)
+        postings = np.split(rows[order], starts[1:])
+        
+        index = {
+            'source': df,
+            'postings': dict(zip(skill_ids.tolist(), postings)) if len(skill_ids) else {},
+            'sizes': sizes,
+            'ids': df['job_id'].to_numpy(),
+        }
+        if loaded:
+            self._linkedin_index = index
+        return index
+    
+    def _linkedin_positions(self, linkedin_jobs_df: Optional[pd.DataFrame] = None) -> Dict:
+        """
+        LinkedInのjob_id → LinkedIn Datasetで最初に現れる行番号（同点のマッチの並び順に使う）
+        """
+        df = self.linkedin_jobs_df if linkedin_jobs_df is None else linkedin_jobs_df
+        positions: Dict = {}
+        for position, linkedin_id in enumerate(df['job_id'].tolist()):
+            positions.setdefault(linkedin_id, position)
+        return positions
+    
+    def match_jobs_by_skills(
+        self,
+        tolerance: float = 0.7,
+        method: str = 'index',
+        top_k: Optional[int] = None,
+        chunk_size: int = 1024,
+        workers: int = 1,
+        job_requirements: Optional[pd.DataFrame] = None,
+        dedupe: bool = True,
+        linkedin_jobs_df: Optional[pd.DataFrame] = None
+    ) -> Dict:
+        """
+        スキル要件を使ってJob_IDとjob_idをマッチング
+        
+        Args:
+            tolerance: マッチとみなすJaccard係数の下限
+            method: 'index'（転置インデックスで候補を絞り込む）、
+                'matrix'（疎行列積でまとめて計算する）、
+                'bitset'（スキル集合をuint64のビットセットにしてpopcountで計算する）、
+                'exact'（全ペアを比較する従来の方式）のいずれか
+            top_k: 指定した場合、各Job_IDにつき類似度の高い順に上位k件だけ残す
+            chunk_size: 'matrix'/'bitset'方式で一度に計算するJob_IDの行数
+            workers: 'index'方式で使うプロセス数（2以上でJob_IDを分割して並列実行）
+            job_requirements: マッチングするJob_IDとJob_Requirementsの組み合わせ
+                （省略時は読み込み済みのJob Recommendation Datasetから作成）
+            dedupe: Trueの場合、スキル集合が同じ行をシグネチャにまとめて
+                シグネチャの組ごとに一度だけ類似度を計算する（'exact'方式では使わない）
+            linkedin_jobs_df: マッチングするLinkedInの行（省略時は読み込み済みのLinkedIn Dataset）。
+                一部の行だけを指定した場合、シグネチャの組の類似度のメモは読むだけで更新しない
+        
+        Returns:
+            Job_ID → [{'linkedin_id', 'similarity'}, ...] の辞書。
+            'index'と'exact'はLinkedIn Datasetの行順、
+            'matrix'/'bitset'またはtop_k指定時は類似度の降順（同点はLinkedIn Datasetの行順）に並ぶ
+        """
+        if job_requirements is None and self.job_recommendation_df is not None:
+            # ユニークなJob_IDとJob_Requirementsの組み合わせを取得
+            job_requirements = self.job_recommendation_df[
+                ['Job_ID', 'Job_Requirements']
+            ].drop_duplicates()
+        
+        if linkedin_jobs_df is None:
+            linkedin_jobs_df = self.linkedin_jobs_df
+        if job_requirements is None or linkedin_jobs_df is None:
+            raise ValueError("必要なデータセットが読み込まれていません")
+        
+        print("\n🔍 Matching jobs by skill requirements...")
+        
+        if workers > 1 and method != 'index':
+            raise ValueError("並列マッチングは'index'方式のみ対応しています")
+        
+        if method not in ('index', 'matrix', 'bitset', 'exact'):
+            raise ValueError(f"未対応のマッチング方式です: {method}")
+        
+        with self.metrics.stage('match', rows=len(job_requirements)):
+            if dedupe and method != 'exact':
+                job_id_mapping = self._match_jobs_deduplicated(
+                    job_requirements, linkedin_jobs_df, tolerance, method, top_k, chunk_size, workers
+                )
+            else:
+                self.matching_stats = None
+                job_id_mapping = self._match_rows(
+                    job_requirements, linkedin_jobs_df, tolerance, method, top_k, chunk_size, workers
+                )
+            
+            if method in ('matrix', 'bitset') or top_k is not None:
+                # 類似度の降順に並べ替え（同じJob_IDの複数の要件にまたがる同点もLinkedInの行順にする）
+                positions = self._linkedin_positions(linkedin_jobs_df)
+                job_id_mapping = {
+                    job_id: sorted(
+                        matches, key=lambda m: (-m['similarity'], positions[m['linkedin_id']])
+                    )[:top_k]
+                    for job_id, matches in job_id_mapping.items()
+                }
+        
+        print(f"   ✅ Matched {len(job_id_mapping)} jobs")
+        return job_id_mapping
+    
+    def _match_rows(
+        self,
+        job_requirements: pd.DataFrame,
+        linkedin_jobs_df: pd.DataFrame,
+        tolerance: float,
+        method: str,
+        top_k: Optional[int],
+        chunk_size: int,
+        workers: int
+    ) -> Dict:
+        """
+        job_requirementsの各行とlinkedin_jobs_dfの各行を指定した方式でマッチング
+        """
+        if method == 'exact':
+            return self._match_jobs_exact(job_requirements, linkedin_jobs_df, tolerance)
+        if method == 'index' and workers > 1:
+            return self._match_jobs_parallel(job_requirements, linkedin_jobs_df, tolerance, workers)
+        if method == 'matrix':
+            return self._match_jobs_matrix(job_requirements, linkedin_jobs_df, tolerance, top_k, chunk_size)
+        if method == 'bitset':
+            return self._match_jobs_bitset(job_requirements, linkedin_jobs_df, tolerance, top_k, chunk_size)
+        
+        index = self.build_linkedin_skill_index(linkedin_jobs_df)
+        job_id_mapping = {}
+        for job_id, requirements in zip(
+            job_requirements['Job_ID'].tolist(),
+            job_requirements['Job_Requirements'].tolist()
+        ):
+            matches = _score_skill_candidates(
+                self.skill_vocabulary.encode(requirements).tolist(),
+                index,
+                tolerance
+            )
+            if matches:
+                job_id_mapping.setdefault(job_id, []).extend(matches)
+        return job_id_mapping
+    
+    def skill_signatures(self, values: pd.Series) -> tuple:
+        """
+        スキル要件の列を、スキル集合のシグネチャごとにまとめる
+        
+        同じ文字列は一度だけ分割し、表記や順序が違っても同じスキル集合の行は
+        同じシグネチャになる
+        
+        Returns:
+            (行ごとのシグネチャの番号（スキルがない行は-1）,
+             シグネチャ（int64の配列）, シグネチャごとの正規化したスキル要件の文字列)
+        """
+        value_codes, uniques = pd.factorize(values)
+        skills = [sorted(self.skill_vocabulary.split(value)) for value in uniques]
+        nonempty = [position for position, names in enumerate(skills) if names]
+        codes, signatures = pd.factorize(
+            np.array([skill_signature(skills[position]) for position in nonempty], dtype=np.int64)
+        )
+        
+        # 末尾の-1はNaN（factorizeのコード-1）に対応する
+        value_signatures = np.full(len(uniques) + 1, -1, dtype=np.int64)
+        value_signatures[nonempty] = codes
+        representatives: List[Optional[str]] = [None] * len(signatures)
+        for position, code in zip(nonempty, codes.tolist()):
+            if representatives[code] is None:
+                representatives[code] = ', '.join(skills[position])
+        return value_signatures[value_codes], np.asarray(signatures, dtype=np.int64), representatives
+    
+    def _score_signature_pairs(
+        self,
+        job_signatures: np.ndarray,
+        job_skills: List[str],
+        job_positions: np.ndarray,
+        linkedin_signatures: np.ndarray,
+        linkedin_skills: List[str],
+        linkedin_positions: np.ndarray,
+        tolerance: float,
+        method: str,
+        chunk_size: int,
+        workers: int
+    ) -> pd.DataFrame:
+        """
+        指定した位置のシグネチャ同士を、1シグネチャ1行としてマッチング
+        
+        Returns:
+            job_signature, linkedin_signature, similarity の表（tolerance以上の組だけ）
+        """
+        empty = pd.DataFrame({
+            'job_signature': pd.Series(dtype='int64'),
+            'linkedin_signature': pd.Series(dtype='int64'),
+            'similarity': pd.Series(dtype='float64'),
+        })
+        if len(job_positions) == 0 or len(linkedin_positions) == 0:
+            return empty
+        
+        job_requirements = pd.DataFrame({
+            'Job_ID': job_positions,
+            'Job_Requirements': [job_skills[position] for position in job_positions.tolist()],
+        })
+        # LinkedIn側もシグネチャ1つを1行とした表にする（インデックスはその場で構築される）
+        linkedin_signature_df = pd.DataFrame({
+            'job_id': linkedin_positions,
+            'job_requirements': [linkedin_skills[position] for position in linkedin_positions.tolist()],
+        })
+        mapping = self._match_rows(
+            job_requirements, linkedin_signature_df, tolerance, method, None, chunk_size, workers
+        )
+        
+        pairs = mapping_to_frame(mapping)
+        if len(pairs) == 0:
+            return empty
+        return pd.DataFrame({
+            'job_signature': job_signatures[pairs['Job_ID'].to_numpy(dtype=np.int64)],
+            'linkedin_signature': linkedin_signatures[pairs['linkedin_id'].to_numpy(dtype=np.int64)],
+            'similarity': pairs['similarity'].to_numpy(dtype=np.float64),
+        })
+    
+    def _match_jobs_deduplicated(
+        self,
+        job_requirements: pd.DataFrame,
+        linkedin_jobs_df: pd.DataFrame,
+        tolerance: float,
+        method: str,
+        top_k: Optional[int],
+        chunk_size: int,
+        workers: int
+    ) -> Dict:
+        """
+        スキル集合のシグネチャの組ごとに一度だけ類似度を計算し、
+        同じシグネチャを持つ全てのJob_IDとLinkedInの行に展開する
+        
+        cache_dirが指定されていれば、シグネチャの組の類似度をParquetに保存し、
+        次回以降は保存されていないシグネチャを含む組だけを計算する。
+        結果はシグネチャにまとめない場合と同じ（同点はLinkedIn Datasetの行順）。
+        メモは読み込み済みのLinkedIn Dataset全体とマッチングした場合だけ保存する
+        （一部の行とのマッチングでLinkedIn側のシグネチャを置き換えない）
+        """
+        column = self._linkedin_requirements_column(linkedin_jobs_df)
+        if column is None:
+            self.matching_stats = None
+            return {}
+        
+        job_rows, job_signatures, job_skills = self.skill_signatures(job_requirements['Job_Requirements'])
+        linkedin_rows, linkedin_signatures, linkedin_skills = self.skill_signatures(
+            linkedin_jobs_df[column]
+        )
+        
+        memo_path = self._signature_memo_path(tolerance)
+        memo = self._load_signature_memo(memo_path)
+        known_jobs = np.zeros(len(job_signatures), dtype=bool)
+        known_linkedin = np.zeros(len(linkedin_signatures), dtype=bool)
+        parts = []
+        if memo is not None:
+            known_jobs = np.isin(job_signatures, memo['jobs'])
+            known_linkedin = np.isin(linkedin_signatures, memo['linkedin'])
+            pairs = memo['pairs']
+            parts.append(pairs[
+                pairs['job_signature'].isin(job_signatures[known_jobs]) &
+                pairs['linkedin_signature'].isin(linkedin_signatures)
+            ])
+        reused = sum(len(part) for part in parts)
+        
+        # 新しい求人側のシグネチャは全てのLinkedIn側と、既知のものは新しいLinkedIn側とだけ比較
+        scored = [
+            self._score_signature_pairs(
+                job_signatures, job_skills, job_positions,
+                linkedin_signatures, linkedin_skills, linkedin_positions,
+                tolerance, method, chunk_size, workers
+            )
+            for job_positions, linkedin_positions in [
+                (np.flatnonzero(~known_jobs), np.arange(len(linkedin_signatures))),
+                (np.flatnonzero(known_jobs), np.flatnonzero(~known_linkedin)),
+            ]
+        ]
+        pairs = pd.concat(parts + scored, ignore_index=True)
+        
+        full_linkedin = linkedin_jobs_df is self.linkedin_jobs_df
+        if memo_path is not None and full_linkedin and not (known_jobs.all() and known_linkedin.all()):
+            if memo is not None and set(memo['linkedin'].tolist()) == set(linkedin_signatures.tolist()):
+                # LinkedIn側が同じなら、今回の求人側のシグネチャを追加する
+                self._save_signature_memo(
+                    memo_path,
+                    pd.concat([memo['pairs']] + scored, ignore_index=True),
+                    np.union1d(memo['jobs'], job_signatures),
+                    linkedin_signatures
+                )
+            else:
+                self._save_signature_memo(memo_path, pairs, job_signatures, linkedin_signatures)
+        
+        self.matching_stats = {
+            'job_rows': len(job_rows),
+            'job_signatures': len(job_signatures),
+            'linkedin_rows': len(linkedin_rows),
+            'linkedin_signatures': len(linkedin_signatures),
+            'signature_pairs': len(pairs),
+            'memo_reused_pairs': reused,
+        }
+        print(
+            f"   🧬 Signatures: {len(job_rows):,} job rows → {len(job_signatures):,}, "
+            f"{len(linkedin_rows):,} postings → {len(linkedin_signatures):,}"
+            + (f" (memo: {reused:,} pairs reused)" if memo_path is not None else "")
+        )
+        
+        return self._expand_signature_matches(
+            job_requirements['Job_ID'].tolist(), linkedin_jobs_df['job_id'].to_numpy(),
+            job_rows, job_signatures, linkedin_rows, linkedin_signatures, pairs, top_k
+        )
+    
+    def _expand_signature_matches(
+        self,
+        job_ids: List,
+        linkedin_ids: np.ndarray,
+        job_rows: np.ndarray,
+        job_signatures: np.ndarray,
+        linkedin_rows: np.ndarray,
+        linkedin_signatures: np.ndarray,
+        pairs: pd.DataFrame,
+        top_k: Optional[int]
+    ) -> Dict:
+        """
+        シグネチャの組の類似度を、Job_IDごとのLinkedInの行のマッチに展開
+        
+        各シグネチャのマッチはLinkedIn Datasetの行順
+        （top_k指定時は類似度の降順、同点は行順で上位k件）に並べる
+        """
+        job_positions = pd.Index(job_signatures).get_indexer(pairs['job_signature'])
+        linkedin_positions = pd.Index(linkedin_signatures).get_indexer(pairs['linkedin_signature'])
+        similarities = pairs['similarity'].to_numpy(dtype=np.float64)
+        
+        # シグネチャごとのLinkedInの行番号（行順）
+        grouped = np.argsort(linkedin_rows, kind='stable')
+        grouped = grouped[np.count_nonzero(linkedin_rows < 0):]
+        counts = np.bincount(linkedin_rows[linkedin_rows >= 0], minlength=len(linkedin_signatures))
+        starts = np.cumsum(counts) - counts
+        
+        sizes = counts[linkedin_positions]
+        pair_index = np.repeat(np.arange(len(pairs)), sizes)
+        offsets = np.arange(len(pair_index)) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+        postings = grouped[starts[linkedin_positions][pair_index] + offsets]
+        signatures = job_positions[pair_index]
+        similarities = similarities[pair_index]
+        
+        if top_k is not None:
+            order = np.lexsort((postings, -similarities, signatures))
+            signatures, postings, similarities = signatures[order], postings[order], similarities[order]
+            ranks = np.arange(len(signatures)) - np.searchsorted(signatures, signatures)
+            keep = ranks < top_k
+            signatures, postings, similarities = signatures[keep], postings[keep], similarities[keep]
+        else:
+            order = np.lexsort((postings, signatures))
+            signatures, postings, similarities = signatures[order], postings[order], similarities[order]
+        
+        linkedin_ids = linkedin_ids[postings].tolist()
+        boundaries = np.flatnonzero(np.diff(signatures)) + 1
+        matches_by_signature = {}
+        for signature, ids, values in zip(
+            signatures[np.r_[0, boundaries]].tolist() if len(signatures) else [],
+            np.split(np.asarray(linkedin_ids, dtype=object), boundaries),
+            np.split(similarities, boundaries)
+        ):
+            matches_by_signature[signature] = list(zip(ids.tolist(), values.tolist()))
+        
+        job_id_mapping = {}
+        for job_id, signature in zip(job_ids, job_rows.tolist()):
+            matches = matches_by_signature.get(signature)
+            if matches:
+                job_id_mapping.setdefault(job_id, []).extend(
+                    {'linkedin_id': linkedin_id, 'similarity': similarity}
+                    for linkedin_id, similarity in matches
+                )
+        return job_id_mapping
+    
+    def _signature_memo_path(self, tolerance: float) -> Optional[Path]:
+        """
+        シグネチャの組の類似度を保存するディレクトリ（cache_dirがなければNone）
+        """
+        if self.cache_dir is None:
+            return None
+        return self.cache_dir / f"skill-pairs-t{tolerance:.4f}"
+    
+    def _load_signature_memo(self, memo_path: Optional[Path]) -> Optional[Dict]:
+        """
+        保存済みのシグネチャの組の類似度を読み込む
+        
+        Returns:
+            {'pairs': 類似度の表, 'jobs': 計算済みの求人側のシグネチャ,
+             'linkedin': 計算済みのLinkedIn側のシグネチャ}。
+            jobs × linkedin の全ての組について、tolerance以上のものがpairsに含まれる
+        """
+        if memo_path is None or not (memo_path / 'signatures.parquet').exists():
+            return None
+        signatures = pd.read_parquet(memo_path / 'signatures.parquet')
+        return {
+            'pairs': pd.read_parquet(memo_path / 'pairs.parquet'),
+            'jobs': signatures.loc[signatures['side'] == 'job', 'signature'].to_numpy(),
+            'linkedin': signatures.loc[signatures['side'] == 'linkedin', 'signature'].to_numpy(),
+        }
+    
+    def _save_signature_memo(
+        self,
+        memo_path: Path,
+        pairs: pd.DataFrame,
+        job_signatures: np.ndarray,
+        linkedin_signatures: np.ndarray
+    ):
+        """
+        シグネチャの組の類似度を一時ディレクトリに書いてから置き換える
+        """
+        staging = memo_path.with_name(memo_path.name + '.tmp')
+        if staging.exists():
+            shutil.rmtree(staging)
+        staging.mkdir(parents=True)
+        pairs.drop_duplicates(['job_signature', 'linkedin_signature']).to_parquet(
+            staging / 'pairs.parquet', index=False
+        )
+        pd.DataFrame({
+            'signature': np.concatenate([job_signatures, linkedin_signatures]).astype(np.int64),
+            'side': ['job'] * len(job_signatures) + ['linkedin'] * len(linkedin_signatures),
+        }).to_parquet(staging / 'signatures.parquet', index=False)
+        if memo_path.exists():
+            shutil.rmtree(memo_path)
+        os.replace(staging, memo_path)
+    
+    def _match_jobs_parallel(
+        self,
+        job_requirements: pd.DataFrame,
+        linkedin_jobs_df: pd.DataFrame,
+        tolerance: float,
+        workers: int
+    ) -> Dict:
+        """
+        ユニークなJob_IDをshardに分割し、プロセスプールで並列にマッチング
+        
+        shardは元の順序のまま結合するため、結果は単一プロセスの'index'方式と一致する
+        """
+        index = self.build_linkedin_skill_index(linkedin_jobs_df)
+        state = {
+            # DataFrameへの参照は共有しない
+            'index': {key: value for key, value in index.items() if key != 'source'},
+            'tolerance': tolerance,
+            'job_ids': job_requirements['Job_ID'].tolist(),
+            'requirement_codes': [
+                self.skill_vocabulary.encode(requirements).tolist()
+                for requirements in job_requirements['Job_Requirements'].tolist()
+            ],
+        }
         
-        # job_titleを標準化
-        if 'job_title' in df.columns:
-            df['job_title_normalized'] = df['job_title'].str.lower().str.strip()
+        # 負荷の偏りを均すため、ワーカー数より細かく分割する
+        num_rows = len(state['job_ids'])
+        num_shards = max(1, min(num_rows, workers * 4))
+        boundaries = np.linspace(0, num_rows, num_shards + 1).astype(int)
+        shards = list(zip(boundaries[:-1].tolist(), boundaries[1:].tolist()))
         
-        print(f"   ✅ Loaded {len(df)} rows")
+        print(f"   ⚙️  Using {workers} workers ({len(shards)} shards)")
         
-        self.salary_df = df
-        return df
+        if 'fork' in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context('fork')
+            _WORKER_STATE.update(state)
+            pool_args = {}
+        else:
+            context = multiprocessing.get_context()
+            pool_args = {'initializer': _init_match_worker, 'initargs': (state,)}
+        
+        try:
+            with context.Pool(workers, **pool_args) as pool:
+                shard_results = pool.map(_match_shard, shards)
+        finally:
+            _WORKER_STATE.clear()
+        
+        job_id_mapping = {}
+        for results in shard_results:
+            for job_id, matches in results:
+                job_id_mapping.setdefault(job_id, []).extend(matches)
+        return job_id_mapping
     
-    def normalize_job_requirements(self, requirements: str) -> List[str]:
+    def _match_jobs_matrix(
+        self,
+        job_requirements: pd.DataFrame,
+        linkedin_jobs_df: pd.DataFrame,
+        tolerance: float,
+        top_k: Optional[int],
+        chunk_size: int
+    ) -> Dict:
         """
-        スキル要件を正規化してリストに変換
+        疎行列積で交差数を、行ごとのスキル数から和集合のサイズを求めてJaccard係数を計算
+        
+        Job_IDの行をchunk_sizeずつ処理するため、メモリ使用量は
+        チャンク内の非ゼロ要素数に比例する
         """
-        if pd.isna(requirements):
-            return []
-        return [skill.strip() for skill in str(requirements).split(',')]
+        job_matrix, linkedin_matrix, _ = self.build_skill_matrices(job_requirements, linkedin_jobs_df)
+        job_sizes = np.diff(job_matrix.indptr)
+        linkedin_sizes = np.diff(linkedin_matrix.indptr)
+        linkedin_t = linkedin_matrix.T.tocsr()
+        
+        job_ids = job_requirements['Job_ID'].tolist()
+        linkedin_ids = linkedin_jobs_df['job_id'].tolist()
+        job_id_mapping = {}
+        
+        for start in range(0, job_matrix.shape[0], chunk_size):
+            chunk = job_matrix[start:start + chunk_size]
+            intersections = chunk @ linkedin_t
+            
+            if tolerance > 0:
+                intersections = intersections.tocoo()
+                rows, cols, counts = intersections.row, intersections.col, intersections.data
+            else:
+                # tolerance <= 0 の場合は共通スキルのない組み合わせもマッチする
+                rows, cols = np.nonzero(
+                    (job_sizes[start:start + chunk_size, None] > 0) &
+                    (linkedin_sizes[None, :] > 0)
+                )
+                counts = np.asarray(intersections[rows, cols]).ravel()
+            
+            counts = counts.astype(np.int64)
+            unions = job_sizes[start + rows] + linkedin_sizes[cols] - counts
+            similarities = counts / unions
+            keep = similarities >= tolerance
+            _collect_matches(
+                job_id_mapping, job_ids, linkedin_ids,
+                start + rows[keep], cols[keep], similarities[keep], top_k
+            )
+        
+        return job_id_mapping
     
-    def match_jobs_by_skills(self, tolerance: float = 0.7) -> pd.DataFrame:
+    def _match_jobs_bitset(
+        self,
+        job_requirements: pd.DataFrame,
+        linkedin_jobs_df: pd.DataFrame,
+        tolerance: float,
+        top_k: Optional[int],
+        chunk_size: int,
+        max_pairs: int = 1 << 22
+    ) -> Dict:
         """
-        スキル要件を使ってJob_IDとjob_idをマッチング
+        ビットセットのAND + popcountで全ペアのJaccard係数をまとめて計算
+        
+        一度に計算するペア数をmax_pairs以下に抑えるため、
+        LinkedInの行数が多い場合はchunk_sizeより小さい単位で処理する
         """
-        if self.job_recommendation_df is None or self.linkedin_jobs_df is None:
-            raise ValueError("必要なデータセットが読み込まれていません")
+        job_bitsets, linkedin_bitsets = self.build_skill_bitsets(job_requirements, linkedin_jobs_df)
+        job_sizes = _popcount(job_bitsets).sum(axis=1, dtype=np.int32)
+        linkedin_sizes = _popcount(linkedin_bitsets).sum(axis=1, dtype=np.int32)
         
-        print("\n🔍 Matching jobs by skill requirements...")
+        job_ids = job_requirements['Job_ID'].tolist()
+        linkedin_ids = linkedin_jobs_df['job_id'].tolist()
+        job_id_mapping = {}
         
-        # ユニークなJob_IDとJob_Requirementsの組み合わせを取得
-        job_requirements = self.job_recommendation_df[
-            ['Job_ID', 'Job_Requirements']
-        ].drop_duplicates()
+        rows_per_chunk = max(1, min(chunk_size, max_pairs // max(len(linkedin_bitsets), 1)))
+        for start in range(0, len(job_bitsets), rows_per_chunk):
+            stop = min(start + rows_per_chunk, len(job_bitsets))
+            intersections = bitset_intersections(job_bitsets[start:stop], linkedin_bitsets)
+            sums = job_sizes[start:stop, None] + linkedin_sizes[None, :]
+            
+            if tolerance > 0:
+                # J >= t ⇔ |A∩B| × (1 + t) >= t × (|A| + |B|) で候補を絞り、最後に正確に判定する
+                # （浮動小数点誤差を考慮して少し緩める）
+                candidates = intersections * (1 + tolerance) >= tolerance * sums - 1e-9
+            else:
+                # tolerance <= 0 の場合は共通スキルのない組み合わせもマッチする
+                candidates = (job_sizes[start:stop, None] > 0) & (linkedin_sizes[None, :] > 0)
+            rows, cols = np.nonzero(candidates)
+            counts = intersections[rows, cols].astype(np.int64)
+            similarities = counts / np.maximum(sums[rows, cols] - counts, 1)
+            keep = similarities >= tolerance
+            _collect_matches(
+                job_id_mapping, job_ids, linkedin_ids,
+                start + rows[keep], cols[keep], similarities[keep], top_k
+            )
         
+        return job_id_mapping
+    
+    def _match_jobs_exact(
+        self,
+        job_requirements: pd.DataFrame,
+        linkedin_jobs_df: pd.DataFrame,
+        tolerance: float
+    ) -> Dict:
+        """
+        全てのJob_IDとLinkedInの行を総当たりで比較する（検証用の基準実装）
+        """
         # スキルマッチング用の辞書を作成
         job_id_mapping = {}
         
@@ -104,7 +1471,7 @@ class DatasetIntegrator:
             requirements = set(self.normalize_job_requirements(row['Job_Requirements']))
             
             # LinkedIn Datasetとマッチング
-            for _, linkedin_row in self.linkedin_jobs_df.iterrows():
+            for _, linkedin_row in linkedin_jobs_df.iterrows():
                 linkedin_id = linkedin_row['job_id']
                 
                 # job_requirementsカラムがあるか確認
@@ -133,80 +1500,161 @@ class DatasetIntegrator:
                             'similarity': similarity
                         })
         
-        print(f"   ✅ Matched {len(job_id_mapping)} jobs")
         return job_id_mapping
     
-    def integrate_datasets(
+    def build_job_attributes(
         self,
+        job_requirements: pd.DataFrame,
         use_skill_matching: bool = True,
-        fallback_to_id_match: bool = True
+        fallback_to_id_match: bool = True,
+        matching_method: str = 'index',
+        workers: int = 1,
+        job_mapping: Optional[Dict] = None
     ) -> pd.DataFrame:
         """
-        3つのデータセットを統合
-        """
-        print("\n🔗 Integrating datasets...")
+        Job_IDごとにLinkedInと給与の情報をまとめた表を作成
         
-        if self.job_recommendation_df is None:
-            raise ValueError("Job Recommendation Datasetが読み込まれていません")
+        Args:
+            job_requirements: Job_IDとJob_Requirementsの組み合わせ
+            use_skill_matching: スキル要件でLinkedIn Datasetとマッチングするか
+            fallback_to_id_match: スキルマッチングを使わない場合にJob_IDで直接結合するか
+            matching_method: match_jobs_by_skillsに渡すマッチング方式
+            workers: match_jobs_by_skillsで使うプロセス数
+            job_mapping: 計算済みのマッチング結果（先頭が最良のマッチ）。
+                指定した場合はスキルマッチングを実行しない
         
-        # ステップ1: Job Recommendation Datasetをベースに
-        integrated = self.job_recommendation_df.copy()
+        Returns:
+            Job_IDをキーとするDataFrame（ユーザー行に結合する前の求人単位の情報）
+        """
+        attributes = pd.DataFrame({'Job_ID': job_requirements['Job_ID'].unique()})
         
-        # ステップ2: LinkedIn Datasetと結合（Job_IDで直接マッチ）
+        # ステップ2: LinkedIn Datasetと結合
         if self.linkedin_jobs_df is not None:
             print("   📎 Merging with LinkedIn Job Postings...")
             
             if use_skill_matching:
                 # スキルマッチングを使用
-                job_mapping = self.match_jobs_by_skills()
-                # 最良のマッチを選択
-                mapping_df = pd.DataFrame([
-                    {
-                        'Job_ID': job_id,
-                        'linkedin_job_id': matches[0]['linkedin_id'],
-                        'skill_similarity': matches[0]['similarity']
-                    }
-                    for job_id, matches in job_mapping.items()
-                    if len(matches) > 0
-                ])
-                
-                # LinkedInデータを結合
-                linkedin_merged = mapping_df.merge(
-                    self.linkedin_jobs_df,
-                    left_on='linkedin_job_id',
-                    right_on='job_id',
-                    how='left',
-                    suffixes=('', '_linkedin')
+                # 各Job_IDについて類似度が最も高いマッチだけを取得
+                if job_mapping is None:
+                    job_mapping = self.match_jobs_by_skills(
+                        method=matching_method,
+                        top_k=1,
+                        workers=workers,
+                        job_requirements=job_requirements
+                    )
+                mapping_df = pd.DataFrame(
+                    [
+                        {
+                            'Job_ID': job_id,
+                            'linkedin_job_id': matches[0]['linkedin_id'],
+                            'skill_similarity': matches[0]['similarity']
+                        }
+                        for job_id, matches in job_mapping.items()
+                        if len(matches) > 0
+                    ],
+                    columns=['Job_ID', 'linkedin_job_id', 'skill_similarity']
                 )
                 
-                integrated = integrated.merge(
-                    linkedin_merged[['Job_ID'] + [
-                        col for col in linkedin_merged.columns 
-                        if col not in ['Job_ID', 'linkedin_job_id']
-                    ]],
-                    on='Job_ID',
-                    how='left'
-                )
+                with self.metrics.stage('merge_linkedin', rows=len(attributes)):
+                    # LinkedInデータを結合
+                    linkedin_merged = mapping_df.merge(
+                        self.linkedin_jobs_df,
+                        left_on='linkedin_job_id',
+                        right_on='job_id',
+                        how='left',
+                        suffixes=('', '_linkedin')
+                    )
+                    
+                    attributes = attributes.merge(
+                        linkedin_merged[['Job_ID'] + [
+                            col for col in linkedin_merged.columns 
+                            if col not in ['Job_ID', 'linkedin_job_id']
+                        ]],
+                        on='Job_ID',
+                        how='left'
+                    )
             elif fallback_to_id_match:
-                # Job_IDで直接マッチ
-                integrated = integrated.merge(
-                    self.linkedin_jobs_df,
-                    left_on='Job_ID',
-                    right_on='job_id',
-                    how='left',
-                    suffixes=('', '_linkedin')
-                )
+                with self.metrics.stage('merge_linkedin', rows=len(attributes)):
+                    # Job_IDで直接マッチ
+                    attributes = attributes.merge(
+                        self.linkedin_jobs_df,
+                        left_on='Job_ID',
+                        right_on='job_id',
+                        how='left',
+                        suffixes=('', '_linkedin')
+                    )
             
-            print(f"   ✅ Merged LinkedIn data: {integrated['job_title'].notna().sum()} jobs matched")
+            if 'job_title' in attributes.columns:
+                print(f"   ✅ Merged LinkedIn data: {attributes['job_title'].notna().sum()} jobs matched")
         
         # ステップ3: Salary Datasetと結合（job_titleでマッチ）
-        if self.salary_df is not None and 'job_title' in integrated.columns:
-            print("   💰 Merging with Salary Data...")
-            
-            # job_titleを正規化
-            integrated['job_title_normalized'] = integrated['job_title'].str.lower().str.strip()
-            
-            # 給与データを集約（同じ職種の平均給与を計算）
+        if self.salary_df is not None and 'job_title' in attributes.columns:
+            with self.metrics.stage('salary_join', rows=len(attributes)):
+                print("   💰 Merging with Salary Data...")
+                start = time.perf_counter()
+                
+                # job_titleを正規化
+                attributes['job_title_normalized'] = attributes['job_title'].str.lower().str.strip()
+                
+                # 給与データを集約（同じ職種の平均給与を計算）
+                salary_agg, title_index, cache_status = self.aggregate_salaries()
+                
+                # 職種名はユニークな値ごとに一度だけ索引を引く
+                title_codes, titles = pd.factorize(attributes['job_title'])
+                matches = [title_index.match(title) for title in titles]
+                positions = np.array([match[0] if match else -1 for match in matches] + [-1])
+                salary_titles = np.append(salary_agg['job_title_normalized'].to_numpy(dtype=object), None)
+                attributes['_salary_title'] = salary_titles[positions[title_codes]]
+                
+                attributes = attributes.merge(
+                    salary_agg.rename(columns={'job_title_normalized': '_salary_title'}),
+                    on='_salary_title',
+                    how='left'
+                ).drop(columns=['_salary_title'])
+                
+                jobs_with_title = int(attributes['job_title'].notna().sum())
+                jobs_matched = int(attributes['avg_salary_usd'].notna().sum())
+                exact_titles = sum(1 for title in titles if str(title).lower().strip() in title_index.exact)
+                self.salary_stats = {
+                    'cache': cache_status,
+                    'salary_titles': len(salary_agg),
+                    'job_titles': len(titles),
+                    'exact_title_matches': exact_titles,
+                    'fuzzy_title_matches': sum(1 for match in matches if match) - exact_titles,
+                    'jobs_with_title': jobs_with_title,
+                    'jobs_matched': jobs_matched,
+                    'match_rate': round(jobs_matched / jobs_with_title, 4) if jobs_with_title else 0.0,
+                    'seconds': round(time.perf_counter() - start, 4),
+                }
+                
+                print(f"   ✅ Merged salary data: {jobs_matched} jobs matched "
+                      f"({self.salary_stats['fuzzy_title_matches']} titles by fuzzy match)")
+        
+        return attributes
+    
+    def aggregate_salaries(self) -> Tuple[pd.DataFrame, SalaryTitleIndex, str]:
+        """
+        職種ごとの給与集計と職種名の索引を返す
+        
+        同じ給与データに対しては計算済みの結果を再利用する。
+        cache_dirが指定されていれば、集計表を給与データの内容ハッシュをキーにParquetで保存する
+        
+        Returns:
+            (集計表, 職種名の索引, キャッシュの状態 'memory'/'disk'/'miss')
+        """
+        if self._salary_cache is not None and self._salary_cache['source'] is self.salary_df:
+            return self._salary_cache['table'], self._salary_cache['index'], 'memory'
+        
+        cache_status = 'miss'
+        cache_path = None
+        if self.cache_dir is not None:
+            key = self._salary_content_hash()[:16]
+            cache_path = self.cache_dir / f"salary-agg-{key}.parquet"
+        
+        if cache_path is not None and cache_path.exists():
+            salary_agg = pd.read_parquet(cache_path)
+            cache_status = 'disk'
+        else:
             salary_agg = self.salary_df.groupby('job_title_normalized').agg({
                 'salary_in_usd': ['mean', 'median', 'min', 'max', 'count']
             }).reset_index()
@@ -219,107 +1667,846 @@ class DatasetIntegrator:
                 'max_salary_usd',
                 'salary_data_count'
             ]
-            
-            integrated = integrated.merge(
-                salary_agg,
-                on='job_title_normalized',
-                how='left'
+            if cache_path is not None:
+                cache_path.parent.mkdir(parents=True, exist_ok=True)
+                salary_agg.to_parquet(cache_path, index=False)
+        
+        title_index = SalaryTitleIndex(salary_agg['job_title_normalized'].tolist())
+        self._salary_cache = {'source': self.salary_df, 'table': salary_agg, 'index': title_index}
+        return salary_agg, title_index, cache_status
+    
+    def integrate_datasets(
+        self,
+        use_skill_matching: bool = True,
+        fallback_to_id_match: bool = True,
+        matching_method: str = 'index',
+        workers: int = 1,
+        job_mapping: Optional[Dict] = None
+    ) -> pd.DataFrame:
+        """
+        3つのデータセットを統合
+        
+        Args:
+            use_skill_matching: スキル要件でLinkedIn Datasetとマッチングするか
+            fallback_to_id_match: スキルマッチングを使わない場合にJob_IDで直接結合するか
+            matching_method: match_jobs_by_skillsに渡すマッチング方式
+            workers: match_jobs_by_skillsで使うプロセス数
+            job_mapping: 計算済みのマッチング結果（build_job_attributesを参照）
+        """
+        print("\n🔗 Integrating datasets...")
+        
+        if self.job_recommendation_df is None:
+            raise ValueError("Job Recommendation Datasetが読み込まれていません")
+        
+        # ステップ1: Job Recommendation Datasetをベースに、求人単位の情報を作成
+        job_requirements = self.job_recommendation_df[
+            ['Job_ID', 'Job_Requirements']
+        ].drop_duplicates()
+        attributes = self.build_job_attributes(
+            job_requirements,
+            use_skill_matching=use_skill_matching,
+            fallback_to_id_match=fallback_to_id_match,
+            matching_method=matching_method,
+            workers=workers,
+            job_mapping=job_mapping
+        )
+        
+        with self.metrics.stage('merge_rows', rows=len(self.job_recommendation_df)):
+            # 求人単位の情報を各ユーザー行に結合
+            integrated = self.job_recommendation_df.merge(
+                attributes,
+                on='Job_ID',
+                how='left',
+                suffixes=('', '_linkedin')
             )
-            
-            print(f"   ✅ Merged salary data: {integrated['avg_salary_usd'].notna().sum()} jobs matched")
         
         self.integrated_df = integrated
         print(f"\n✅ Integration complete! Total rows: {len(integrated)}")
         
         return integrated
     
-    def save_integrated_dataset(self, output_path: str, format: str = 'csv'):
+    def integrate_star_schema(
+        self,
+        use_skill_matching: bool = True,
+        fallback_to_id_match: bool = True,
+        matching_method: str = 'index',
+        workers: int = 1,
+        job_mapping: Optional[Dict] = None
+    ) -> Dict:
+        """
+        3つのデータセットを、求人の情報を各ユーザー行に複製せずにスター形式で統合
+        
+        求人単位の情報（LinkedIn・給与）はjobs表に1回だけ持ち、ユーザー×求人の行は
+        User_ID, Job_ID, Match_Score, Recommendedだけの細いファクト表にする。
+        ワイド形式が必要な場合はStarSchemaViewで必要な列だけ結合する
+        
+        Args:
+            integrate_datasetsと同じ
+        
+        Returns:
+            split_star_schemaの結果
+        """
+        print("\n🔗 Integrating datasets (star schema)...")
+        
+        if self.job_recommendation_df is None:
+            raise ValueError("Job Recommendation Datasetが読み込まれていません")
+        
+        job_requirements = self.job_recommendation_df[
+            ['Job_ID', 'Job_Requirements']
+        ].drop_duplicates()
+        attributes = self.build_job_attributes(
+            job_requirements,
+            use_skill_matching=use_skill_matching,
+            fallback_to_id_match=fallback_to_id_match,
+            matching_method=matching_method,
+            workers=workers,
+            job_mapping=job_mapping
+        )
+        
+        with self.metrics.stage('split_star_schema', rows=len(self.job_recommendation_df)):
+            tables = split_star_schema(self.job_recommendation_df, attributes)
+        
+        self.star_schema = tables
+        print(
+            f"\n✅ Integration complete! Facts: {len(tables['facts'])} rows, "
+            f"Jobs: {len(tables['jobs'])}, Users: {len(tables['users'])}"
+        )
+        return tables
+    
+    def integrate_datasets_streaming(
+        self,
+        job_filepath: str,
+        output_path: str,
+        chunksize: int = 100000,
+        use_skill_matching: bool = True,
+        fallback_to_id_match: bool = True,
+        matching_method: str = 'index',
+        workers: int = 1
+    ) -> Dict:
+        """
+        メモリに乗らない大きさのJob Datasetを分割して統合し、CSVへ逐次書き込む
+        
+        1回目の読み込みでユニークなJob_IDとJob_Requirementsだけを集めてマッチングし、
+        2回目の読み込みでチャンクごとに求人情報を結合して追記する。
+        メモリに保持するのは求人単位の情報と1チャンク分の行だけになる
+        
+        Returns:
+            書き込んだ行数などの集計
+        """
+        print(f"\n🔗 Integrating datasets (streaming from {job_filepath})...")
+        
+        # パス1: ユニークなJob_IDとJob_Requirementsの組み合わせを集める
+        pairs = []
+        for chunk in pd.read_csv(
+            job_filepath,
+            usecols=['Job_ID', 'Job_Requirements'],
+            dtype=JOB_RECOMMENDATION_DTYPES,
+            chunksize=chunksize
+        ):
+            pairs.append(chunk.drop_duplicates())
+        job_requirements = pd.concat(pairs, ignore_index=True).drop_duplicates()
+        print(f"   📊 Unique Jobs: {job_requirements['Job_ID'].nunique()}")
+        
+        attributes = self.build_job_attributes(
+            job_requirements,
+            use_skill_matching=use_skill_matching,
+            fallback_to_id_match=fallback_to_id_match,
+            matching_method=matching_method,
+            workers=workers
+        )
+        
+        # パス2: チャンクごとに結合して追記
+        total_rows = 0
+        linkedin_matched = 0
+        for chunk_index, chunk in enumerate(pd.read_csv(
+            job_filepath,
+            dtype=JOB_RECOMMENDATION_DTYPES,
+            chunksize=chunksize
+        )):
+            merged = chunk.merge(
+                attributes,
+                on='Job_ID',
+                how='left',
+                suffixes=('', '_linkedin')
+            )
+            merged.to_csv(
+                output_path,
+                mode='w' if chunk_index == 0 else 'a',
+                header=chunk_index == 0,
+                index=False
+            )
+            total_rows += len(merged)
+            if 'job_title' in merged.columns:
+                linkedin_matched += int(merged['job_title'].notna().sum())
+            print(f"   Wrote chunk {chunk_index + 1} ({total_rows:,} rows)")
+        
+        print(f"\n✅ Integration complete! Total rows: {total_rows}")
+        return {
+            'total_rows': total_rows,
+            'unique_jobs': int(job_requirements['Job_ID'].nunique()),
+            'linkedin_matched': linkedin_matched,
+            'salary_enrichment': self.salary_stats,
+            'output_path': output_path,
+        }
+    
+    def save_integrated_dataset(
+        self,
+        output_path: str,
+        format: str = 'csv',
+        num_buckets: int = 32,
+        row_group_size: int = 16384
+    ):
         """
         統合されたデータセットを保存
+        
+        Args:
+            output_path: 出力先（'parquet_partitioned'の場合はディレクトリ）
+            format: 'csv', 'parquet', 'json', 'parquet_partitioned', 'star'のいずれか
+                （'star'はintegrate_star_schemaの結果をディレクトリに保存する）
+            num_buckets: 'parquet_partitioned'でJob_IDを分けるバケット数
+            row_group_size: 'parquet_partitioned'の行グループの行数
         """
+        if format == 'star':
+            self._write_star_schema(output_path)
+            return
         if self.integrated_df is None:
             raise ValueError("統合データがありません。先にintegrate_datasets()を実行してください")
         
         print(f"\n💾 Saving integrated dataset to {output_path}...")
         
-        if format == 'csv':
-            self.integrated_df.to_csv(output_path, index=False)
-        elif format == 'parquet':
-            self.integrated_df.to_parquet(output_path, index=False)
-        elif format == 'json':
-            self.integrated_df.to_json(output_path, orient='records', indent=2)
+        with self.metrics.stage('save', rows=len(self.integrated_df)):
+            if format == 'csv':
+                self.integrated_df.to_csv(output_path, index=False)
+            elif format == 'parquet':
+                self.integrated_df.to_parquet(output_path, index=False)
+            elif format == 'json':
+                self.integrated_df.to_json(output_path, orient='records', indent=2)
+            elif format == 'parquet_partitioned':
+                self._write_partitioned_parquet(
+                    self.integrated_df, output_path, num_buckets, row_group_size
+                )
+            else:
+                raise ValueError(f"未対応の保存形式です: {format}")
         
         print(f"   ✅ Saved successfully!")
     
-    def generate_mapping_report(self, output_path: str):
+    def _write_star_schema(self, output_dir: str):
         """
-        マッピング結果のレポートを生成
+        ファクト表と次元表をParquetで保存（StarSchemaViewで読み込める）
         """
-        if self.integrated_df is None:
-            raise ValueError("統合データがありません")
+        if self.star_schema is None:
+            raise ValueError("スター形式の統合データがありません。先にintegrate_star_schema()を実行してください")
+        
+        print(f"\n💾 Saving star schema to {output_dir}...")
+        output = Path(output_dir)
+        output.mkdir(parents=True, exist_ok=True)
+        
+        with self.metrics.stage('save', rows=len(self.star_schema['facts'])):
+            for name in ['facts', 'users', 'jobs']:
+                self.star_schema[name].to_parquet(output / f'{name}.parquet', index=False)
+            with open(output / STAR_SCHEMA_INFO_FILE, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'columns': self.star_schema['columns'],
+                    'rows': {name: len(self.star_schema[name]) for name in ['facts', 'users', 'jobs']},
+                }, f, indent=2, ensure_ascii=False)
+        
+        print(f"   ✅ Saved successfully!")
+    
+    def _write_partitioned_parquet(
+        self,
+        df: pd.DataFrame,
+        output_dir: str,
+        num_buckets: int,
+        row_group_size: int,
+        buckets: Optional[List[int]] = None
+    ):
+        """
+        Job_IDのバケットごとにParquetファイルを書き出す
+        
+        各バケット内はJob_ID順に並べるため、行グループの統計情報（min/max）で
+        特定のJob_IDを含まない行グループを読み飛ばせる。
+        スキル列は辞書エンコード（category型）で保存する
+        
+        Args:
+            buckets: 指定した場合はこれらのバケットだけを書き換える
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        
+        output = Path(output_dir)
+        output.mkdir(parents=True, exist_ok=True)
+        
+        df = df.copy()
+        for column in SKILL_COLUMNS:
+            if column in df.columns and not isinstance(df[column].dtype, pd.CategoricalDtype):
+                df[column] = df[column].astype('category')
+        df['job_bucket'] = job_bucket(df['Job_ID'], num_buckets)
+        df = df.sort_values(['job_bucket', 'Job_ID'], kind='stable')
+        
+        # 全バケットで同じスキーマを使う（一部を書き換える場合は既存ファイルに合わせる）
+        existing = [
+            path for path in output.glob('job_bucket=*/*.parquet')
+            if buckets is not None and int(path.parent.name.split('=')[1]) not in buckets
+        ]
+        if existing:
+            schema = pq.read_schema(existing[0])
+        else:
+            schema = pa.Table.from_pandas(
+                df.drop(columns=['job_bucket']), preserve_index=False
+            ).schema
+        
+        if buckets is None:
+            buckets = list(range(num_buckets))
+        grouped = dict(tuple(df.groupby('job_bucket', sort=False)))
+        
+        for bucket in buckets:
+            partition_dir = output / f"job_bucket={bucket}"
+            for old_file in partition_dir.glob('*.parquet'):
+                old_file.unlink()
+            if bucket not in grouped:
+                continue
+            partition_dir.mkdir(exist_ok=True)
+            table = pa.Table.from_pandas(
+                grouped[bucket].drop(columns=['job_bucket']),
+                schema=schema,
+                preserve_index=False
+            )
+            pq.write_table(
+                table,
+                partition_dir / 'part-0.parquet',
+                row_group_size=row_group_size,
+                use_dictionary=True,
+                write_statistics=True
+            )
+        
+        with open(output / DATASET_INFO_FILE, 'w', encoding='utf-8') as f:
+            json.dump({
+                'num_buckets': num_buckets,
+                'row_group_size': row_group_size,
+                'columns': [column for column in df.columns if column != 'job_bucket'],
+            }, f, indent=2, ensure_ascii=False)
+    
+    def load_integrated_dataset(
+        self,
+        path: str,
+        job_ids: Optional[List[int]] = None
+    ) -> pd.DataFrame:
+        """
+        保存済みの統合データセットを読み込む（Parquetはメモリマップで読む）
+        
+        Args:
+            path: CSVファイル、Parquetファイルまたは'parquet_partitioned'の出力ディレクトリ
+            job_ids: 指定した場合は該当するJob_IDの行だけを読み込む
+                （パーティションと行グループの統計情報で読む範囲を絞る）
+        """
+        print(f"📖 Loading integrated dataset from {path}...")
+        df = read_integrated_dataset(path, job_ids=job_ids)
+        
+        print(f"   ✅ Loaded {len(df)} rows")
+        self.integrated_df = df
+        return df
+    
+    def integrate_incremental(
+        self,
+        output_dir: str,
+        state_dir: str,
+        report_path: str = 'integration_report.json',
+        tolerance: float = 0.7,
+        matching_method: str = 'index',
+        workers: int = 1,
+        num_buckets: int = 32,
+        row_group_size: int = 16384
+    ) -> Dict:
+        """
+        前回の実行から変化した求人だけを再マッチングし、出力とレポートを部分的に更新
+        
+        state_dirに求人要件・ユーザー行・LinkedInの行の内容ハッシュと、
+        全マッチング結果を保存しておく。次回は
+        - 要件が変わった（または新しい）Job_IDを全LinkedInと再マッチング
+        - 変わっていないJob_IDは、変更・追加されたLinkedInの行とだけ比較
+        - 最良マッチや元の行が変わったJob_IDを含むバケットだけを書き換える
+        給与データや設定が変わった場合は全件を再計算する
+        
+        Args:
+            output_dir: 'parquet_partitioned'形式の統合データセットの出力先
+            state_dir: マニフェストとマッチング結果の保存先
+            report_path: 更新するマッピングレポートのパス
+        
+        Returns:
+            更新後のマッピングレポート
+        """
+        if self.job_recommendation_df is None:
+            raise ValueError("Job Recommendation Datasetが読み込まれていません")
+        
+        print("\n🔄 Integrating datasets incrementally...")
+        
+        state_path = Path(state_dir)
+        job_requirements = self.job_recommendation_df[
+            ['Job_ID', 'Job_Requirements']
+        ].drop_duplicates()
+        current_jobs = self._job_content_hashes(job_requirements)
+        current_postings = self._posting_content_hashes()
+        config = {
+            'tolerance': tolerance,
+            'matching_method': matching_method,
+            'num_buckets': num_buckets,
+            'linkedin_columns': (
+                list(self.linkedin_jobs_df.columns) if self.linkedin_jobs_df is not None else []
+            ),
+            'salary_hash': self._salary_content_hash(),
+        }
+        
+        previous = self._load_incremental_state(state_path)
+        fresh = previous is None or previous['config'] != config
+        if fresh:
+            print("   ℹ️  No reusable state found, processing all jobs")
+            previous = {
+                'jobs': current_jobs.iloc[0:0],
+                'postings': current_postings.iloc[0:0],
+                'mapping': {},
+                'bucket_stats': {},
+            }
+        
+        # 変化した求人とLinkedInの行を検出
+        previous_jobs = previous['jobs']
+        common = current_jobs.index.intersection(previous_jobs.index)
+        changed_jobs = set(current_jobs.index.difference(previous_jobs.index)) | set(common[
+            current_jobs.loc[common, 'requirements_hash'] != previous_jobs.loc[common, 'requirements_hash']
+        ])
+        row_changed_jobs = set(common[
+            current_jobs.loc[common, 'rows_hash'] != previous_jobs.loc[common, 'rows_hash']
+        ])
+        removed_jobs = set(previous_jobs.index.difference(current_jobs.index))
+        
+        previous_postings = previous['postings']
+        common = current_postings.index.intersection(previous_postings.index)
+        changed_postings = set(current_postings.index.difference(previous_postings.index)) | set(
+            common[current_postings.loc[common] != previous_postings.loc[common]]
+        )
+        removed_postings = set(previous_postings.index.difference(current_postings.index))
+        stale_postings = changed_postings | removed_postings
+        
+        print(f"   📊 Changed jobs: {len(changed_jobs)}, removed jobs: {len(removed_jobs)}")
+        print(f"   📊 Changed postings: {len(changed_postings)}, removed postings: {len(removed_postings)}")
+        
+        # 変化のない組み合わせは前回の結果を再利用
+        mapping = {
+            job_id: [m for m in matches if m['linkedin_id'] not in stale_postings]
+            for job_id, matches in previous['mapping'].items()
+            if job_id in current_jobs.index and job_id not in changed_jobs
+        }
+        
+        if self.linkedin_jobs_df is not None:
+            changed_requirements = job_requirements[job_requirements['Job_ID'].isin(changed_jobs)]
+            if len(changed_requirements) > 0:
+                # 変更された求人は全LinkedInの行と再マッチング
+                for job_id, matches in self.match_jobs_by_skills(
+                    tolerance=tolerance,
+                    method=matching_method,
+                    workers=workers,
+                    job_requirements=changed_requirements
+                ).items():
+                    mapping.setdefault(job_id, []).extend(matches)
+            
+            unchanged_requirements = job_requirements[~job_requirements['Job_ID'].isin(changed_jobs)]
+            if changed_postings and len(unchanged_requirements) > 0:
+                # 変化のない求人は、変更・追加されたLinkedInの行とだけ比較
+                delta = self.match_jobs_by_skills(
+                    tolerance=tolerance,
+                    method=matching_method,
+                    workers=workers,
+                    job_requirements=unchanged_requirements,
+                    linkedin_jobs_df=self.linkedin_jobs_df[
+                        self.linkedin_jobs_df['job_id'].isin(changed_postings)
+                    ]
+                )
+                for job_id, matches in delta.items():
+                    mapping.setdefault(job_id, []).extend(matches)
+            
+            # 全件実行と同じ最良マッチを選ぶため、LinkedIn Datasetの行順に並べる
+            positions = self._linkedin_positions()
+            mapping = {
+                job_id: sorted(matches, key=lambda m: positions[m['linkedin_id']])
+                for job_id, matches in mapping.items()
+                if matches
+            }
+        
+        previous_best = _best_matches(previous['mapping'])
+        current_best = _best_matches(mapping)
+        affected_jobs = changed_jobs | row_changed_jobs | removed_jobs | {
+            job_id for job_id in set(previous_best) | set(current_best)
+            if previous_best.get(job_id) != current_best.get(job_id)
+        } | {
+            job_id for job_id, match in current_best.items()
+            if match['linkedin_id'] in changed_postings
+        }
+        affected_buckets = sorted(set(
+            job_bucket(pd.Series(sorted(affected_jobs), dtype='int64'), num_buckets).tolist()
+        ))
+        print(f"   📊 Rewriting {len(affected_buckets)}/{num_buckets} buckets")
+        
+        # バケットごとの集計は、作り直したバケットの分だけ差し替える
+        bucket_stats = {
+            bucket: stats for bucket, stats in previous['bucket_stats'].items()
+            if bucket not in affected_buckets
+        }
+        if affected_buckets:
+            # 影響のあるバケットだけを作り直す
+            buckets = job_bucket(self.job_recommendation_df['Job_ID'], num_buckets)
+            base = self.job_recommendation_df[buckets.isin(affected_buckets)]
+            attributes = self.build_job_attributes(
+                job_requirements[job_requirements['Job_ID'].isin(base['Job_ID'])],
+                job_mapping={job_id: [match] for job_id, match in current_best.items()}
+            )
+            rebuilt = base.merge(attributes, on='Job_ID', how='left', suffixes=('', '_linkedin'))
+            self._write_partitioned_parquet(
+                rebuilt, output_dir, num_buckets, row_group_size, buckets=affected_buckets
+            )
+            columns = list(rebuilt.columns)
+            rebuilt_buckets = job_bucket(rebuilt['Job_ID'], num_buckets)
+            for bucket in affected_buckets:
+                rows = rebuilt[rebuilt_buckets == bucket]
+                if len(rows) > 0:
+                    bucket_stats[bucket] = _summarize_integrated(rows)
+        elif (Path(output_dir) / DATASET_INFO_FILE).exists():
+            # 変化がなければ出力には触れず、列は前回書き出したメタデータから取る
+            with open(Path(output_dir) / DATASET_INFO_FILE, encoding='utf-8') as f:
+                columns = json.load(f)['columns']
+        else:
+            columns = list(self.job_recommendation_df.columns)
         
         report = {
-            'total_rows': len(self.integrated_df),
-            'unique_users': self.integrated_df['User_ID'].nunique() if 'User_ID' in self.integrated_df else 0,
-            'unique_jobs': self.integrated_df['Job_ID'].nunique() if 'Job_ID' in self.integrated_df else 0,
-            'linkedin_matched': self.integrated_df['job_title'].notna().sum() if 'job_title' in self.integrated_df else 0,
-            'salary_matched': self.integrated_df['avg_salary_usd'].notna().sum() if 'avg_salary_usd' in self.integrated_df else 0,
-            'columns': list(self.integrated_df.columns)
+            'total_rows': sum(stats['total_rows'] for stats in bucket_stats.values()),
+            'unique_users': int(self.job_recommendation_df['User_ID'].nunique()),
+            'unique_jobs': sum(stats['unique_jobs'] for stats in bucket_stats.values()),
+            'linkedin_matched': sum(stats['linkedin_matched'] for stats in bucket_stats.values()),
+            'salary_matched': sum(stats['salary_matched'] for stats in bucket_stats.values()),
+            'columns': columns,
+            'incremental': {
+                'changed_jobs': len(changed_jobs),
+                'removed_jobs': len(removed_jobs),
+                'changed_postings': len(changed_postings),
+                'removed_postings': len(removed_postings),
+                'rewritten_buckets': len(affected_buckets),
+            },
+        }
+        if self.salary_stats is not None:
+            report['salary_enrichment'] = self.salary_stats
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"📊 Mapping report saved to {report_path}")
+        
+        if fresh or affected_buckets or changed_postings or removed_postings:
+            self._save_incremental_state(
+                state_path, config, current_jobs, current_postings, mapping, bucket_stats
+            )
+        print(f"\n✅ Incremental integration complete!")
+        return report
+    
+    def _job_content_hashes(self, job_requirements: pd.DataFrame) -> pd.DataFrame:
+        """
+        Job_IDごとに、要件と全ユーザー行の内容ハッシュを計算
+        """
+        requirements_hash = pd.Series(
+            pd.util.hash_pandas_object(job_requirements['Job_Requirements'].astype(str), index=False).to_numpy(),
+            index=job_requirements['Job_ID'].to_numpy()
+        ).groupby(level=0).sum()
+        
+        df = self.job_recommendation_df
+        columns = [column for column in df.columns if not column.endswith('_List')]
+        rows_hash = pd.Series(
+            pd.util.hash_pandas_object(df[columns], index=False).to_numpy(),
+            index=df['Job_ID'].to_numpy()
+        ).groupby(level=0).sum()
+        
+        hashes = pd.DataFrame({
+            'requirements_hash': requirements_hash,
+            'rows_hash': rows_hash,
+        })
+        hashes.index.name = 'Job_ID'
+        return hashes
+    
+    def _posting_content_hashes(self) -> pd.Series:
+        """
+        LinkedInのjob_idごとに行の内容ハッシュを計算
+        """
+        if self.linkedin_jobs_df is None:
+            return pd.Series([], dtype='uint64', name='hash')
+        hashes = pd.Series(
+            pd.util.hash_pandas_object(self.linkedin_jobs_df, index=False).to_numpy(),
+            index=self.linkedin_jobs_df['job_id'].to_numpy(),
+            name='hash'
+        ).groupby(level=0).sum()
+        hashes.index.name = 'job_id'
+        return hashes
+    
+    def _salary_content_hash(self) -> Optional[str]:
+        """
+        給与データ全体の内容ハッシュ（変化したら全件を再計算する）
+        """
+        if self.salary_df is None:
+            return None
+        row_hashes = pd.util.hash_pandas_object(self.salary_df, index=False).to_numpy()
+        return hashlib.sha1(row_hashes.tobytes()).hexdigest()
+    
+    def _load_incremental_state(self, state_path: Path) -> Optional[Dict]:
+        """
+        前回の差分統合の状態を読み込む（存在しない場合はNone）
+        """
+        state_file = state_path / 'state.json'
+        if not state_file.exists():
+            return None
+        
+        with open(state_file, encoding='utf-8') as f:
+            state = json.load(f)
+        
+        mapping = mapping_from_frame(pd.read_parquet(state_path / 'mapping.parquet'))
+        
+        return {
+            'config': state['config'],
+            'bucket_stats': {int(bucket): stats for bucket, stats in state['bucket_stats'].items()},
+            'jobs': pd.read_parquet(state_path / 'jobs.parquet'),
+            'postings': pd.read_parquet(state_path / 'postings.parquet')['hash'],
+            'mapping': mapping,
         }
+    
+    def _save_incremental_state(
+        self,
+        state_path: Path,
+        config: Dict,
+        jobs: pd.DataFrame,
+        postings: pd.Series,
+        mapping: Dict,
+        bucket_stats: Dict
+    ):
+        """
+        次回の差分統合のためにマニフェストとマッチング結果を保存
+        """
+        state_path.mkdir(parents=True, exist_ok=True)
+        jobs.to_parquet(state_path / 'jobs.parquet')
+        postings.to_frame().to_parquet(state_path / 'postings.parquet')
+        mapping_to_frame(mapping).to_parquet(state_path / 'mapping.parquet', index=False)
+        
+        with open(state_path / 'state.json', 'w', encoding='utf-8') as f:
+            json.dump({
+                'config': config,
+                'bucket_stats': {str(bucket): stats for bucket, stats in bucket_stats.items()},
+            }, f, indent=2, ensure_ascii=False)
+    
+    def generate_mapping_report(self, output_path: str):
+        """
+        マッピング結果のレポートを生成
+        """
+        if self.integrated_df is not None:
+            report = {
+                'total_rows': len(self.integrated_df),
+                'unique_users': int(self.integrated_df['User_ID'].nunique()) if 'User_ID' in self.integrated_df else 0,
+                'unique_jobs': int(self.integrated_df['Job_ID'].nunique()) if 'Job_ID' in self.integrated_df else 0,
+                'linkedin_matched': int(self.integrated_df['job_title'].notna().sum()) if 'job_title' in self.integrated_df else 0,
+                'salary_matched': int(self.integrated_df['avg_salary_usd'].notna().sum()) if 'avg_salary_usd' in self.integrated_df else 0,
+                'columns': list(self.integrated_df.columns)
+            }
+        elif self.star_schema is not None:
+            view = StarSchemaView(self.star_schema)
+            report = {
+                **view.summary(),
+                'unique_users': int(self.star_schema['facts']['User_ID'].nunique()),
+                'columns': view.columns,
+                'star_schema': {name: len(self.star_schema[name]) for name in ['facts', 'users', 'jobs']},
+            }
+        else:
+            raise ValueError("統合データがありません")
+        if self.salary_stats is not None:
+            report['salary_enrichment'] = self.salary_stats
+        if self.metrics.stages:
+            report['metrics'] = self.metrics.to_dict()
         
         with open(output_path, 'w', encoding='utf-8') as f:
             json.dump(report, f, indent=2, ensure_ascii=False)
         
         print(f"📊 Mapping report saved to {output_path}")
         return report
+    
+    def run_pipeline(self, config: Dict, checkpoint: Optional[StageCheckpoint] = None) -> Dict:
+        """
+        設定に従って読み込み・マッチング・統合・保存を順に実行（バッチ実行用）
+        
+        checkpointを指定すると、各ステージ（load, match, integrate, save）の完了時に
+        出力をParquetで保存する。再実行時は、入力ファイルと設定が同じ完了済みの
+        ステージをCSVの解析やマッチングからやり直さず、保存した出力の読み込みで置き換える
+        
+        Args:
+            config: INTEGRATION_DEFAULTSと同じ項目の設定
+            checkpoint: チェックポイントの保存先
+        
+        Returns:
+            マッピングレポート
+        """
+        checkpoint = checkpoint or StageCheckpoint(None)
+        
+        # ステージ1: 読み込み
+        sources = {
+            'job_recommendation': self.load_job_recommendation,
+            'linkedin': self.load_linkedin_jobs,
+            'salary': self.load_salary_data,
+        }
+        load_key = stage_key(
+            'load', {name: file_signature(config[name]) for name in sources}, config['chunksize']
+        )
+        if checkpoint.is_complete('load', load_key):
+            print("⏭️  Resuming from checkpoint: load")
+            frames = {
+                name: checkpoint.load_frame('load', name) if checkpoint.has_frame('load', name) else None
+                for name in sources
+            }
+            self.job_recommendation_df = frames['job_recommendation']
+            self.linkedin_jobs_df = frames['linkedin']
+            self.salary_df = frames['salary']
+            self._linkedin_index = None
+            self._salary_cache = None
+            self.skill_vocabulary = SkillVocabulary.load(str(checkpoint.file_path('load', 'vocabulary.json')))
+        else:
+            for name, load in sources.items():
+                if config[name]:
+                    load(config[name], chunksize=config['chunksize'])
+            checkpoint.save(
+                'load', load_key,
+                frames={
+                    'job_recommendation': self.job_recommendation_df,
+                    'linkedin': self.linkedin_jobs_df,
+                    'salary': self.salary_df,
+                },
+                files={'vocabulary.json': self.skill_vocabulary.save}
+            )
+        
+        # ステージ2: スキルマッチング
+        match_key = stage_key('match', load_key, config['matching_method'], config['tolerance'])
+        job_mapping = None
+        if self.linkedin_jobs_df is not None:
+            if checkpoint.is_complete('match', match_key):
+                print("⏭️  Resuming from checkpoint: match")
+                job_mapping = mapping_from_frame(checkpoint.load_frame('match', 'mapping'))
+            else:
+                job_mapping = self.match_jobs_by_skills(
+                    tolerance=config['tolerance'],
+                    method=config['matching_method'],
+                    top_k=1,
+                    workers=config['workers']
+                )
+                checkpoint.save(
+                    'match', match_key,
+                    frames={'mapping': mapping_to_frame(job_mapping)},
+                    data={'matched_jobs': len(job_mapping)}
+                )
+        
+        # ステージ3: 統合（'star'形式ではユーザー行に求人の情報を複製しない）
+        star = config['format'] == 'star'
+        integrate_key = stage_key('integrate', match_key, star)
+        if checkpoint.is_complete('integrate', integrate_key):
+            print("⏭️  Resuming from checkpoint: integrate")
+            data = checkpoint.data('integrate')
+            if star:
+                self.star_schema = {
+                    name: checkpoint.load_frame('integrate', name) for name in ['facts', 'users', 'jobs']
+                }
+                self.star_schema['columns'] = data['columns']
+            else:
+                self.integrated_df = checkpoint.load_frame('integrate', 'integrated')
+            self.salary_stats = data.get('salary_stats')
+        else:
+            integrate = self.integrate_star_schema if star else self.integrate_datasets
+            integrate(
+                use_skill_matching=True,
+                fallback_to_id_match=True,
+                matching_method=config['matching_method'],
+                workers=config['workers'],
+                job_mapping=job_mapping
+            )
+            if star:
+                frames = {name: self.star_schema[name] for name in ['facts', 'users', 'jobs']}
+                data = {'salary_stats': self.salary_stats, 'columns': self.star_schema['columns']}
+            else:
+                frames = {'integrated': self.integrated_df}
+                data = {'salary_stats': self.salary_stats}
+            checkpoint.save('integrate', integrate_key, frames=frames, data=data)
+        
+        # ステージ4: 保存（出力が消えていれば書き直す）
+        save_key = stage_key('save', integrate_key, config['output'], config['format'])
+        if checkpoint.is_complete('save', save_key) and Path(config['output']).exists():
+            print(f"⏭️  Resuming from checkpoint: save ({config['output']})")
+        else:
+            self.save_integrated_dataset(config['output'], format=config['format'])
+            checkpoint.save('save', save_key, data={'output': config['output']})
+        
+        return self.generate_mapping_report(config['report'])
 
 
 def main():
     """
     メイン実行関数
+    
+    入力ファイルや出力先はコマンドライン引数か設定ファイル（--config）で指定する。
+    --checkpoint-dirを指定すると、失敗や再実行のときに完了済みのステージから再開する
     """
+    parser = argparse.ArgumentParser(description='データセット統合ツール')
+    parser.add_argument('--config', help='設定ファイル（JSON、項目はINTEGRATION_DEFAULTSと同じ）')
+    parser.add_argument('--job-recommendation', help='Job Recommendation Datasetのパス')
+    parser.add_argument('--linkedin', help='LinkedIn Job Postings CSVのパス')
+    parser.add_argument('--salary', help='Salary Dataset CSVのパス')
+    parser.add_argument('--output', help='統合データセットの出力先')
+    parser.add_argument(
+        '--format', choices=['csv', 'parquet', 'json', 'parquet_partitioned', 'star'],
+        help='出力形式（star: 求人の次元表とユーザー×求人の細いファクト表に分けて保存）'
+    )
+    parser.add_argument('--report', help='マッピングレポートの出力先')
+    parser.add_argument(
+        '--matching-method', choices=['index', 'matrix', 'bitset', 'exact'], help='スキルマッチングの方式'
+    )
+    parser.add_argument('--tolerance', type=float, help='マッチとみなすJaccard類似度の下限')
+    parser.add_argument('--workers', type=int, help='スキルマッチングのプロセス数')
+    parser.add_argument('--chunksize', type=int, help='分割読み込みの行数')
+    parser.add_argument('--cache-dir', help='読み込んだCSVのParquetキャッシュの保存先')
+    parser.add_argument('--checkpoint-dir', help='完了したステージの出力の保存先')
+    parser.add_argument(
+        '--no-resume', action='store_true', help='保存済みのチェックポイントを使わずに最初から実行する'
+    )
+    parser.add_argument('--metrics', help='ステージごとの計測結果を保存するJSONファイル')
+    parser.add_argument('--profile', action='store_true', help='各ステージをcProfileで計測する')
+    parser.add_argument('--profile-dir', help='cProfileの結果（.prof）の保存先')
+    parser.add_argument('--trace-memory', action='store_true', help='各ステージをtracemallocで計測する')
+    args = parser.parse_args()
+    config = load_batch_config(INTEGRATION_DEFAULTS, args.config, vars(args))
+    
     print("=" * 60)
     print("🚀 データセット統合ツール")
     print("=" * 60)
     
-    integrator = DatasetIntegrator()
+    # 計測結果を保存・プロファイルする場合だけ、ステージごとの表示とピークRSSの計測を有効にする
+    measured = bool(config['metrics'] or args.profile or args.profile_dir or args.trace_memory)
+    metrics = PipelineMetrics(
+        profile=args.profile or bool(args.profile_dir),
+        trace_memory=args.trace_memory,
+        profile_dir=args.profile_dir,
+        verbose=measured,
+        track_rss=measured
+    )
+    integrator = DatasetIntegrator(cache_dir=config['cache_dir'], metrics=metrics)
+    checkpoint = StageCheckpoint(config['checkpoint_dir'], resume=not args.no_resume)
     
-    # データセットを読み込む
-    # 注: 実際のファイルパスに置き換えてください
     try:
-        integrator.load_job_recommendation('Job Datsset.csv')
-    except FileNotFoundError:
-        print("⚠️  Job Recommendation Datasetが見つかりません")
-    
-    # LinkedIn Dataset（ダウンロード後にパスを指定）
-    linkedin_path = input("\n📁 LinkedIn Job Postings CSVのパス (Enterでスキップ): ").strip()
-    if linkedin_path and Path(linkedin_path).exists():
-        integrator.load_linkedin_jobs(linkedin_path)
-    
-    # Salary Dataset（ダウンロード後にパスを指定）
-    salary_path = input("📁 Salary Dataset CSVのパス (Enterでスキップ): ").strip()
-    if salary_path and Path(salary_path).exists():
-        integrator.load_salary_data(salary_path)
-    
-    # データセットを統合
-    if integrator.job_recommendation_df is not None:
-        integrated = integrator.integrate_datasets(
-            use_skill_matching=True,
-            fallback_to_id_match=True
-        )
-        
-        # 統合データを保存
-        output_file = 'integrated_job_dataset.csv'
-        integrator.save_integrated_dataset(output_file)
-        
-        # レポートを生成
-        integrator.generate_mapping_report('integration_report.json')
-        
-        print("\n" + "=" * 60)
-        print("✅ 統合完了!")
-        print("=" * 60)
-    else:
-        print("\n❌ 統合するデータセットがありません")
+        integrator.run_pipeline(config, checkpoint)
+    except FileNotFoundError as e:
+        print(f"\n❌ 入力ファイルが見つかりません: {e.filename}")
+        sys.exit(1)
+    
+    if measured:
+        metrics.print_summary()
+    if config['metrics']:
+        metrics.save(config['metrics'])
+    
+    print("\n" + "=" * 60)
+    print("✅ 統合完了!")
+    print("=" * 60)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,60 @@
+"""
+統合データセット読み込みモジュール
+integrate-datasets.pyの出力（CSV、Parquet、Job_IDでパーティション分割したParquet）を、
+必要な列と求人だけに絞って読み込む
+"""
+
+import pandas as pd
+from typing import Iterable, Optional
+import json
+from pathlib import Path
+
+
+# パーティション分割したParquet出力のメタデータファイル名
+# （"_"で始まるファイルはpyarrowのデータセット読み込みで無視される）
+DATASET_INFO_FILE = '_integrated_dataset.json'
+
+# パーティション分割に使うJob_IDのバケット番号の列
+PARTITION_COLUMN = 'job_bucket'
+
+
+def read_integrated_dataset(
+    path: str,
+    columns: Optional[Iterable[str]] = None,
+    job_ids: Optional[Iterable[int]] = None
+) -> pd.DataFrame:
+    """
+    統合データセットを読み込む（Parquetはメモリマップで読む）
+    
+    Args:
+        path: CSVファイル、Parquetファイルまたは'parquet_partitioned'の出力ディレクトリ
+        columns: 読み込む列（データセットにない列は無視する。Noneの場合はすべての列）
+        job_ids: 指定した場合は該当するJob_IDの行だけを読み込む
+            （パーティションと行グループの統計情報で読む範囲を絞る）
+    """
+    wanted = None if columns is None else set(columns)
+    if str(path).endswith('.csv'):
+        keep = None if wanted is None else wanted | ({'Job_ID'} if job_ids is not None else set())
+        df = pd.read_csv(path, usecols=None if keep is None else (lambda column: column in keep))
+        if job_ids is not None:
+            df = df[df['Job_ID'].isin(list(job_ids))].reset_index(drop=True)
+        return df if wanted is None else df[[column for column in df.columns if column in wanted]]
+    
+    import pyarrow.parquet as pq
+    
+    filters = None
+    if job_ids is not None:
+        job_ids = [int(job_id) for job_id in job_ids]
+        filters = [('Job_ID', 'in', job_ids)]
+        info_path = Path(path) / DATASET_INFO_FILE
+        if info_path.exists():
+            with open(info_path, encoding='utf-8') as f:
+                num_buckets = json.load(f)['num_buckets']
+            filters.append((PARTITION_COLUMN, 'in', sorted({job_id % num_buckets for job_id in job_ids})))
+    
+    read_columns = None
+    if wanted is not None:
+        names = pq.ParquetDataset(path).schema.names
+        read_columns = [column for column in names if column in wanted and column != PARTITION_COLUMN]
+    table = pq.read_table(path, columns=read_columns, memory_map=True, filters=filters)
+    return table.to_pandas().drop(columns=[PARTITION_COLUMN], errors='ignore')
@@ -0,0 +1,74 @@
+"""
+インタラクションログ読み込みモジュール
+追記のみのインタラクションログ（generate-user-logs.pyの出力のファイルやシャード）を列挙し、
+ウォーターマーク（処理済みの位置）以降のログだけを読み込む
+"""
+
+from typing import Dict, List, Sequence, Tuple
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+def pair_keys(user_ids: np.ndarray, job_ids: np.ndarray) -> np.ndarray:
+    """
+    (ユーザー, 求人) の組を1つのint64のキーにまとめる
+    """
+    return (np.asarray(user_ids, dtype=np.int64) << 32) | np.asarray(job_ids, dtype=np.int64)
+
+
+def log_segments(path: str) -> List[Path]:
+    """
+    ログの追記単位（ファイル、またはwrite_log_shardsの出力のシャード）を列挙
+    """
+    log_path = Path(path)
+    if log_path.is_dir():
+        if (log_path / 'logs').is_dir():
+            log_path = log_path / 'logs'
+        return sorted(log_path.glob('part-*'))
+    return [log_path]
+
+
+def read_new_logs(
+    path: str,
+    watermark: Dict[str, int],
+    columns: Sequence[str] = ('user_id', 'job_id', 'action'),
+    optional_columns: Sequence[str] = ()
+) -> Tuple[pd.DataFrame, Dict[str, int]]:
+    """
+    ウォーターマーク（セグメントごとの処理済み行数）より後ろのログだけを読み込む
+    
+    ログは追記のみとみなす。生成ログの時刻は順序どおりに並ばないため、
+    時刻ではなくセグメント内の位置で新しいログを判定する
+    
+    Args:
+        columns: 読み込む列
+        optional_columns: セグメントにあれば読み込む列（ないセグメントでは欠損値になる）
+    
+    Returns:
+        新しいログと更新後のウォーターマーク
+    """
+    wanted = list(columns) + [column for column in optional_columns if column not in columns]
+    frames = []
+    new_watermark = dict(watermark)
+    for segment in log_segments(path):
+        processed = watermark.get(segment.name, 0)
+        if segment.suffix == '.parquet':
+            import pyarrow.parquet as pq
+            names = pq.read_schema(segment).names
+            df = pd.read_parquet(
+                segment, columns=[column for column in wanted if column in names or column in columns]
+            ).iloc[processed:]
+        else:
+            df = pd.read_csv(
+                segment,
+                usecols=lambda column: column in wanted,
+                skiprows=range(1, processed + 1)
+            )
+        new_watermark[segment.name] = processed + len(df)
+        if len(df) > 0:
+            frames.append(df)
+    if not frames:
+        return pd.DataFrame({column: [] for column in wanted}), new_watermark
+    return pd.concat(frames, ignore_index=True).reindex(columns=wanted), new_watermark
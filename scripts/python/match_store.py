@@ -0,0 +1,201 @@
+"""
+マッチスコアストアモジュール
+(User_ID, Job_ID) ごとのMatch_ScoreとRecommendedをユーザー単位のCSR形式でディスクに保存し、
+メモリマップで読み込んで1組・1ユーザー・複数組の単位で引けるようにする
+"""
+
+from typing import Dict, Optional, Tuple
+import json
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+# ストアのメタデータファイル名
+MATCH_STORE_INFO_FILE = 'store.json'
+
+# ストアに保存する列
+MATCH_STORE_COLUMNS = ['User_ID', 'Job_ID', 'Match_Score', 'Recommended']
+
+# User_IDの範囲がユーザー数のこの倍数以下なら、User_IDから直接オフセットを引く
+DENSE_USER_RATIO = 4
+
+
+def build_match_store(df: pd.DataFrame, output_dir: str, score_dtype: str = 'float32') -> Dict:
+    """
+    User_ID, Job_ID, Match_Score, Recommended の表からマッチスコアストアを作成
+    
+    ユーザーごとの行をJob_IDの昇順に並べ、ユーザーの開始位置（offsets）と合わせて保存する。
+    同じ(User_ID, Job_ID)の組が複数ある場合は最初の行を使う
+    
+    Args:
+        df: MATCH_STORE_COLUMNSを含むDataFrame（Recommendedはなくてもよい）
+        output_dir: 出力先のディレクトリ（一時ディレクトリに書いてから置き換える）
+        score_dtype: スコアの型（'float32'または'float16'）
+    
+    Returns:
+        ストアのメタデータ
+    """
+    if score_dtype not in ('float32', 'float16'):
+        raise ValueError(f"未対応のスコアの型です: {score_dtype}")
+    
+    users = df['User_ID'].to_numpy(dtype=np.int64)
+    jobs = df['Job_ID'].to_numpy(dtype=np.int64)
+    order = np.lexsort((jobs, users))
+    users, jobs = users[order], jobs[order]
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = (users[1:] != users[:-1]) | (jobs[1:] != jobs[:-1])
+    order, users, jobs = order[first], users[first], jobs[first]
+    
+    scores = df['Match_Score'].to_numpy(dtype=np.float32)[order].astype(score_dtype)
+    if 'Recommended' in df.columns:
+        recommended = df['Recommended'].fillna(0).to_numpy(dtype=np.int8)[order]
+    else:
+        recommended = np.zeros(len(order), dtype=np.int8)
+    
+    user_ids, counts = np.unique(users, return_counts=True)
+    base = int(user_ids[0]) if len(user_ids) else 0
+    span = int(user_ids[-1]) - base + 1 if len(user_ids) else 0
+    dense = span <= DENSE_USER_RATIO * len(user_ids) + 1024
+    if dense:
+        # User_ID - base の位置にそのユーザーの開始位置を置く（いないユーザーは行数0）
+        slot_counts = np.zeros(span, dtype=np.int64)
+        slot_counts[user_ids - base] = counts
+    else:
+        slot_counts = counts
+    offsets = np.zeros(len(slot_counts) + 1, dtype=np.int64)
+    np.cumsum(slot_counts, out=offsets[1:])
+    
+    info = {
+        'num_users': int(len(user_ids)),
+        'num_pairs': int(len(jobs)),
+        'score_dtype': score_dtype,
+        'dense': bool(dense),
+        'base_user_id': base,
+        'max_row_length': int(counts.max()) if len(counts) else 0,
+    }
+    
+    output = Path(output_dir)
+    staging = output.with_name(output.name + '.tmp')
+    if staging.exists():
+        shutil.rmtree(staging)
+    staging.mkdir(parents=True)
+    np.save(staging / 'offsets.npy', offsets)
+    np.save(staging / 'job_ids.npy', jobs.astype(np.int32))
+    np.save(staging / 'scores.npy', scores)
+    np.save(staging / 'recommended.npy', recommended)
+    if not dense:
+        np.save(staging / 'user_ids.npy', user_ids)
+    with open(staging / MATCH_STORE_INFO_FILE, 'w', encoding='utf-8') as f:
+        json.dump(info, f, indent=2, ensure_ascii=False)
+    
+    if output.exists():
+        shutil.rmtree(output)
+    os.replace(staging, output)
+    return info
+
+
+class MatchStore:
+    """マッチスコアストアの検索クラス（配列はメモリマップで必要な部分だけ読む）"""
+    
+    def __init__(self, store_dir: str, mmap: bool = True):
+        """
+        初期化
+        
+        Args:
+            store_dir: build_match_storeの出力先
+            mmap: Falseの場合は全体をメモリに読み込む
+        """
+        path = Path(store_dir)
+        mmap_mode = 'r' if mmap else None
+        with open(path / MATCH_STORE_INFO_FILE, encoding='utf-8') as f:
+            self.info: Dict = json.load(f)
+        self.offsets = np.load(path / 'offsets.npy', mmap_mode=mmap_mode)
+        self.job_ids = np.load(path / 'job_ids.npy', mmap_mode=mmap_mode)
+        self.scores = np.load(path / 'scores.npy', mmap_mode=mmap_mode)
+        self.recommended = np.load(path / 'recommended.npy', mmap_mode=mmap_mode)
+        self.user_ids: Optional[np.ndarray] = None
+        if not self.info['dense']:
+            self.user_ids = np.load(path / 'user_ids.npy', mmap_mode=mmap_mode)
+    
+    def __len__(self) -> int:
+        return self.info['num_pairs']
+    
+    def _row_bounds(self, user_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        ユーザーごとの行の範囲 [start, stop)（ストアにないユーザーは空の範囲）
+        """
+        user_ids = np.asarray(user_ids, dtype=np.int64)
+        num_slots = len(self.offsets) - 1
+        if self.user_ids is None:
+            slots = user_ids - self.info['base_user_id']
+            valid = (slots >= 0) & (slots < num_slots)
+        else:
+            slots = np.searchsorted(self.user_ids, user_ids)
+            valid = slots < num_slots
+            valid[valid] = np.asarray(self.user_ids)[slots[valid]] == user_ids[valid]
+        slots = np.where(valid, slots, 0)
+        start = np.where(valid, self.offsets[slots], 0)
+        stop = np.where(valid, self.offsets[slots + 1], 0)
+        return start, stop
+    
+    def row(self, user_id: int) -> Dict[str, np.ndarray]:
+        """
+        1ユーザーの全ての求人（Job_IDの昇順）
+        
+        Returns:
+            {'job_ids', 'scores', 'recommended'}（メモリマップの場合は読み取り専用のビュー）
+        """
+        start, stop = (int(bound[0]) for bound in self._row_bounds(np.array([user_id])))
+        return {
+            'job_ids': self.job_ids[start:stop],
+            'scores': self.scores[start:stop],
+            'recommended': self.recommended[start:stop],
+        }
+    
+    def positions(self, user_ids, job_ids) -> np.ndarray:
+        """
+        (User_ID, Job_ID) の組ごとのストア内の位置（ない組は-1）
+        
+        各組のユーザーの行の中を、全ての組でまとめて二分探索する
+        """
+        job_ids = np.asarray(job_ids, dtype=np.int64)
+        lo, hi = self._row_bounds(user_ids)
+        stop = hi.copy()
+        last = max(len(self.job_ids) - 1, 0)
+        for _ in range(int(self.info['max_row_length']).bit_length()):
+            active = lo < hi
+            if not active.any():
+                break
+            mid = (lo + hi) // 2
+            right = active & (self.job_ids[np.minimum(mid, last)] < job_ids)
+            lo = np.where(right, mid + 1, lo)
+            hi = np.where(active & ~right, mid, hi)
+        found = lo < stop
+        found[found] = self.job_ids[lo[found]] == job_ids[found]
+        return np.where(found, lo, -1)
+    
+    def lookup(self, user_ids, job_ids) -> Dict[str, np.ndarray]:
+        """
+        複数の(User_ID, Job_ID)の組をまとめて引く
+        
+        Returns:
+            {'scores': float32（ない組はNaN）, 'recommended': int8（ない組は-1）, 'found': bool}
+        """
+        positions = self.positions(user_ids, job_ids)
+        found = positions >= 0
+        scores = np.full(len(positions), np.nan, dtype=np.float32)
+        scores[found] = self.scores[positions[found]]
+        recommended = np.full(len(positions), -1, dtype=np.int8)
+        recommended[found] = self.recommended[positions[found]]
+        return {'scores': scores, 'recommended': recommended, 'found': found}
+    
+    def score(self, user_id: int, job_id: int) -> Optional[float]:
+        """
+        1組のMatch_Score（ストアにない組はNone）
+        """
+        position = int(self.positions(np.array([user_id]), np.array([job_id]))[0])
+        return float(self.scores[position]) if position >= 0 else None
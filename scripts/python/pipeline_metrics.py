@@ -0,0 +1,290 @@
+"""
+処理ステージの計測モジュール
+各ステージの経過時間・CPU時間・ステージ中のピークRSS・処理件数を記録し、JSONで出力する
+"""
+
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windowsにはresourceモジュールがない
+    resource = None
+
+
+def _peak_rss_kb() -> Optional[int]:
+    """
+    現在のピークRSS（KB）。Linuxではリセットできる/proc/self/statusのVmHWM、それ以外はru_maxrss
+    """
+    try:
+        with open('/proc/self/status', encoding='ascii') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linuxはキロバイト、macOSはバイト単位
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def _reset_peak_rss() -> bool:
+    """
+    ピークRSSを現在のRSSに戻す（Linuxの/proc/self/clear_refsに5を書く。できなければFalse）
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w', encoding='ascii') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+class _StagePeakRss:
+    """
+    実行中のステージごとのピークRSS（プロセス全体で1つ）
+    
+    ステージの開始・終了のたびに、それまでのピークを実行中のすべてのステージに配ってから
+    ピークをリセットする。これにより各ステージのピークは、前のステージの大きな確保を含まない。
+    リセットできない環境では、ステージ中にプロセスのピークが更新された場合だけその値を使う
+    """
+    
+    def __init__(self):
+        self.stages: Dict[int, Dict] = {}
+        self.process_peak_kb = 0
+        self._next_key = 0
+    
+    def _collect(self) -> Tuple[Optional[int], bool]:
+        """
+        前回のリセット以降のピークを実行中のステージに配り、ピークをリセットする
+        """
+        peak = _peak_rss_kb()
+        if peak is None:
+            return None, False
+        self.process_peak_kb = max(self.process_peak_kb, peak)
+        for stage in self.stages.values():
+            stage['peak'] = max(stage['peak'], peak)
+        return peak, _reset_peak_rss()
+    
+    def start(self) -> int:
+        """
+        ステージの計測を開始し、stopに渡すキーを返す
+        """
+        peak, reset = self._collect()
+        key = self._next_key
+        self._next_key += 1
+        self.stages[key] = {'peak': 0, 'start': None if reset else peak}
+        return key
+    
+    def stop(self, key: int) -> Optional[float]:
+        """
+        ステージ中のピークRSS（MB）を返す（求められない場合はNone）
+        """
+        peak, _ = self._collect()
+        stage = self.stages.pop(key)
+        if peak is None or (stage['start'] is not None and stage['peak'] <= stage['start']):
+            return None
+        return round(stage['peak'] / 1024, 1)
+
+
+_STAGE_PEAK_RSS = _StagePeakRss()
+
+
+def peak_rss_mb() -> Optional[float]:
+    """
+    プロセス開始以降のピークRSS（MB）を返す（取得できない環境ではNone）
+    
+    ステージの計測でリセットされた分も含める
+    """
+    peak = _peak_rss_kb()
+    if peak is None:
+        return None
+    return round(max(peak, _STAGE_PEAK_RSS.process_peak_kb) / 1024, 1)
+
+
+def cpu_seconds() -> float:
+    """
+    このプロセスと終了済みの子プロセス（並列処理のワーカー）の合計CPU時間
+    """
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+class PipelineMetrics:
+    """処理ステージごとの計測結果を集めるクラス"""
+    
+    def __init__(
+        self,
+        profile: bool = False,
+        trace_memory: bool = False,
+        profile_dir: Optional[str] = None,
+        verbose: bool = False,
+        track_rss: bool = False
+    ):
+        """
+        初期化
+        
+        Args:
+            profile: Trueの場合、各ステージをcProfileで計測する
+            trace_memory: Trueの場合、各ステージをtracemallocで計測する（処理は遅くなる）
+            profile_dir: 指定した場合、ステージごとのcProfileの結果を.profファイルに保存する
+            verbose: Trueの場合、ステージの終了時に計測結果を表示する
+            track_rss: Trueの場合、ステージごとのピークRSSを計測する。Linuxではステージの
+                開始・終了のたびにプロセスのピークRSSをリセットするため、計測結果を
+                集める場合だけ有効にする（Falseの場合、peak_rss_mbはNone）
+        """
+        self.profile = profile
+        self.trace_memory = trace_memory
+        self.profile_dir = Path(profile_dir) if profile_dir else None
+        self.verbose = verbose
+        self.track_rss = track_rss
+        self.stages: List[Dict] = []
+        self._stack: List[str] = []
+    
+    @contextmanager
+    def stage(self, name: str, rows: Optional[int] = None) -> Iterator[Dict]:
+        """
+        with文のブロックを1つのステージとして計測する
+        
+        入れ子のステージは "親/子" の名前で記録される。
+        処理件数がブロック内で決まる場合は、yieldされた辞書の'rows'に設定する。
+        peak_rss_mbはこのステージ（と子のステージ）の実行中のピークRSSで、
+        前のステージのピークは含まない（track_rss=Falseの場合はNone）
+        
+        例:
+            with metrics.stage('match') as record:
+                mapping = ...
+                record['rows'] = len(mapping)
+        """
+        self._stack.append(name)
+        record: Dict = {'stage': '/'.join(self._stack), 'rows': rows}
+        
+        # cProfileは同時に1つしか有効にできないため、最上位のステージだけを計測する
+        profiler = cProfile.Profile() if self.profile and len(self._stack) == 1 else None
+        started_tracing = False
+        if self.trace_memory:
+            if tracemalloc.is_tracing():
+                tracemalloc.reset_peak()
+            else:
+                tracemalloc.start()
+                started_tracing = True
+        
+        rss_key = _STAGE_PEAK_RSS.start() if self.track_rss else None
+        wall_start = time.perf_counter()
+        cpu_start = cpu_seconds()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield record
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            wall = time.perf_counter() - wall_start
+            cpu = cpu_seconds() - cpu_start
+            
+            record['wall_seconds'] = round(wall, 4)
+            record['cpu_seconds'] = round(cpu, 4)
+            record['peak_rss_mb'] = _STAGE_PEAK_RSS.stop(rss_key) if rss_key is not None else None
+            if record['rows'] is not None:
+                record['rows'] = int(record['rows'])
+                record['rows_per_second'] = round(record['rows'] / wall, 1) if wall > 0 else None
+            
+            if self.trace_memory:
+                _, peak = tracemalloc.get_traced_memory()
+                record['traced_peak_mb'] = round(peak / (1024 * 1024), 1)
+                if started_tracing:
+                    tracemalloc.stop()
+            if profiler is not None:
+                record['profile'] = self._summarize_profile(profiler, record['stage'])
+            
+            self._stack.pop()
+            self.stages.append(record)
+            if self.verbose:
+                self._print_record(record)
+    
+    def _summarize_profile(self, profiler: cProfile.Profile, stage: str, limit: int = 10) -> Dict:
+        """
+        cProfileの結果から累積時間の上位の関数をまとめる（profile_dirがあれば.profも保存）
+        """
+        summary: Dict = {}
+        if self.profile_dir is not None:
+            self.profile_dir.mkdir(parents=True, exist_ok=True)
+            path = self.profile_dir / f"{stage.replace('/', '.')}.prof"
+            profiler.dump_stats(str(path))
+            summary['file'] = str(path)
+        
+        stats = pstats.Stats(profiler, stream=io.StringIO())
+        stats.sort_stats('cumulative')
+        summary['top_functions'] = [
+            {
+                'function': f"{Path(filename).name}:{line}({function})",
+                'calls': calls,
+                'cumulative_seconds': round(cumulative, 4),
+            }
+            for (filename, line, function), (_, calls, _, cumulative, _) in sorted(
+                stats.stats.items(), key=lambda item: -item[1][3]
+            )[:limit]
+        ]
+        return summary
+    
+    def _print_record(self, record: Dict):
+        """
+        ステージの計測結果を1行で表示
+        """
+        parts = [f"{record['wall_seconds']:.3f}s wall", f"{record['cpu_seconds']:.3f}s cpu"]
+        if record['peak_rss_mb'] is not None:
+            parts.append(f"peak RSS {record['peak_rss_mb']:,.1f} MB")
+        if record.get('rows_per_second') is not None:
+            parts.append(f"{record['rows']:,} rows ({record['rows_per_second']:,.0f} rows/s)")
+        print(f"   ⏱️  [{record['stage']}] " + ", ".join(parts))
+    
+    def to_dict(self) -> Dict:
+        """
+        計測結果をJSONに変換できる辞書で返す
+        """
+        return {
+            'stages': self.stages,
+            'total_wall_seconds': round(
+                sum(record['wall_seconds'] for record in self.stages if '/' not in record['stage']), 4
+            ),
+            'process_peak_rss_mb': peak_rss_mb(),
+        }
+    
+    def save(self, output_path: str):
+        """
+        計測結果をJSONファイルに保存
+        """
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
+        print(f"📊 Metrics saved to {output_path}")
+    
+    def print_summary(self):
+        """
+        全ステージの計測結果を表形式で表示
+        """
+        if not self.stages:
+            return
+        print("\n📊 Stage metrics:")
+        print(f"   {'stage':<32} {'wall(s)':>9} {'cpu(s)':>9} {'rows/s':>12} {'peak RSS(MB)':>13}")
+        for record in self.stages:
+            rate = record.get('rows_per_second')
+            rss = record['peak_rss_mb']
+            print(
+                f"   {record['stage']:<32} {record['wall_seconds']:>9.3f} {record['cpu_seconds']:>9.3f}"
+                f" {(f'{rate:,.0f}' if rate is not None else '-'):>12}"
+                f" {(f'{rss:,.1f}' if rss is not None else '-'):>13}"
+            )
+        process_peak = peak_rss_mb()
+        if process_peak is not None:
+            print(f"   (process peak RSS: {process_peak:,.1f} MB)")
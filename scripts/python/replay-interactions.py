@@ -0,0 +1,471 @@
+#!/usr/bin/env python3
+"""
+インタラクションログ再生スクリプト
+生成したログを時系列のイベント列に変換し、/api/interactions への書き込み負荷を再現する
+"""
+
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+import argparse
+import asyncio
+import json
+import time
+from urllib.parse import urlparse
+
+from interaction_logs import read_new_logs
+
+
+VALID_ACTIONS = ('like', 'dislike', 'skip')
+
+
+def build_event_stream(
+    logs_df: pd.DataFrame,
+    duration_seconds: float,
+    diurnal_amplitude: float = 0.6,
+    peak_hour: float = 21.0,
+    bursts: Optional[List[Tuple[float, float, float]]] = None,
+    start_hour: float = 0.0,
+    seed: Optional[int] = None
+) -> pd.DataFrame:
+    """
+    ログに、日周変動とバーストを持つ到着時刻を割り当てて時系列順に並べる
+    
+    到着率 λ(t) = 日周変動 × バースト倍率 に比例するように、
+    1秒単位の区間へ多項分布でイベント数を割り振り、区間内では一様に配置する
+    （非斉次ポアソン過程の近似）。元のログの時刻の前後関係は保つ
+    
+    Args:
+        logs_df: user_id, job_id, action, timestamp を含むログ
+        duration_seconds: イベント列全体の長さ（秒、再生前の時間軸）
+        diurnal_amplitude: 日周変動の振幅（0で一定、1でピーク時の2倍/谷で0）
+        peak_hour: 到着率が最大になる時刻（時）
+        bursts: (開始秒, 継続秒数, 倍率) のリスト
+        start_hour: イベント列の開始時刻（時）
+        seed: 乱数シード
+    
+    Returns:
+        offset_seconds（開始からの秒数）順に並んだイベントのDataFrame
+    """
+    rng = np.random.default_rng(seed)
+    
+    # 1秒ごとの到着率
+    seconds = np.arange(int(np.ceil(duration_seconds)))
+    hours = start_hour + seconds / 3600.0
+    rate = 1.0 + diurnal_amplitude * np.cos(2 * np.pi * (hours - peak_hour) / 24.0)
+    for burst_start, burst_duration, multiplier in bursts or []:
+        in_burst = (seconds >= burst_start) & (seconds < burst_start + burst_duration)
+        rate[in_burst] *= multiplier
+    rate = np.clip(rate, 0.0, None)
+    if rate.sum() == 0:
+        raise ValueError("到着率が常に0です。プロファイルを見直してください")
+    
+    # 区間ごとのイベント数を多項分布で決め、区間内に一様に配置
+    counts = rng.multinomial(len(logs_df), rate / rate.sum())
+    offsets = np.repeat(seconds, counts) + rng.random(len(logs_df))
+    offsets.sort()
+    
+    # 元のタイムスタンプ順にイベントを並べて、新しい時刻を割り当てる
+    if 'timestamp' in logs_df.columns and logs_df['timestamp'].notna().any():
+        original_order = np.argsort(
+            pd.to_datetime(logs_df['timestamp']).to_numpy(), kind='stable'
+        )
+        events = logs_df.iloc[original_order].reset_index(drop=True)
+    else:
+        events = logs_df.reset_index(drop=True)
+    
+    events = events[['user_id', 'job_id', 'action']].copy()
+    events['offset_seconds'] = offsets
+    return events
+
+
+class InteractionStandInServer:
+    """
+    /api/interactions のPOSTを模したローカルHTTPサーバー
+    
+    Next.jsのルートと同じバリデーションを行い、インタラクションをメモリに保存する
+    """
+    
+    def __init__(
+        self,
+        host: str = '127.0.0.1',
+        port: int = 0,
+        service_time_ms: float = 0.0,
+        chunked: bool = False
+    ):
+        """
+        初期化
+        
+        Args:
+            host: 待ち受けるホスト
+            port: 待ち受けるポート（0の場合は空いているポート）
+            service_time_ms: 1リクエストあたりの模擬的な書き込み時間（ミリ秒）
+            chunked: Trueの場合はNext.jsのルートハンドラと同じく
+                Content-Lengthを付けずにTransfer-Encoding: chunkedで応答する
+        """
+        self.host = host
+        self.port = port
+        self.service_time_ms = service_time_ms
+        self.chunked = chunked
+        self.interactions: List[Dict] = []
+        self._server: Optional[asyncio.AbstractServer] = None
+    
+    async def start(self) -> str:
+        """
+        サーバーを起動し、POST先のURLを返す
+        """
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return f"http://{self.host}:{self.port}/api/interactions"
+    
+    async def stop(self):
+        """
+        サーバーを停止
+        """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+    
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        1つの接続上のリクエストを順に処理（keep-alive）
+        """
+        try:
+            while True:
+                request = await _read_http_message(reader)
+                if request is None:
+                    break
+                start_line, _, body = request
+                method, path = start_line.split(' ')[:2]
+                
+                if method == 'POST' and path == '/api/interactions':
+                    status, payload = await self._save_interaction(body)
+                else:
+                    status, payload = 404, {'error': 'Not found'}
+                
+                data = json.dumps(payload).encode()
+                if self.chunked:
+                    framing = "Transfer-Encoding: chunked"
+                    data = f"{len(data):x}\r\n".encode() + data + b"\r\n0\r\n\r\n"
+                else:
+                    framing = f"Content-Length: {len(data)}"
+                writer.write(
+                    f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"{framing}\r\n\r\n".encode() + data
+                )
+                await writer.drain()
+        except (ConnectionResetError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+    
+    async def _save_interaction(self, body: bytes) -> Tuple[int, Dict]:
+        """
+        app/api/interactions/route.ts のPOSTと同じバリデーションで保存
+        """
+        try:
+            data = json.loads(body)
+        except ValueError:
+            return 500, {'error': 'Failed to save interaction'}
+        
+        user_id, job_id, action = data.get('user_id'), data.get('job_id'), data.get('action')
+        if not user_id or not job_id or not action:
+            return 400, {'error': 'Missing required fields: user_id, job_id, action'}
+        if action not in VALID_ACTIONS:
+            return 400, {'error': 'Invalid action. Must be one of: like, dislike, skip'}
+        
+        if self.service_time_ms > 0:
+            await asyncio.sleep(self.service_time_ms / 1000)
+        self.interactions.append({'user_id': user_id, 'job_id': job_id, 'action': action})
+        return 200, {'success': True, 'message': 'Interaction saved'}
+
+
+async def _read_http_message(reader: asyncio.StreamReader) -> Optional[Tuple[str, Dict[str, str], bytes]]:
+    """
+    HTTP/1.1のメッセージ（開始行、ヘッダー、本文）を1つ読む
+    
+    本文はTransfer-Encoding: chunkedならチャンクを連結し、Content-Lengthがあればその長さだけ読む。
+    どちらもない応答は接続が閉じられるまでを本文とする（_closes_connectionを参照）
+    """
+    start_line = await reader.readline()
+    if not start_line:
+        return None
+    start_line = start_line.decode().strip()
+    
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode().partition(':')
+        headers[name.strip().lower()] = value.strip()
+    
+    if 'chunked' in headers.get('transfer-encoding', '').lower():
+        body = await _read_chunked_body(reader)
+    elif 'content-length' in headers:
+        body = await reader.readexactly(int(headers['content-length']))
+    elif start_line.startswith('HTTP/') and _response_has_body(start_line):
+        body = await reader.read()
+    else:
+        body = b''
+    return start_line, headers, body
+
+
+async def _read_chunked_body(reader: asyncio.StreamReader) -> bytes:
+    """
+    Transfer-Encoding: chunked の本文を読み、チャンクを連結して返す（トレーラーは読み捨てる）
+    """
+    chunks = []
+    while True:
+        size_line = await reader.readline()
+        if not size_line:
+            raise asyncio.IncompleteReadError(b''.join(chunks), None)
+        size = int(size_line.split(b';')[0].strip(), 16)
+        if size == 0:
+            while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                pass
+            return b''.join(chunks)
+        chunks.append(await reader.readexactly(size))
+        await reader.readexactly(2)
+
+
+def _response_has_body(status_line: str) -> bool:
+    """
+    応答が本文を持ちうるか（1xx, 204, 304は本文を持たない）
+    """
+    status = int(status_line.split(' ')[1])
+    return not (100 <= status < 200 or status in (204, 304))
+
+
+def _closes_connection(message: Tuple[str, Dict[str, str], bytes]) -> bool:
+    """
+    応答のあとに接続が閉じられるか（Connection: close、または長さの分からない本文）
+    """
+    start_line, headers, _ = message
+    if headers.get('connection', '').lower() == 'close':
+        return True
+    has_length = 'content-length' in headers or 'chunked' in headers.get('transfer-encoding', '').lower()
+    return not has_length and _response_has_body(start_line)
+
+
+class TrafficReplayer:
+    """
+    イベント列を目標レートまたはN倍速で /api/interactions にPOSTするクラス
+    """
+    
+    def __init__(self, url: str, concurrency: int = 32):
+        """
+        初期化
+        
+        Args:
+            url: POST先のURL（http://のみ対応）
+            concurrency: 同時に使うkeep-alive接続の数
+        """
+        parsed = urlparse(url)
+        if parsed.scheme != 'http':
+            raise ValueError("http:// のURLのみ対応しています")
+        self.host = parsed.hostname
+        self.port = parsed.port or 80
+        self.path = parsed.path or '/'
+        self.concurrency = concurrency
+    
+    async def replay(
+        self,
+        events: pd.DataFrame,
+        speed: float = 1.0,
+        rate: Optional[float] = None
+    ) -> Dict:
+        """
+        イベント列を再生して、スループットとレイテンシを計測
+        
+        送信時刻はイベントの時刻から事前に決める（オープンループ）。
+        サーバーが遅れても送信予定は変わらないため、遅延は lag として記録される
+        
+        Args:
+            events: build_event_streamの戻り値
+            speed: 時間軸の倍率（2.0なら2倍速）
+            rate: 指定した場合は時刻を無視して毎秒rate件の一定レートで送る
+        
+        Returns:
+            計測結果
+        """
+        count = len(events)
+        if rate is not None:
+            schedule = np.arange(count) / rate
+        else:
+            schedule = events['offset_seconds'].to_numpy() / speed
+        
+        payloads = [
+            json.dumps({'user_id': int(user_id), 'job_id': int(job_id), 'action': action}).encode()
+            for user_id, job_id, action in zip(
+                events['user_id'].tolist(), events['job_id'].tolist(), events['action'].tolist()
+            )
+        ]
+        
+        queue: asyncio.Queue = asyncio.Queue()
+        latencies = np.full(count, np.nan)
+        lags = np.zeros(count)
+        statuses = np.zeros(count, dtype=np.int16)
+        
+        async def dispatch(start: float):
+            for index, send_at in enumerate(schedule.tolist()):
+                delay = start + send_at - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                await queue.put(index)
+            for _ in range(self.concurrency):
+                await queue.put(None)
+        
+        async def worker(start: float):
+            connection = None
+            try:
+                while True:
+                    index = await queue.get()
+                    if index is None:
+                        break
+                    if connection is None:
+                        connection = await asyncio.open_connection(self.host, self.port)
+                    reader, writer = connection
+                    sent = time.perf_counter()
+                    lags[index] = sent - (start + schedule[index])
+                    body = payloads[index]
+                    writer.write(
+                        f"POST {self.path} HTTP/1.1\r\n"
+                        f"Host: {self.host}:{self.port}\r\n"
+                        f"Content-Type: application/json\r\n"
+                        f"Content-Length: {len(body)}\r\n"
+                        f"Connection: keep-alive\r\n\r\n".encode() + body
+                    )
+                    try:
+                        await writer.drain()
+                        response = await _read_http_message(reader)
+                    except (ConnectionError, asyncio.IncompleteReadError):
+                        response = None
+                    latencies[index] = time.perf_counter() - sent
+                    statuses[index] = int(response[0].split(' ')[1]) if response else 0
+                    # サーバーが接続を閉じる応答（または失敗）の後は、次のリクエストで接続し直す
+                    if response is None or _closes_connection(response):
+                        writer.close()
+                        connection = None
+            finally:
+                if connection is not None:
+                    connection[1].close()
+        
+        print(f"\n▶️  Replaying {count:,} events with {self.concurrency} connections...")
+        start = time.perf_counter()
+        await asyncio.gather(dispatch(start), *[worker(start) for _ in range(self.concurrency)])
+        elapsed = time.perf_counter() - start
+        
+        latency_ms = latencies[~np.isnan(latencies)] * 1000
+        percentiles = np.percentile(latency_ms, [50, 95, 99]) if len(latency_ms) else [np.nan] * 3
+        return {
+            'events': count,
+            'succeeded': int((statuses == 200).sum()),
+            'failed': int((statuses != 200).sum()),
+            'elapsed_seconds': round(elapsed, 3),
+            'target_rate_per_sec': round(count / schedule[-1], 1) if count > 1 and schedule[-1] > 0 else None,
+            'achieved_rate_per_sec': round(count / elapsed, 1) if elapsed > 0 else None,
+            'latency_ms': {
+                'p50': round(float(percentiles[0]), 3),
+                'p95': round(float(percentiles[1]), 3),
+                'p99': round(float(percentiles[2]), 3),
+                'max': round(float(latency_ms.max()), 3) if len(latency_ms) else None,
+            },
+            'max_lag_ms': round(float(lags.max() * 1000), 3) if count else 0.0,
+        }
+
+
+def parse_burst(value: str) -> Tuple[float, float, float]:
+    """
+    "開始秒:継続秒数:倍率" 形式のバースト指定を解析
+    """
+    start, duration, multiplier = (float(part) for part in value.split(':'))
+    return start, duration, multiplier
+
+
+async def run(args: argparse.Namespace) -> Dict:
+    """
+    イベント列を作成し、スタンドインサーバー（または指定URL）に対して再生
+    """
+    logs_df, _ = read_new_logs(args.logs, {}, optional_columns=['timestamp'])
+    if args.limit:
+        logs_df = logs_df.head(args.limit)
+    print(f"   ✅ Loaded {len(logs_df):,} logs")
+    
+    events = build_event_stream(
+        logs_df,
+        duration_seconds=args.duration,
+        diurnal_amplitude=args.diurnal_amplitude,
+        peak_hour=args.peak_hour,
+        bursts=args.burst,
+        start_hour=args.start_hour,
+        seed=args.seed
+    )
+    
+    server = None
+    url = args.target_url
+    if url is None:
+        server = InteractionStandInServer(service_time_ms=args.service_time_ms)
+        url = await server.start()
+        print(f"🧪 Stand-in server listening on {url}")
+    
+    try:
+        replayer = TrafficReplayer(url, concurrency=args.concurrency)
+        result = await replayer.replay(events, speed=args.speed, rate=args.rate)
+    finally:
+        if server is not None:
+            await server.stop()
+    
+    if server is not None:
+        result['stored_interactions'] = len(server.interactions)
+    return result
+
+
+def main():
+    """
+    メイン実行関数
+    """
+    parser = argparse.ArgumentParser(description='インタラクションログ再生ツール')
+    parser.add_argument('logs', help='ログファイル（CSV/Parquet）またはシャードのディレクトリ')
+    parser.add_argument('--duration', type=float, default=3600.0, help='イベント列の長さ（秒）')
+    parser.add_argument('--start-hour', type=float, default=0.0, help='イベント列の開始時刻（時）')
+    parser.add_argument('--diurnal-amplitude', type=float, default=0.6, help='日周変動の振幅')
+    parser.add_argument('--peak-hour', type=float, default=21.0, help='到着率が最大になる時刻（時）')
+    parser.add_argument(
+        '--burst', type=parse_burst, action='append',
+        help='バースト "開始秒:継続秒数:倍率"（複数指定可）'
+    )
+    parser.add_argument('--speed', type=float, default=1.0, help='再生速度の倍率')
+    parser.add_argument('--rate', type=float, help='一定レートで送る場合の毎秒イベント数')
+    parser.add_argument('--concurrency', type=int, default=32, help='同時接続数')
+    parser.add_argument('--limit', type=int, help='再生するログの最大件数')
+    parser.add_argument('--seed', type=int, help='乱数シード')
+    parser.add_argument('--target-url', help='POST先（省略時はローカルのスタンドインサーバー）')
+    parser.add_argument('--service-time-ms', type=float, default=0.0, help='スタンドインの模擬書き込み時間')
+    parser.add_argument('--output', help='結果を保存するJSONファイル')
+    args = parser.parse_args()
+    
+    print("=" * 60)
+    print("🚀 インタラクションログ再生ツール")
+    print("=" * 60)
+    
+    result = asyncio.run(run(args))
+    
+    print(f"\n📊 Replay Results:")
+    print(f"   - Events: {result['events']:,} (succeeded {result['succeeded']:,}, failed {result['failed']:,})")
+    print(f"   - Elapsed: {result['elapsed_seconds']:.2f}s")
+    print(f"   - Target rate: {result['target_rate_per_sec']} events/s")
+    print(f"   - Achieved rate: {result['achieved_rate_per_sec']} events/s")
+    latency = result['latency_ms']
+    print(f"   - Latency p50/p95/p99: {latency['p50']:.2f} / {latency['p95']:.2f} / {latency['p99']:.2f} ms")
+    print(f"   - Max scheduling lag: {result['max_lag_ms']:.2f} ms")
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+        print(f"\n💾 Results saved to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,207 @@
+"""
+スキル語彙モジュール
+各スクリプトで共通のスキル正規化（大文字小文字・別名の統一）と整数コード化を行う
+"""
+
+import pandas as pd
+import numpy as np
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+import json
+from pathlib import Path
+
+
+# 表記ゆれを吸収する別名（正規化後の表記 → 正規の表記）
+DEFAULT_ALIASES = {
+    'js': 'javascript',
+    'ts': 'typescript',
+    'golang': 'go',
+    'k8s': 'kubernetes',
+    'ml': 'machine learning',
+    'postgres': 'postgresql',
+    'nodejs': 'node.js',
+    'node': 'node.js',
+    'c plus plus': 'c++',
+}
+
+# スキルIDはuint16で保持する
+MAX_SKILLS = np.iinfo(np.uint16).max + 1
+
+SkillInput = Union[str, Sequence[str], float, None]
+
+
+class SkillVocabulary:
+    """スキル名 ⇔ スキルIDの語彙クラス"""
+    
+    def __init__(self, aliases: Optional[Dict[str, str]] = None):
+        """
+        初期化
+        
+        Args:
+            aliases: 別名 → 正規の表記の辞書（省略時はDEFAULT_ALIASES）
+        """
+        aliases = DEFAULT_ALIASES if aliases is None else aliases
+        self.aliases = {self._fold(alias): self._fold(skill) for alias, skill in aliases.items()}
+        # 正規化したスキル名 → スキルID
+        self.codes: Dict[str, int] = {}
+        # スキルID → 表示用のスキル名（最初に現れた表記）
+        self.skills: List[str] = []
+        # スキル要件の文字列 → スキルID配列（同じ文字列を何度も分割しない）
+        self._cache: Dict[str, np.ndarray] = {}
+    
+    def __len__(self) -> int:
+        return len(self.skills)
+    
+    def __contains__(self, skill: str) -> bool:
+        return self.canonical(skill) in self.codes
+    
+    @staticmethod
+    def _fold(skill: str) -> str:
+        """
+        前後と連続する空白を除き、大文字小文字を区別しない表記にする
+        """
+        return ' '.join(skill.split()).casefold()
+    
+    def canonical(self, skill: str) -> str:
+        """
+        スキル名を正規化した表記を返す
+        """
+        key = self._fold(skill)
+        return self.aliases.get(key, key)
+    
+    def _tokens(self, requirements: SkillInput) -> Dict[str, str]:
+        """
+        スキル要件を 正規化したスキル名 → 元の表記 の辞書に変換（重複は最初の表記を残す）
+        """
+        if requirements is None:
+            return {}
+        if isinstance(requirements, str):
+            requirements = requirements.split(',')
+        elif not isinstance(requirements, (list, tuple, np.ndarray)):
+            if pd.isna(requirements):
+                return {}
+            requirements = str(requirements).split(',')
+        tokens: Dict[str, str] = {}
+        for skill in requirements:
+            key = self.canonical(skill)
+            if key:
+                tokens.setdefault(key, skill)
+        return tokens
+    
+    def split(self, requirements: SkillInput) -> List[str]:
+        """
+        カンマ区切りのスキル要件（またはスキルのリスト）を、
+        正規化したスキル名の重複なしリストに変換（NaNは空リスト）
+        """
+        return list(self._tokens(requirements))
+    
+    def names(self, requirements: SkillInput) -> List[str]:
+        """
+        スキル要件を表示用のスキル名のリストに変換（語彙に登録する）
+        """
+        return [self.skills[self.intern(skill)] for skill in self._tokens(requirements).values()]
+    
+    def intern(self, skill: str) -> int:
+        """
+        スキルIDを返す（未登録なら新しいIDを割り当てる）
+        """
+        key = self.canonical(skill)
+        code = self.codes.get(key)
+        if code is None:
+            if len(self.skills) >= MAX_SKILLS:
+                raise ValueError(f"スキルの種類が上限（{MAX_SKILLS}）を超えました")
+            code = len(self.skills)
+            self.codes[key] = code
+            self.skills.append(' '.join(skill.split()))
+        return code
+    
+    def lookup(self, skill: str) -> Optional[int]:
+        """
+        登録済みのスキルIDを返す（未登録ならNone）
+        """
+        return self.codes.get(self.canonical(skill))
+    
+    def encode(self, requirements: SkillInput, add: bool = True) -> np.ndarray:
+        """
+        スキル要件を昇順・重複なしのスキルID配列（uint16）に変換
+        
+        文字列ごとの結果はキャッシュして共有するため、返り値は書き換えないこと
+        
+        Args:
+            requirements: カンマ区切りの文字列またはスキルのリスト
+            add: Falseの場合、未登録のスキルは登録せずに無視する
+        """
+        cacheable = add and isinstance(requirements, str)
+        if cacheable:
+            codes = self._cache.get(requirements)
+            if codes is not None:
+                return codes
+        
+        if add:
+            ids = [self.intern(skill) for skill in self._tokens(requirements).values()]
+        else:
+            ids = [self.codes[key] for key in self.split(requirements) if key in self.codes]
+        codes = np.unique(np.asarray(ids, dtype=np.uint16))
+        
+        if cacheable:
+            self._cache[requirements] = codes
+        return codes
+    
+    def encode_many(self, values: Iterable, add: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        スキル要件の列をCSR形式（indptr, indices）にまとめて変換
+        
+        ユニークな値ごとに一度だけ分割する
+        
+        Returns:
+            indptr: int64配列（長さ 行数 + 1）
+            indices: uint16配列（行ごとに昇順）
+        """
+        row_codes, uniques = pd.factorize(pd.Series(list(values), dtype=object))
+        encoded = [self.encode(value, add=add) for value in uniques]
+        empty = np.empty(0, dtype=np.uint16)
+        rows = [encoded[code] if code >= 0 else empty for code in row_codes]
+        
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum([len(codes) for codes in rows], out=indptr[1:])
+        indices = np.concatenate(rows) if rows else empty
+        return indptr, indices.astype(np.uint16, copy=False)
+    
+    def decode(self, codes: Iterable[int]) -> List[str]:
+        """
+        スキルID配列を表示用のスキル名のリストに戻す
+        """
+        return [self.skills[code] for code in codes]
+    
+    def to_bitsets(self, indptr: np.ndarray, indices: np.ndarray) -> np.ndarray:
+        """
+        CSR形式のスキルIDを行ごとのビットセット（uint64配列、形状は 行数 × ワード数）に変換
+        """
+        num_rows = len(indptr) - 1
+        num_words = max(1, (len(self.skills) + 63) // 64)
+        bitsets = np.zeros((num_rows, num_words), dtype=np.uint64)
+        rows = np.repeat(np.arange(num_rows), np.diff(indptr))
+        indices = indices.astype(np.int64)
+        bits = np.left_shift(np.uint64(1), (indices % 64).astype(np.uint64))
+        np.bitwise_or.at(bitsets, (rows, indices // 64), bits)
+        return bitsets
+    
+    def save(self, path: str):
+        """
+        語彙をJSONで保存（スキルIDの順序を保つ）
+        """
+        output = Path(path)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump({'skills': self.skills, 'aliases': self.aliases}, f, indent=2, ensure_ascii=False)
+    
+    @classmethod
+    def load(cls, path: str) -> 'SkillVocabulary':
+        """
+        保存済みの語彙を読み込む
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        vocabulary = cls(aliases=data.get('aliases', {}))
+        for skill in data['skills']:
+            vocabulary.intern(skill)
+        return vocabulary
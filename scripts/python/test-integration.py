@@ -2,10 +2,1298 @@
 簡易テストスクリプト - データセット統合の動作確認
 """
 
+import importlib.util
+import json
+import sys
+import tempfile
+from datetime import datetime
+
 import pandas as pd
 import numpy as np
 from pathlib import Path
 
+from skill_vocab import SkillVocabulary
+
+
+def load_script_module(filename: str, module_name: str):
+    """
+    ハイフン付きのスクリプトファイルをモジュールとして読み込む
+    """
+    spec = importlib.util.spec_from_file_location(
+        module_name, Path(__file__).with_name(filename)
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_random_skill_frames(seed: int = 0, num_jobs: int = 60, num_postings: int = 200):
+    """
+    マッチング比較用のランダムなJob/LinkedInデータを作成
+    """
+    rng = np.random.default_rng(seed)
+    skills = ['Python', 'SQL', 'Java', 'JavaScript', 'CSS', 'AI', 'Data Science',
+              'Machine Learning', 'React', 'C++', 'Go', 'TensorFlow']
+    
+    def random_requirements():
+        size = rng.integers(1, 6)
+        return ', '.join(rng.choice(skills, size=size, replace=False))
+    
+    job_requirements = [random_requirements() for _ in range(num_jobs)]
+    job_requirements[3] = np.nan
+    job_df = pd.DataFrame({
+        'User_ID': rng.integers(1, 20, size=num_jobs),
+        # 同じJob_IDが異なる要件で現れるケースも含める
+        'Job_ID': rng.integers(1, num_jobs // 2, size=num_jobs),
+        'Job_Requirements': job_requirements,
+    })
+    
+    linkedin_requirements = [random_requirements() for _ in range(num_postings)]
+    linkedin_requirements[7] = np.nan
+    linkedin_df = pd.DataFrame({
+        'job_id': np.arange(1000, 1000 + num_postings),
+        'job_title': [f'Job {i}' for i in range(num_postings)],
+        'job_requirements': linkedin_requirements,
+    })
+    return job_df, linkedin_df
+
+
+def make_integration_frames(seed: int = 0, num_rows: int = 300):
+    """
+    統合処理の比較用に、ユーザー行・LinkedIn・給与のデータを作成
+    """
+    job_df, linkedin_df = make_random_skill_frames(seed=seed, num_jobs=num_rows, num_postings=120)
+    rng = np.random.default_rng(seed)
+    job_df['User_Skills'] = job_df['User_ID'].map(lambda user_id: f'Python, Skill {user_id % 5}')
+    job_df['Match_Score'] = rng.random(len(job_df)).round(3)
+    job_df['Recommended'] = (job_df['Match_Score'] > 0.5).astype(int)
+    job_df = job_df[['User_ID', 'User_Skills', 'Job_ID', 'Job_Requirements', 'Match_Score', 'Recommended']]
+    titles = ['Data Scientist', 'ML Engineer', 'Data Analyst', 'Chef']
+    linkedin_df['job_title'] = [titles[i % len(titles)] for i in range(len(linkedin_df))]
+    linkedin_df['company_name'] = [f'Company {i % 9}' for i in range(len(linkedin_df))]
+    salary_df = pd.DataFrame({
+        'job_title': ['Data Scientist', 'Machine Learning Engineer', 'Data Analyst'],
+        'salary_in_usd': [120000.0, 130000.0, 70000.0],
+    })
+    return job_df, linkedin_df, salary_df
+
+
+def test_skill_vocabulary():
+    """
+    スキル語彙の正規化・整数コード化・保存が一貫していることを確認
+    """
+    print("\n" + "=" * 60)
+    print("🧪 スキル語彙のテスト")
+    print("=" * 60)
+    
+    vocabulary = SkillVocabulary()
+    
+    # 大文字小文字・空白・別名の違いは同じスキルになる
+    codes = vocabulary.encode('Python,  machine  learning, JS')
+    assert codes.dtype == np.uint16
+    assert vocabulary.encode('ML, javascript, python ').tolist() == codes.tolist()
+    assert vocabulary.decode(codes) == ['Python', 'machine learning', 'JS']
+    assert vocabulary.encode(np.nan).tolist() == []
+    
+    # 未登録のスキルはadd=Falseなら無視される
+    assert vocabulary.encode('Python, Rust', add=False).tolist() == vocabulary.encode('python').tolist()
+    assert 'rust' not in vocabulary
+    
+    indptr, indices = vocabulary.encode_many(['SQL, Python', np.nan, 'python, sql', 'Go'])
+    assert indptr.tolist() == [0, 2, 2, 4, 5]
+    assert indices[0:2].tolist() == indices[2:4].tolist()
+    
+    bitsets = vocabulary.to_bitsets(indptr, indices)
+    assert bitsets.dtype == np.uint64
+    for row in range(len(indptr) - 1):
+        expected = sum(1 << int(code) for code in indices[indptr[row]:indptr[row + 1]])
+        assert int(bitsets[row, 0]) == expected
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = str(Path(tmpdir) / 'vocabulary.json')
+        vocabulary.save(path)
+        loaded = SkillVocabulary.load(path)
+        assert loaded.skills == vocabulary.skills
+        assert loaded.encode('golang, SQL').tolist() == vocabulary.encode('Go, sql').tolist()
+    print(f"   ✅ {len(vocabulary)} skills 一致")
+    
+    return True
+
+
+def test_skill_matching_engines():
+    """
+    転置インデックス方式が総当たり方式と同じjob_id_mappingを返すことを確認
+    """
+    print("\n" + "=" * 60)
+    print("🧪 スキルマッチング方式の比較テスト")
+    print("=" * 60)
+    
+    integrate = load_script_module('integrate-datasets.py', 'integrate_datasets')
+    job_df, linkedin_df = make_random_skill_frames()
+    
+    integrator = integrate.DatasetIntegrator()
+    integrator.job_recommendation_df = job_df
+    integrator.linkedin_jobs_df = linkedin_df
+    
+    # シグネチャ単位のマッチングは、読み込み済みのLinkedIn Datasetと保持したインデックスを変えない
+    index = integrator.build_linkedin_skill_index()
+    integrator.match_jobs_by_skills(method='index')
+    assert integrator.linkedin_jobs_df is linkedin_df
+    assert integrator.build_linkedin_skill_index() is index
+    
+    for tolerance in [0.0, 0.3, 0.5, 0.7, 1.0]:
+        exact = integrator.match_jobs_by_skills(tolerance=tolerance, method='exact')
+        indexed = integrator.match_jobs_by_skills(tolerance=tolerance, method='index')
+        assert indexed == exact, f"tolerance={tolerance} で結果が一致しません"
+        assert list(indexed) == list(exact)
+        
+        # 並列実行でもshardを元の順に結合するため同じ結果になる
+        parallel = integrator.match_jobs_by_skills(tolerance=tolerance, workers=2)
+        assert parallel == exact and list(parallel) == list(exact)
+        
+        # 疎行列方式とビットセット方式は類似度順に並ぶため、並べ替えた基準実装と比較
+        for method in ['matrix', 'bitset']:
+            result = integrator.match_jobs_by_skills(tolerance=tolerance, method=method, chunk_size=7)
+            assert list(result) == list(exact), method
+            for job_id, matches in exact.items():
+                expected = sorted(
+                    (-m['similarity'], m['linkedin_id']) for m in matches
+                )
+                actual = [(-m['similarity'], m['linkedin_id']) for m in result[job_id]]
+                assert sorted(actual) == expected, method
+                assert actual == sorted(actual, key=lambda pair: pair[0]), method
+        
+        # top_kは各Job_IDの最良マッチを返す
+        best = integrator.match_jobs_by_skills(tolerance=tolerance, method='matrix', top_k=1)
+        for job_id, matches in exact.items():
+            assert best[job_id][0]['similarity'] == max(m['similarity'] for m in matches)
+        print(f"   ✅ tolerance={tolerance}: {len(exact)} jobs 一致")
+    
+    # 全ペアの類似度行列はPythonのsetで計算したJaccard係数と一致する
+    left = job_df['Job_Requirements'].iloc[:20]
+    right = linkedin_df['job_requirements'].iloc[:30]
+    similarities = integrator.skill_similarity_matrix(left, right)
+    assert similarities.shape == (20, 30) and similarities.dtype == np.float32
+    for i, requirements in enumerate(left):
+        for j, other in enumerate(right):
+            a = set(integrator.normalize_job_requirements(requirements))
+            b = set(integrator.normalize_job_requirements(other))
+            expected = len(a & b) / len(a | b) if a and b else 0.0
+            assert abs(similarities[i, j] - expected) < 1e-6
+    
+    return True
+
+
+def test_signature_dedupe_memo():
+    """
+    シグネチャにまとめたマッチングと類似度のメモが、まとめない場合と同じ結果を返すことを確認
+    """
+    print("\n" + "=" * 60)
+    print("🧪 スキル集合のシグネチャ重複除去テスト")
+    print("=" * 60)
+    
+    integrate = load_script_module('integrate-datasets.py', 'integrate_datasets')
+    job_df, linkedin_df = make_random_skill_frames(num_jobs=300, num_postings=400)
+    # 順序や表記だけが違う要件は同じシグネチャになる
+    job_df.loc[:9, 'Job_Requirements'] = ['Python, SQL', 'sql, python'] * 5
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        def match(jobs, postings, top_k=None, dedupe=True):
+            integrator = integrate.DatasetIntegrator(cache_dir=tmpdir)
+            integrator.linkedin_jobs_df = postings
+            mapping = integrator.match_jobs_by_skills(
+                method='bitset', top_k=top_k, dedupe=dedupe,
+                job_requirements=jobs[['Job_ID', 'Job_Requirements']].drop_duplicates()
+            )
+            return mapping, integrator.matching_stats
+        
+        for top_k in [None, 2]:
+            expected, _ = match(job_df, linkedin_df, top_k, dedupe=False)
+            assert match(job_df, linkedin_df, top_k)[0] == expected
+        
+        # 2回目以降はメモの類似度をすべて再利用する
+        mapping, stats = match(job_df, linkedin_df)
+        assert stats['job_signatures'] < stats['job_rows']
+        assert stats['memo_reused_pairs'] == stats['signature_pairs'] > 0
+        
+        # 求人やLinkedInの行が増えても、新しいシグネチャを含む組だけを計算して同じ結果になる
+        more_jobs, more_postings = make_random_skill_frames(seed=1, num_jobs=300, num_postings=400)
+        more_postings['job_id'] += 1000
+        jobs = pd.concat([job_df, more_jobs], ignore_index=True)
+        postings = pd.concat([linkedin_df, more_postings], ignore_index=True)
+        for current_jobs, current_postings in [(jobs, linkedin_df), (jobs, postings), (job_df, postings)]:
+            mapping, stats = match(current_jobs, current_postings, top_k=1)
+            assert 0 < stats['memo_reused_pairs']
+            assert mapping == match(current_jobs, current_postings, top_k=1, dedupe=False)[0]
+    print(f"   ✅ {stats['job_rows']} job rows → {stats['job_signatures']} signatures 一致")
+    
+    return True
+
+
+def test_salary_title_matching():
+    """
+    給与データとの結合で、表記の異なる職種名が曖昧一致し、集計がキャッシュされることを確認
+    """
+    print("\n" + "=" * 60)
+    print("🧪 給与データの職種名マッチングテスト")
+    print("=" * 60)
+    
+    integrate = load_script_module('integrate-datasets.py', 'integrate_datasets')
+    job_df = pd.DataFrame({
+        'User_ID': [1, 2, 3, 4],
+        'Job_ID': [1, 2, 3, 4],
+        'Job_Requirements': ['Python, SQL', 'AI, Python', 'Go', 'CSS'],
+    })
+    linkedin_df = pd.DataFrame({
+        'job_id': [1, 2, 3, 4],
+        'job_title': ['Sr. Data Scientist', 'ML Engineer', 'Data Scientst', 'Chef'],
+    })
+    salary_df = pd.DataFrame({
+        'job_title': ['Data Scientist', 'data scientist', 'Machine Learning Engineer', 'Data Analyst'],
+        'salary_in_usd': [100000.0, 120000.0, 130000.0, 70000.0],
+    })
+    salary_df['job_title_normalized'] = salary_df['job_title'].str.lower().str.strip()
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        statuses = []
+        for _ in range(2):
+            integrator = integrate.DatasetIntegrator(cache_dir=tmpdir)
+            integrator.job_recommendation_df = job_df
+            integrator.linkedin_jobs_df = linkedin_df
+            integrator.salary_df = salary_df
+            attributes = integrator.build_job_attributes(
+                job_df[['Job_ID', 'Job_Requirements']], use_skill_matching=False
+            )
+            statuses.append(integrator.salary_stats['cache'])
+        
+        # 2回目は同じ給与データの集計をディスクから読み込む
+        assert statuses == ['miss', 'disk']
+        integrator.build_job_attributes(job_df[['Job_ID', 'Job_Requirements']], use_skill_matching=False)
+        assert integrator.salary_stats['cache'] == 'memory'
+    
+    salaries = attributes.set_index('Job_ID')['avg_salary_usd']
+    assert salaries[1] == 110000.0 and salaries[3] == 110000.0
+    assert salaries[2] == 130000.0
+    assert pd.isna(salaries[4])
+    assert integrator.salary_stats['fuzzy_title_matches'] == 3
+    assert integrator.salary_stats['match_rate'] == 0.75
+    print(f"   ✅ {integrator.salary_stats['jobs_matched']}/4 jobs matched")
+    
+    return True
+
+
+def test_chunked_streaming_integration():
+    """
+    分割読み込みとストリーミング統合が、通常の読み込みと同じ統合結果になることを確認
+    """
+    print("\n" + "=" * 60)
+    print("🧪 分割読み込み・ストリーミング統合のテスト")
+    print("=" * 60)
+    
+    integrate = load_script_module('integrate-datasets.py', 'integrate_datasets')
+    job_df, linkedin_df, salary_df = make_integration_frames()
+    
+    def loaded(tmp, chunksize=None):
+        integrator = integrate.DatasetIntegrator()
+        integrator.load_job_recommendation(str(tmp / 'jobs.csv'), chunksize=chunksize)
+        integrator.load_linkedin_jobs(str(tmp / 'linkedin.csv'), chunksize=chunksize)
+        integrator.load_salary_data(str(tmp / 'salary.csv'), chunksize=chunksize)
+        return integrator
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmp = Path(tmpdir)
+        job_df.to_csv(tmp / 'jobs.csv', index=False)
+        linkedin_df.to_csv(tmp / 'linkedin.csv', index=False)
+        salary_df.to_csv(tmp / 'salary.csv', index=False)
+        
+        expected = loaded(tmp).integrate_datasets().drop(columns=['User_Skills_List', 'Job_Requirements_List'])
+        assert expected['job_title'].notna().any() and expected['avg_salary_usd'].notna().any()
+        
+        # 分割読み込みではスキル列がcategory型のまま残り、リスト列は作られない
+        chunked = loaded(tmp, chunksize=37)
+        assert isinstance(chunked.job_recommendation_df['Job_Requirements'].dtype, pd.CategoricalDtype)
+        assert 'Job_Requirements_List' not in chunked.job_recommendation_df.columns
+        result = chunked.integrate_datasets()
+        assert list(result.columns) == list(expected.columns)
+        for column in expected.columns:
+            if column == 'Match_Score':
+                np.testing.assert_allclose(result[column], expected[column], rtol=1e-6)
+            else:
+                assert result[column].astype(object).equals(expected[column].astype(object)), column
+        
+        # ストリーミング統合はチャンクごとに追記したCSVが、全件を統合したCSVと同じになる
+        summary = loaded(tmp).integrate_datasets_streaming(
+            str(tmp / 'jobs.csv'), str(tmp / 'streamed.csv'), chunksize=50
+        )
+        expected.to_csv(tmp / 'expected.csv', index=False)
+        pd.testing.assert_frame_equal(
+            pd.read_csv(tmp / 'streamed.csv'), pd.read_csv(tmp / 'expected.csv'), check_exact=False
+        )
+        assert summary['total_rows'] == len(expected)
+        assert summary['linkedin_matched'] == int(expected['job_title'].notna().sum())
+    print(f"   ✅ {len(expected)} rows 一致")
+    
+    return True
+
+
+def test_partitioned_parquet_roundtrip():
+    """
+    パーティション分割したParquetを読み戻すと、全件でもJob_IDで絞っても統合結果と一致することを確認
+    """
+    print("\n" + "=" * 60)
+    print("🧪 パーティション分割Parquetの読み戻しテスト")
+    print("=" * 60)
+    
+    from integrated_dataset import read_integrated_dataset
+    
+    integrate = load_script_module('integrate-datasets.py', 'integrate_datasets')
+    job_df, linkedin_df, salary_df = make_integration_frames()
+    
+    integrator = integrate.DatasetIntegrator()
+    integrator.job_recommendation_df = job_df
+    integrator.linkedin_jobs_df = linkedin_df
+    integrator.salary_df = salary_df.assign(job_title_normalized=salary_df['job_title'].str.lower())
+    expected = integrator.integrate_datasets()
+    
+    def assert_rows_equal(actual, expected):
+        # パーティション内はJob_ID順に並ぶため、元の行順に戻して比較
+        key = ['Job_ID', 'User_ID', 'Job_Requirements', 'Match_Score']
+        actual = actual.astype(object).sort_values(key, kind='stable').reset_index(drop=True)
+        expected = expected.astype(object).sort_values(key, kind='stable').reset_index(drop=True)
+        assert list(actual.columns) == list(expected.columns)
+        for column in expected.columns:
+            assert actual[column].equals(expected[column]), column
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        output = Path(tmpdir) / 'integrated'
+        integrator.save_integrated_dataset(str(output), format='parquet_partitioned', num_buckets=4, row_group_size=16)
+        assert len(list(output.glob('job_bucket=*/*.parquet'))) == 4
+        
+        reader = integrate.DatasetIntegrator()
+        assert_rows_equal(reader.load_integrated_dataset(str(output)), expected)
+        assert reader.integrated_df is not None and 'job_bucket' not in reader.integrated_df.columns
+        
+        job_ids = expected['Job_ID'].drop_duplicates().iloc[:5].tolist() + [10 ** 6]
+        filtered = reader.load_integrated_dataset(str(output), job_ids=job_ids)
+        assert_rows_equal(filtered, expected[expected['Job_ID'].isin(job_ids)])
+        
+        # 他のスクリプトが使う列の絞り込み（存在しない列は無視する）はCSVでも同じ結果になる
+        columns = ['User_ID', 'Job_ID', 'job_title', 'no_such_column']
+        integrator.save_integrated_dataset(str(Path(tmpdir) / 'integrated.csv'))
+        from_parquet = read_integrated_dataset(str(output), columns=columns, job_ids=job_ids)
+        from_csv = read_integrated_dataset(str(Path(tmpdir) / 'integrated.csv'), columns=columns, job_ids=job_ids)
+        assert list(from_parquet.columns) == list(from_csv.columns) == columns[:3]
+        pd.testing.assert_frame_equal(
+            from_parquet.sort_values(['Job_ID', 'User_ID'], kind='stable').reset_index(drop=True),
+            from_csv.sort_values(['Job_ID', 'User_ID'], kind='stable').reset_index(drop=True),
+            check_dtype=False
+        )
+    print(f"   ✅ {len(expected)} rows, {len(filtered)} filtered rows 一致")
+    
+    return True
+
+
+def test_incremental_integration():
+    """
+    求人やLinkedInの行を変更・削除・追加した後の差分統合が、全件の作り直しと同じ出力と
+    レポートになり、変化がなければ何も作り直さないことを確認
+    """
+    print("\n" + "=" * 60)
+    print("🧪 差分統合のテスト")
+    print("=" * 60)
+    
+    integrate = load_script_module('integrate-datasets.py', 'integrate_datasets')
+    job_df, linkedin_df, salary_df = make_integration_frames()
+    salary_df['job_title_normalized'] = salary_df['job_title'].str.lower()
+    report_keys = ['total_rows', 'unique_users', 'unique_jobs', 'linkedin_matched', 'salary_matched']
+    
+    def integrator_for(jobs, postings, cache_dir=None):
+        integrator = integrate.DatasetIntegrator(cache_dir=cache_dir)
+        integrator.job_recommendation_df = jobs.reset_index(drop=True)
+        integrator.linkedin_jobs_df = postings.reset_index(drop=True)
+        integrator.salary_df = salary_df
+        return integrator
+    
+    def sorted_rows(df):
+        key = ['Job_ID', 'User_ID', 'Job_Requirements', 'Match_Score']
+        return df.astype(object).sort_values(key, kind='stable').reset_index(drop=True)
+    
+    def assert_matches_full_rebuild(tmp, jobs, postings, report):
+        full = integrator_for(jobs, postings)
+        expected = full.integrate_datasets()
+        expected_report = full.generate_mapping_report(str(tmp / 'full_report.json'))
+        assert {key: report[key] for key in report_keys} == {key: expected_report[key] for key in report_keys}
+        assert report['columns'] == expected_report['columns']
+        
+        actual = sorted_rows(integrate.DatasetIntegrator().load_integrated_dataset(str(tmp / 'output')))
+        expected = sorted_rows(expected)
+        assert list(actual.columns) == list(expected.columns)
+        for column in expected.columns:
+            assert actual[column].equals(expected[column]), column
+        return len(expected)
+    
+    def run(tmp, jobs, postings):
+        return integrator_for(jobs, postings, str(tmp / 'cache')).integrate_incremental(
+            str(tmp / 'output'), str(tmp / 'state'), str(tmp / 'report.json'), num_buckets=4, row_group_size=32
+        )
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmp = Path(tmpdir)
+        report = run(tmp, job_df, linkedin_df)
+        assert report['incremental']['rewritten_buckets'] == 4
+        assert_matches_full_rebuild(tmp, job_df, linkedin_df, report)
+        
+        # 求人: 要件の変更・ユーザー行の変更・削除・追加
+        job_ids = job_df['Job_ID'].drop_duplicates().sort_values().tolist()
+        jobs = job_df.copy()
+        jobs.loc[jobs['Job_ID'] == job_ids[0], 'Job_Requirements'] = 'Python, Machine Learning, TensorFlow'
+        jobs.loc[jobs['Job_ID'] == job_ids[1], 'Match_Score'] = 0.999
+        jobs = jobs[~jobs['Job_ID'].isin(job_ids[2:4])]
+        new_jobs = job_df.iloc[:6].assign(Job_ID=[900, 900, 901, 902, 903, 903])
+        jobs = pd.concat([jobs, new_jobs], ignore_index=True)
+        
+        # LinkedIn: 要件の変更・削除・追加
+        postings = linkedin_df.copy()
+        postings.loc[:9, 'job_requirements'] = 'Python, SQL, Go'
+        postings = postings.drop(index=range(10, 15))
+        new_postings = linkedin_df.iloc[:5].assign(job_id=np.arange(5000, 5005), job_requirements='CSS, React')
+        postings = pd.concat([postings, new_postings], ignore_index=True)
+        
+        report = run(tmp, jobs, postings)
+        changes = report['incremental']
+        assert changes['changed_jobs'] == 5 and changes['removed_jobs'] == 2
+        assert changes['changed_postings'] == 15 and changes['removed_postings'] == 5
+        rows = assert_matches_full_rebuild(tmp, jobs, postings, report)
+        
+        # 変更されたLinkedInの行だけとのマッチングで、類似度のメモのLinkedIn側を置き換えない
+        integrator = integrator_for(jobs, postings, str(tmp / 'cache'))
+        memo = integrator._load_signature_memo(integrator._signature_memo_path(0.7))
+        _, linkedin_signatures, _ = integrator.skill_signatures(postings['job_requirements'])
+        assert set(memo['linkedin'].tolist()) == set(linkedin_signatures.tolist())
+        
+        # 変化がなければマッチングも属性の結合もせず、出力と状態を書き換えない
+        files = {
+            path: path.stat().st_mtime_ns
+            for path in list((tmp / 'output').glob('job_bucket=*/*.parquet')) + list((tmp / 'state').iterdir())
+        }
+        unchanged = integrator_for(jobs, postings)
+        unchanged.match_jobs_by_skills = None
+        unchanged.build_job_attributes = None
+        report = unchanged.integrate_incremental(
+            str(tmp / 'output'), str(tmp / 'state'), str(tmp / 'report.json'), num_buckets=4, row_group_size=32
+        )
+        assert report['incremental'] == {
+            'changed_jobs': 0, 'removed_jobs': 0, 'changed_postings': 0, 'removed_postings': 0, 'rewritten_buckets': 0,
+        }
+        assert {path: path.stat().st_mtime_ns for path in files} == files
+        assert_matches_full_rebuild(tmp, jobs, postings, report)
+    print(f"   ✅ {rows} rows 一致 ({changes['rewritten_buckets']}/4 buckets rewritten)")
+    
+    return True
+
+
+def test_pipeline_metrics():
+    """
+    ステージの計測結果が記録され、マッピングレポートに含まれることを確認
+    """
+    print("\n" + "=" * 60)
+    print("🧪 ステージ計測のテスト")
+    print("=" * 60)
+    
+    from pipeline_metrics import PipelineMetrics
+    
+    metrics = PipelineMetrics(profile=True, verbose=False)
+    with metrics.stage('outer', rows=100):
+        with metrics.stage('inner') as record:
+            record['rows'] = 10
+    assert [record['stage'] for record in metrics.stages] == ['outer/inner', 'outer']
+    assert metrics.stages[0]['rows'] == 10 and 'profile' not in metrics.stages[0]
+    assert metrics.stages[1]['profile']['top_functions']
+    
+    # ピークRSSは既定では計測しない（プロセスのピークRSSをリセットしない）
+    assert all(record['peak_rss_mb'] is None for record in metrics.stages)
+    
+    # ピークRSSはステージごと（前のステージの大きな確保を含まない）
+    metrics = PipelineMetrics(track_rss=True)
+    with metrics.stage('large'):
+        block = np.ones(256 * 1024 * 1024 // 8)
+        del block
+    with metrics.stage('small'):
+        block = np.ones(1024)
+    large, small = metrics.stages
+    if large['peak_rss_mb'] is not None and small['peak_rss_mb'] is not None:
+        assert large['peak_rss_mb'] - small['peak_rss_mb'] > 128
+    assert metrics.to_dict()['process_peak_rss_mb'] >= (large['peak_rss_mb'] or 0)
+    
+    integrate = load_script_module('integrate-datasets.py', 'integrate_datasets')
+    job_df, linkedin_df = make_random_skill_frames()
+    integrator = integrate.DatasetIntegrator(metrics=PipelineMetrics(verbose=False))
+    integrator.job_recommendation_df = job_df
+    integrator.linkedin_jobs_df = linkedin_df
+    integrator.integrate_datasets()
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        report = integrator.generate_mapping_report(str(Path(tmpdir) / 'report.json'))
+    stages = [record['stage'] for record in report['metrics']['stages']]
+    assert stages == ['match', 'merge_linkedin', 'merge_rows']
+    for record in report['metrics']['stages']:
+        assert record['wall_seconds'] >= 0 and record['rows'] > 0
+    print(f"   ✅ {len(stages)} stages recorded")
+    
+    return True
+
+
+def test_compare_results():
+    """
+    同じ名前のステージが繰り返し記録されても、ベンチマークの比較で上書きされないことを確認
+    """
+    print("\n" + "=" * 60)
+    print("🧪 ベンチマーク比較のテスト")
+    print("=" * 60)
+    
+    from benchmark import compare_results
+    
+    def stages(*seconds):
+        names = ['load', 'match/score', 'integrate', 'match/score']
+        return {'stages': [
+            {'stage': name, 'wall_seconds': wall} for name, wall in zip(names, seconds)
+        ]}
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        baseline_path = Path(tmpdir) / 'baseline.json'
+        current_path = Path(tmpdir) / 'current.json'
+        with open(baseline_path, 'w', encoding='utf-8') as f:
+            json.dump(stages(1.0, 2.0, 3.0, 4.0), f)
+        # suite以外の結果も含む出力
+        with open(current_path, 'w', encoding='utf-8') as f:
+            json.dump({'suite': stages(1.0, 1.0, 3.0, 8.0)}, f)
+        rows = compare_results(str(baseline_path), str(current_path))
+    
+    assert [row['stage'] for row in rows] == ['load', 'match/score', 'integrate', 'match/score #2']
+    assert [row['ratio'] for row in rows] == [1.0, 0.5, 1.0, 2.0]
+    print(f"   ✅ {len(rows)} stages compared")
+    
+    return True
+
+
+def test_log_generation_reproducible():
+    """
+    同じseedとbase_dateなら、ワーカー数に関係なく同一のログが生成されることを確認
+    """
+    print("\n" + "=" * 60)
+    print("🧪 ログ生成の再現性テスト")
+    print("=" * 60)
+    
+    logs = load_script_module('generate-user-logs.py', 'generate_user_logs')
+    rng = np.random.default_rng(0)
+    num_rows = 3000
+    df = pd.DataFrame({
+        'User_ID': rng.integers(1, 200, size=num_rows),
+        'User_Skills': 'Python, SQL',
+        'Job_ID': rng.integers(1, 100, size=num_rows),
+        # 同じJob_IDに異なる要件の文字列がある
+        'Job_Requirements': rng.choice(['SQL, AI', 'Python, SQL'], size=num_rows),
+        'Match_Score': rng.random(num_rows).round(2),
+        'Recommended': rng.integers(0, 2, size=num_rows),
+    })
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        csv_path = Path(tmpdir) / 'jobs.csv'
+        df.to_csv(csv_path, index=False)
+        generator = logs.UserInteractionLogGenerator(str(csv_path))
+        
+        # シャード出力の参照表は、Job_IDごとのすべての要件の文字列とスキルの和集合を持つ
+        generator.save_skill_tables(str(Path(tmpdir) / 'shards'))
+        jobs = pd.read_parquet(Path(tmpdir) / 'shards' / 'jobs.parquet')
+        job_skills = pd.read_parquet(Path(tmpdir) / 'shards' / 'job_skills.parquet')
+        skills = pd.read_parquet(Path(tmpdir) / 'shards' / 'skills.parquet').set_index('skill_id')['skill']
+        assert len(jobs) == len(df[['Job_ID', 'Job_Requirements']].drop_duplicates())
+        assert not job_skills.duplicated().any()
+        for job_id, requirements in df.groupby('Job_ID')['Job_Requirements']:
+            expected = {skill.strip() for value in requirements.unique() for skill in value.split(',')}
+            assert set(skills[job_skills.loc[job_skills['job_id'] == job_id, 'skill_id']]) == expected
+        
+        # JSONはシャード出力に使えない（入力を読み込む前に設定で弾く）
+        config = dict(logs.LOG_GENERATION_DEFAULTS, input=str(csv_path), shard_dir=str(Path(tmpdir) / 'json'), format='json')
+        try:
+            logs.run_batch(config)
+            raise AssertionError("format='json'のシャード出力が受け付けられました")
+        except ValueError:
+            assert not (Path(tmpdir) / 'json').exists()
+        
+        # ワーカー数だけを変えた再実行では、完了済みのシャード出力を書き直さない
+        from batch_pipeline import StageCheckpoint
+        config = dict(
+            logs.LOG_GENERATION_DEFAULTS, input=str(csv_path), shard_dir=str(Path(tmpdir) / 'batch'),
+            format='parquet', seed=7, base_date='2025-01-01', batch_size=1000
+        )
+        logs.run_batch(config, StageCheckpoint(str(Path(tmpdir) / 'checkpoints')))
+        written = (Path(tmpdir) / 'batch' / 'manifest.json').stat().st_mtime_ns
+        logs.run_batch(dict(config, workers=2), StageCheckpoint(str(Path(tmpdir) / 'checkpoints')))
+        assert (Path(tmpdir) / 'batch' / 'manifest.json').stat().st_mtime_ns == written
+    
+    base_date = datetime(2025, 1, 1)
+    results = [
+        generator.generate_realistic_logs(
+            seed=42, workers=workers, users_per_block=16, base_date=base_date
+        )
+        for workers in [1, 3]
+    ]
+    pd.testing.assert_frame_equal(results[0], results[1])
+    
+    # ストリーミング生成でも同じ内容になる（スキル列を除く）
+    streamed = pd.concat(list(generator.iter_realistic_log_batches(
+        batch_size=500, users_per_block=16, seed=42, workers=2, base_date=base_date
+    )), ignore_index=True)
+    pd.testing.assert_frame_equal(
+        streamed, results[0].drop(columns=['user_skills', 'job_requirements'])
+    )
+    
+    # 同じ出力先にバッチサイズや形式を変えて書き直しても、前回のシャードは残らない
+    from interaction_logs import read_new_logs
+    with tempfile.TemporaryDirectory() as tmpdir:
+        shard_dir = str(Path(tmpdir) / 'shards')
+        for batch_size, format in [(200, 'parquet'), (1000, 'parquet'), (700, 'csv')]:
+            summary = generator.write_log_shards(generator.iter_realistic_log_batches(
+                batch_size=batch_size, users_per_block=16, seed=42, base_date=base_date
+            ), shard_dir, format=format)
+            assert len(list((Path(shard_dir) / 'logs').iterdir())) == summary['shards']
+            reread, _ = read_new_logs(shard_dir, {})
+            assert len(reread) == summary['total_logs'] == len(streamed)
+        assert not Path(shard_dir + '.tmp').exists()
+    print(f"   ✅ {len(results[0]):,} logs 一致")
+    
+    return True
+
+
+def test_batch_checkpoint_resume():
+    """
+    チェックポイントから再開したバッチ実行が、最初からの実行と同じ結果になることを確認
+    """
+    print("\n" + "=" * 60)
+    print("🧪 バッチ実行のチェックポイント再開テスト")
+    print("=" * 60)
+    
+    from batch_pipeline import StageCheckpoint, load_batch_config
+    
+    integrate = load_script_module('integrate-datasets.py', 'integrate_datasets')
+    job_df, linkedin_df = make_random_skill_frames()
+    job_df['User_Skills'] = 'Python, SQL'
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmp = Path(tmpdir)
+        job_df.to_csv(tmp / 'jobs.csv', index=False)
+        linkedin_df.to_csv(tmp / 'linkedin.csv', index=False)
+        config = load_batch_config(integrate.INTEGRATION_DEFAULTS, overrides={
+            'job_recommendation': str(tmp / 'jobs.csv'),
+            'linkedin': str(tmp / 'linkedin.csv'),
+            'output': str(tmp / 'integrated.csv'),
+            'report': str(tmp / 'report.json'),
+        })
+        
+        first = integrate.DatasetIntegrator()
+        first.run_pipeline(config, StageCheckpoint(str(tmp / 'checkpoints')))
+        expected = pd.read_csv(tmp / 'integrated.csv')
+        
+        # 統合ステージの途中で失敗した状態を再現し、マッチングは再実行されないことを確認
+        checkpoint = StageCheckpoint(str(tmp / 'checkpoints'))
+        del checkpoint.stages['integrate']
+        (tmp / 'integrated.csv').unlink()
+        resumed = integrate.DatasetIntegrator()
+        resumed.match_jobs_by_skills = None
+        resumed.run_pipeline(config, checkpoint)
+        pd.testing.assert_frame_equal(pd.read_csv(tmp / 'integrated.csv'), expected)
+        
+        # 入力が変わった場合はすべてのステージをやり直す
+        job_df.iloc[:5].to_csv(tmp / 'jobs.csv', index=False)
+        rerun = integrate.DatasetIntegrator()
+        rerun.run_pipeline(config, StageCheckpoint(str(tmp / 'checkpoints')))
+        assert len(pd.read_csv(tmp / 'integrated.csv')) == 5
+    print(f"   ✅ {len(expected)} rows 一致")
+    
+    return True
+
+
+def test_firestore_export():
+    """
+    Firestoreへのエクスポートが500件ずつのバッチで書き込まれ、一時的なエラーの再試行と
+    再実行で同じドキュメントIDになる（重複しない）ことを確認（代替クライアントを使用）
+    """
+    print("\n" + "=" * 60)
+    print("🧪 Firestoreエクスポートのテスト")
+    print("=" * 60)
+    
+    import asyncio
+    
+    export = load_script_module('export-to-firestore.py', 'export_to_firestore')
+    
+    class FakeCollection:
+        def __init__(self, name):
+            self.name = name
+        
+        def document(self, doc_id):
+            return (self.name, doc_id)
+    
+    class FakeBatch:
+        def __init__(self, client):
+            self.client = client
+            self.operations = []
+        
+        def set(self, reference, data):
+            self.operations.append((reference, data))
+        
+        async def commit(self):
+            assert len(self.operations) <= 500
+            self.client.commits += 1
+            # 最初のコミットだけ一時的なエラーにする
+            if self.client.commits == 1:
+                raise ConnectionError('unavailable')
+            await asyncio.sleep(0)
+            self.client.store.update(self.operations)
+    
+    class FakeClient:
+        def __init__(self):
+            self.store = {}
+            self.commits = 0
+        
+        def collection(self, name):
+            return FakeCollection(name)
+        
+        def batch(self):
+            return FakeBatch(self)
+    
+    rng = np.random.default_rng(0)
+    num_logs = 1234
+    logs_df = pd.DataFrame({
+        'user_id': rng.integers(1, 50, size=num_logs),
+        'job_id': np.arange(num_logs),
+        'action': 'like',
+        'timestamp': '2025-01-01T00:00:00.000000',
+        'match_score': rng.random(num_logs),
+        'swipe_duration_ms': 3000,
+    })
+    integrated_df = pd.DataFrame({
+        'User_ID': [1, 1, 2],
+        'User_Skills': ['Python', 'Python', 'SQL'],
+        'Job_ID': [10, 11, 10],
+        'Job_Requirements': ['Python', 'SQL', 'Python'],
+        'job_title': ['Data Scientist', np.nan, 'Data Scientist'],
+        'min_salary_usd': [90000.0, np.nan, 90000.0],
+        'max_salary_usd': [130000.0, np.nan, 130000.0],
+    })
+    
+    # シャード出力（logs/part-*）とシャードを直接置いたディレクトリを、ログの集約と同じ順に読む
+    with tempfile.TemporaryDirectory() as tmpdir:
+        (Path(tmpdir) / 'shards' / 'logs').mkdir(parents=True)
+        (Path(tmpdir) / 'flat').mkdir()
+        for index, start in enumerate(range(0, num_logs, 500)):
+            part = logs_df.iloc[start:start + 500]
+            part.to_parquet(Path(tmpdir) / 'shards' / 'logs' / f'part-{index:05d}.parquet', index=False)
+            part.to_csv(Path(tmpdir) / 'flat' / f'part-{index:05d}.csv', index=False)
+        for source in ['shards', 'flat']:
+            batches = list(export.read_log_batches(str(Path(tmpdir) / source), chunksize=300))
+            assert pd.concat(batches, ignore_index=True)['job_id'].tolist() == logs_df['job_id'].tolist()
+    
+    client = FakeClient()
+    exporter = export.FirestoreBulkExporter(client, concurrency=2, backoff_seconds=0)
+    for _ in range(2):
+        summary = exporter.export_all({
+            'jobs': export.job_documents(integrated_df),
+            'users': export.user_documents(integrated_df),
+            'user_interactions': export.interaction_documents([logs_df.iloc[:700], logs_df.iloc[700:]]),
+        })
+    
+    assert summary['user_interactions']['documents'] == num_logs
+    assert summary['user_interactions']['batches'] == 3
+    assert exporter.retries == 1
+    # 2回実行しても同じドキュメントIDが上書きされるだけ
+    assert len(client.store) == 2 + 2 + num_logs
+    assert client.store[('jobs', '10')]['salary_range'] == '$90,000 - $130,000'
+    assert client.store[('jobs', '11')]['job_title'] is None
+    assert client.store[('users', '2')] == {'user_id': 2, 'user_skills': 'SQL'}
+    document = client.store[('user_interactions', f"{logs_df['user_id'][0]}_0_20250101T000000000000")]
+    assert isinstance(document['timestamp'], datetime) and isinstance(document['user_id'], int)
+    print(f"   ✅ {len(client.store):,} documents, {client.commits} commits")
+    
+    return True
+
+
+def test_user_feeds_incremental():
+    """
+    新しいログでの差分更新が全件の作り直しと同じフィードになり、スワイプ済みの求人が除かれることを確認
+    """
+    print("\n" + "=" * 60)
+    print("🧪 ユーザーフィードの差分更新テスト")
+    print("=" * 60)
+    
+    feeds = load_script_module('build-user-feeds.py', 'build_user_feeds')
+    export = load_script_module('export-to-firestore.py', 'export_to_firestore')
+    from pipeline_metrics import PipelineMetrics
+    
+    rng = np.random.default_rng(0)
+    num_rows = 2000
+    integrated_df = pd.DataFrame({
+        'User_ID': rng.integers(1, 40, size=num_rows),
+        'Job_ID': rng.integers(1, 300, size=num_rows),
+        'Job_Requirements': 'Python, SQL',
+        'Match_Score': rng.random(num_rows).round(2),
+        'Recommended': rng.integers(0, 2, size=num_rows),
+        'job_title': 'Data Scientist',
+    })
+    logs_df = integrated_df.sample(600, random_state=0).rename(
+        columns={'User_ID': 'user_id', 'Job_ID': 'job_id'}
+    )[['user_id', 'job_id']].assign(action='like')
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmp = Path(tmpdir)
+        integrated_df.to_csv(tmp / 'integrated.csv', index=False)
+        logs_df.iloc[:300].to_csv(tmp / 'logs.csv', index=False)
+        
+        builder = feeds.UserFeedBuilder(str(tmp / 'incremental'), feed_size=10, metrics=PipelineMetrics(verbose=False))
+        assert builder.run(str(tmp / 'integrated.csv'), str(tmp / 'logs.csv'))['mode'] == 'full'
+        # ログを追記して差分更新
+        logs_df.iloc[300:].to_csv(tmp / 'logs.csv', mode='a', header=False, index=False)
+        manifest = builder.run(str(tmp / 'integrated.csv'), str(tmp / 'logs.csv'))
+        assert manifest['mode'] == 'refresh' and manifest['watermark'] == {'logs.csv': 600}
+        assert manifest['changed_users'] == logs_df.iloc[300:]['user_id'].nunique()
+        
+        full = feeds.UserFeedBuilder(str(tmp / 'full'), feed_size=10, metrics=PipelineMetrics(verbose=False))
+        full.run(str(tmp / 'integrated.csv'), str(tmp / 'logs.csv'), full=True)
+        incremental_feeds = pd.read_parquet(tmp / 'incremental' / 'feeds.parquet')
+        pd.testing.assert_frame_equal(incremental_feeds, pd.read_parquet(tmp / 'full' / 'feeds.parquet'))
+        
+        swiped = set(zip(logs_df['user_id'], logs_df['job_id']))
+        assert not any(pair in swiped for pair in zip(incremental_feeds['user_id'], incremental_feeds['job_id']))
+        assert incremental_feeds.groupby('user_id').size().max() <= 10
+        
+        documents = dict(export.feed_documents(str(tmp / 'incremental'), changed_only=True))
+        assert len(documents) == manifest['changed_users']
+        document = next(iter(documents.values()))
+        assert document['job_ids'] == [job['job_id'] for job in document['jobs']]
+        assert document['jobs'][0]['title'] == 'Data Scientist'
+    print(f"   ✅ {len(incremental_feeds):,} feed entries 一致")
+    
+    return True
+
+
+def test_star_schema_output():
+    """
+    スター形式の出力を結合し直すと、ワイド形式の統合結果と同じになることを確認
+    """
+    print("\n" + "=" * 60)
+    print("🧪 スター形式の出力テスト")
+    print("=" * 60)
+    
+    integrate = load_script_module('integrate-datasets.py', 'integrate_datasets')
+    job_df, linkedin_df = make_random_skill_frames(num_jobs=400)
+    job_df['User_Skills'] = job_df['User_ID'].map(lambda user_id: f'Python, Skill {user_id % 7}')
+    job_df['User_Skills_List'] = job_df['User_Skills'].str.split(', ')
+    job_df['Match_Score'] = np.random.default_rng(1).random(len(job_df))
+    job_df['Recommended'] = (job_df['Match_Score'] > 0.5).astype(int)
+    
+    wide = integrate.DatasetIntegrator()
+    wide.job_recommendation_df = job_df
+    wide.linkedin_jobs_df = linkedin_df
+    expected = wide.integrate_datasets().drop(columns=['User_Skills_List'])
+    
+    star = integrate.DatasetIntegrator()
+    star.job_recommendation_df = job_df
+    star.linkedin_jobs_df = linkedin_df
+    tables = star.integrate_star_schema()
+    
+    # 同じJob_IDで要件が異なる行があるため、Job_Requirementsはファクト表に残る
+    assert 'User_Skills' in tables['users'] and 'User_Skills' not in tables['facts']
+    assert 'Job_Requirements' in tables['facts'] and 'job_title' in tables['jobs']
+    assert str(tables['facts']['Match_Score'].dtype) == 'float32'
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        star.save_integrated_dataset(str(Path(tmpdir) / 'star'), format='star')
+        view = integrate.StarSchemaView(str(Path(tmpdir) / 'star'))
+        assert list(view.columns) == list(expected.columns) and len(view) == len(expected)
+        
+        restored = view.to_wide()
+        for column in expected.columns:
+            if column == 'Match_Score':
+                np.testing.assert_allclose(restored[column], expected[column], rtol=1e-6)
+            else:
+                assert restored[column].astype(object).equals(expected[column].astype(object)), column
+        
+        batches = pd.concat(view.iter_wide(batch_size=64, columns=['User_ID', 'job_title']), ignore_index=True)
+        assert batches['job_title'].astype(object).equals(expected['job_title'].astype(object))
+        
+        # 件数の集計はワイド形式に展開した場合と同じ
+        expected_summary = integrate._summarize_integrated(expected)
+        assert view.summary() == expected_summary
+        assert integrate.StarSchemaView(tables).summary() == expected_summary
+        
+        report = star.generate_mapping_report(str(Path(tmpdir) / 'report.json'))
+        assert report['linkedin_matched'] == int(expected['job_title'].notna().sum())
+    
+    wide_bytes = expected.memory_usage(deep=True).sum()
+    star_bytes = sum(tables[name].memory_usage(deep=True).sum() for name in ['facts', 'users', 'jobs'])
+    assert star_bytes < wide_bytes
+    print(f"   ✅ {len(expected)} rows 一致 (memory {wide_bytes / 1024:,.0f} KB → {star_bytes / 1024:,.0f} KB)")
+    
+    return True
+
+
+def test_match_store():
+    """
+    マッチスコアストアの1組・1ユーザー・複数組の検索が元の表と一致することを確認
+    """
+    print("\n" + "=" * 60)
+    print("🧪 マッチスコアストアのテスト")
+    print("=" * 60)
+    
+    from match_store import MatchStore, build_match_store
+    
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'User_ID': rng.integers(1, 300, size=5000),
+        'Job_ID': rng.integers(1, 2000, size=5000),
+        'Match_Score': rng.random(5000).astype(np.float32),
+        'Recommended': rng.integers(0, 2, size=5000),
+    })
+    expected = df.drop_duplicates(['User_ID', 'Job_ID']).set_index(['User_ID', 'Job_ID'])
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        # User_IDが連続する場合と、まばらな場合（User_IDの探索が必要）の両方を確認
+        for name, user_scale, score_dtype in [('dense', 1, 'float32'), ('sparse', 100000, 'float16')]:
+            data = df.assign(User_ID=df['User_ID'] * user_scale)
+            info = build_match_store(data, str(Path(tmpdir) / name), score_dtype=score_dtype)
+            store = MatchStore(str(Path(tmpdir) / name))
+            assert info['dense'] == (name == 'dense') and len(store) == len(expected)
+            tolerance = 1e-3 if score_dtype == 'float16' else 0
+            
+            queries = pd.concat([
+                data.sample(1000, random_state=0),
+                pd.DataFrame({'User_ID': [0, 7 * user_scale, 10 ** 9], 'Job_ID': [1, 5000, 1]}),
+            ], ignore_index=True)
+            result = store.lookup(queries['User_ID'], queries['Job_ID'])
+            keys = list(zip(queries['User_ID'] // user_scale, queries['Job_ID']))
+            present = np.array([key in expected.index for key in keys])
+            assert (result['found'] == present).all()
+            values = expected.loc[[key for key, hit in zip(keys, present) if hit]]
+            assert np.abs(result['scores'][present] - values['Match_Score'].to_numpy()).max() <= tolerance
+            assert (result['recommended'][present] == values['Recommended'].to_numpy()).all()
+            assert np.isnan(result['scores'][~present]).all()
+            
+            user_id = int(queries['User_ID'].iloc[0])
+            row = store.row(user_id)
+            user_rows = expected.loc[user_id // user_scale].sort_index()
+            assert (row['job_ids'] == user_rows.index.to_numpy()).all()
+            job_id = int(row['job_ids'][0])
+            assert abs(store.score(user_id, job_id) - user_rows['Match_Score'].iloc[0]) <= tolerance
+            assert store.score(user_id, 10 ** 6) is None and len(store.row(10 ** 9)['job_ids']) == 0
+    print(f"   ✅ {len(expected)} pairs 一致")
+    
+    return True
+
+
+def test_log_compaction_incremental():
+    """
+    ウォーターマーク以降のログだけを足し込んだ集計が、全件からの集計と一致することを確認
+    """
+    print("\n" + "=" * 60)
+    print("🧪 ログ集約の差分更新テスト")
+    print("=" * 60)
+    
+    compact = load_script_module('compact-logs.py', 'compact_logs')
+    from pipeline_metrics import PipelineMetrics
+    
+    rng = np.random.default_rng(0)
+    count = 3000
+    logs_df = pd.DataFrame({
+        'user_id': rng.integers(1, 40, size=count),
+        'job_id': rng.integers(1, 60, size=count),
+        'action': rng.choice(['like', 'dislike', 'skip'], size=count),
+        'timestamp': (
+            pd.Timestamp('2025-01-01') + pd.to_timedelta(rng.integers(0, 3 * 24 * 60, size=count), unit='min')
+        ).strftime('%Y-%m-%dT%H:%M:%S.%f'),
+        'swipe_duration_ms': rng.integers(500, 10000, size=count).astype(float),
+    })
+    logs_df.loc[::7, 'swipe_duration_ms'] = np.nan
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmp = Path(tmpdir)
+        (tmp / 'logs').mkdir()
+        
+        def append(segment: str, rows: pd.DataFrame):
+            path = tmp / 'logs' / segment
+            rows.to_csv(path, mode='a', header=not path.exists(), index=False)
+        
+        def run(output: str, full: bool = False) -> dict:
+            compactor = compact.LogCompactor(str(tmp / output), metrics=PipelineMetrics(verbose=False))
+            return compactor.run(str(tmp / 'logs'), full=full)
+        
+        # 既存のセグメントへの追記と新しいセグメントの追加を、3回に分けて処理
+        append('part-00000.csv', logs_df.iloc[:1000])
+        assert run('incremental')['mode'] == 'full'
+        append('part-00000.csv', logs_df.iloc[1000:1800])
+        append('part-00001.csv', logs_df.iloc[1800:2500])
+        assert run('incremental')['new_rows'] == 1500
+        append('part-00001.csv', logs_df.iloc[2500:])
+        manifest = run('incremental')
+        assert manifest['mode'] == 'incremental' and manifest['rows_processed'] == count
+        run('full', full=True)
+        
+        for name in ['latest.parquet', 'job_daily.parquet', 'job_hourly.parquet', 'user_daily.parquet', 'user_hourly.parquet']:
+            incremental = pd.read_parquet(tmp / 'incremental' / name)
+            full = pd.read_parquet(tmp / 'full' / name)
+            pd.testing.assert_frame_equal(incremental, full, check_dtype=False)
+        
+        # 最新のアクションは、時刻が最も新しいログ（同じ時刻なら後のログ）
+        latest = pd.read_parquet(tmp / 'full' / 'latest.parquet')
+        expected = logs_df.assign(timestamp=pd.to_datetime(logs_df['timestamp']))
+        expected = expected.sort_values('timestamp', kind='stable').drop_duplicates(['user_id', 'job_id'], keep='last')
+        expected = expected.sort_values(['user_id', 'job_id']).reset_index(drop=True)
+        assert (latest['action'] == expected['action']).all()
+        
+        daily = pd.read_parquet(tmp / 'full' / 'job_daily.parquet')
+        assert daily[['likes', 'dislikes', 'skips']].to_numpy().sum() == count
+        job_logs = logs_df[logs_df['job_id'] == daily['job_id'].iloc[0]]
+        job_logs = job_logs[pd.to_datetime(job_logs['timestamp']).dt.floor('D') == daily['period'].iloc[0]]
+        assert abs(daily['mean_swipe_duration_ms'].iloc[0] - job_logs['swipe_duration_ms'].mean()) < 1e-6
+    print(f"   ✅ {count} logs → {len(latest)} pairs 一致")
+    
+    return True
+
+
+def test_training_set_sampling():
+    """
+    学習データの負例が見た求人を含まず、エイリアス法のサンプリングが重みに比例することを確認
+    """
+    print("\n" + "=" * 60)
+    print("🧪 学習データの負例サンプリングテスト")
+    print("=" * 60)
+    
+    training = load_script_module('build-training-set.py', 'build_training_set')
+    from pipeline_metrics import PipelineMetrics
+    
+    # エイリアス表から引いた頻度は重みに比例する
+    rng = np.random.default_rng(0)
+    weights = rng.random(50) ** 3 + 0.01
+    probability, alias = training.build_alias_table(weights)
+    counts = np.bincount(training.alias_sample(rng, probability, alias, 400000), minlength=50)
+    assert np.abs(counts / counts.sum() - weights / weights.sum()).max() < 0.005
+    
+    num_jobs = 30
+    logs_df = pd.DataFrame({
+        'user_id': rng.integers(1, 200, size=2000),
+        'job_id': rng.integers(1, num_jobs + 1, size=2000),
+        'action': rng.choice(['like', 'dislike', 'skip'], size=2000),
+    })
+    # ユーザー999は全ての求人を見ているため、負例が引けずに除外される
+    logs_df = pd.concat([logs_df, pd.DataFrame({
+        'user_id': 999, 'job_id': np.arange(1, num_jobs + 1), 'action': 'like',
+    })], ignore_index=True)
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmp = Path(tmpdir)
+        logs_df.to_csv(tmp / 'logs.csv', index=False)
+        pd.DataFrame({'Job_ID': np.arange(1, num_jobs + 1)}).to_csv(tmp / 'jobs.csv', index=False)
+        
+        manifests = []
+        for output in ['first', 'second']:
+            builder = training.TrainingSetBuilder(num_negatives=5, seed=3, metrics=PipelineMetrics(verbose=False))
+            manifests.append(builder.build(str(tmp / 'logs.csv'), str(tmp / 'jobs.csv'), str(tmp / output), shard_size=100))
+        rows = np.concatenate(list(training.iter_training_shards(str(tmp / 'first'))))
+        again = np.concatenate(list(training.iter_training_shards(str(tmp / 'second'))))
+        assert (rows == again).all()
+    
+    latest = logs_df.drop_duplicates(['user_id', 'job_id'], keep='last')
+    seen = set(zip(latest['user_id'], latest['job_id']))
+    liked = set(zip(latest.loc[latest['action'] == 'like', 'user_id'], latest.loc[latest['action'] == 'like', 'job_id']))
+    manifest = manifests[0]
+    assert manifest['dropped_examples'] == num_jobs and 999 not in rows['user_id']
+    assert manifest['num_examples'] == len(rows) == len(liked) - num_jobs
+    assert all(shard['rows'] == 100 for shard in manifest['shards'][:-1])
+    assert set(zip(rows['user_id'].tolist(), rows['positive'].tolist())) <= liked
+    for user_id, negatives in zip(rows['user_id'].tolist(), rows['negatives'].tolist()):
+        assert not any((user_id, job_id) in seen for job_id in negatives)
+    print(f"   ✅ {len(rows)} examples × {rows['negatives'].shape[1]} negatives 一致")
+    
+    return True
+
+
+def test_replay_interactions():
+    """
+    ログの再生がイベントの順に送信され、Content-Length・chunked・接続を閉じる応答のどれでも
+    keep-alive接続の同期がずれずに件数とステータスとパーセンタイルを集計できることを確認
+    """
+    print("\n" + "=" * 60)
+    print("🧪 インタラクション再生のテスト")
+    print("=" * 60)
+    
+    import asyncio
+    
+    replay = load_script_module('replay-interactions.py', 'replay_interactions')
+    rng = np.random.default_rng(0)
+    num_logs = 120
+    logs_df = pd.DataFrame({
+        'user_id': rng.integers(1, 30, size=num_logs),
+        'job_id': np.arange(1, num_logs + 1),
+        'action': rng.choice(['like', 'dislike', 'skip'], size=num_logs),
+        'timestamp': pd.date_range('2025-01-01', periods=num_logs, freq='min').astype(str),
+    })
+    # APIが400を返すアクションを1件含める
+    logs_df.loc[7, 'action'] = 'view'
+    events = replay.build_event_stream(logs_df, duration_seconds=2.0, bursts=[(0.5, 0.5, 4.0)], seed=0)
+    assert np.all(np.diff(events['offset_seconds'].to_numpy()) >= 0)
+    assert events['job_id'].tolist() == logs_df['job_id'].tolist()
+    
+    async def close_delimited(reader, writer):
+        # Content-Lengthを付けず、本文の終わりを接続の切断で示すサーバー
+        request = await replay._read_http_message(reader)
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n\r\n" + request[2])
+        await writer.drain()
+        writer.close()
+    
+    async def run(concurrency, chunked=False):
+        server = replay.InteractionStandInServer(chunked=chunked)
+        url = await server.start()
+        try:
+            result = await replay.TrafficReplayer(url, concurrency=concurrency).replay(events, rate=2000)
+        finally:
+            await server.stop()
+        return result, server.interactions
+    
+    async def run_close_delimited():
+        server = await asyncio.start_server(close_delimited, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            return await replay.TrafficReplayer(f'http://127.0.0.1:{port}/api/interactions', concurrency=3).replay(
+                events, speed=20.0
+            )
+        finally:
+            server.close()
+            await server.wait_closed()
+    
+    expected = [
+        {'user_id': int(user_id), 'job_id': int(job_id), 'action': action}
+        for user_id, job_id, action in zip(events['user_id'], events['job_id'], events['action'])
+        if action != 'view'
+    ]
+    for concurrency, chunked in [(1, False), (1, True), (4, True)]:
+        result, stored = asyncio.run(run(concurrency, chunked))
+        assert result['events'] == num_logs and result['succeeded'] == num_logs - 1 and result['failed'] == 1
+        # 1接続なら送信順にそのまま保存される
+        assert stored == expected if concurrency == 1 else sorted(stored, key=str) == sorted(expected, key=str)
+        latency = result['latency_ms']
+        assert 0 <= latency['p50'] <= latency['p95'] <= latency['p99'] <= latency['max']
+    
+    result = asyncio.run(run_close_delimited())
+    assert result['succeeded'] == num_logs and result['failed'] == 0
+    assert not np.isnan(result['latency_ms']['p99'])
+    print(f"   ✅ {num_logs} events, p50/p99 {latency['p50']:.2f}/{latency['p99']:.2f} ms")
+    
+    return True
+
+
+def test_cf_model_recommendations():
+    """
+    ALSの推薦が、ログに埋め込んだユーザーのグループに沿い、操作済みの求人を含まないことを確認
+    """
+    print("\n" + "=" * 60)
+    print("🧪 協調フィルタリングモデルのテスト")
+    print("=" * 60)
+    
+    cf = load_script_module('build-cf-model.py', 'build_cf_model')
+    rng = np.random.default_rng(0)
+    
+    # 2つのグループのユーザーが、それぞれのグループの求人20件のうち8件にlikeする
+    # （1件は別のグループの求人へのdislike、2件はskipのみ。skipのみの組は明示的な0として格納される）
+    rows = []
+    for user_id in range(1, 61):
+        group = user_id % 2
+        group_jobs = np.arange(100, 120) + 100 * group
+        chosen = rng.choice(group_jobs, size=10, replace=False)
+        for job_id in chosen[:8]:
+            rows.append((user_id, int(job_id), 'like'))
+        for job_id in chosen[8:]:
+            rows.append((user_id, int(job_id), 'skip'))
+        rows.append((user_id, int(rng.choice(np.arange(100, 120) + 100 * (1 - group))), 'dislike'))
+    logs_df = pd.DataFrame(rows, columns=['user_id', 'job_id', 'action'])
+    
+    builder = cf.CollaborativeFilteringModelBuilder(logs_df)
+    builder.build_interaction_matrix(alpha=20.0)
+    assert builder.confidence.nnz == len(logs_df) > builder.confidence.count_nonzero()
+    builder.train(factors=8, regularization=0.1, iterations=10, seed=0)
+    recommendations = builder.recommend_all(top_k=5)
+    
+    seen = logs_df.groupby('user_id')['job_id'].apply(set)
+    in_group = 0
+    for position, user_id in enumerate(builder.user_ids.tolist()):
+        recommended = recommendations['job_ids'][position].tolist()
+        assert -1 not in recommended and not seen[user_id] & set(recommended)
+        in_group += sum((job_id // 100 - 1) == user_id % 2 for job_id in recommended)
+    precision = in_group / recommendations['job_ids'].size
+    assert precision >= 0.9, precision
+    scores = recommendations['scores']
+    assert np.all(np.diff(scores, axis=1) <= 0)
+    
+    # 保存した推薦リストはメモリマップで同じ内容を引ける
+    with tempfile.TemporaryDirectory() as tmpdir:
+        builder.save(tmpdir, recommendations, {'factors': 8})
+        model = cf.load_recommendations(tmpdir)
+        user_id = int(builder.user_ids[3])
+        assert [r['job_id'] for r in cf.recommend_for_user(model, user_id)] == recommendations['job_ids'][3].tolist()
+        assert cf.recommend_for_user(model, 10 ** 6) == []
+    print(f"   ✅ {len(builder.user_ids)} users, in-group precision@5 {precision:.2f}")
+    
+    return True
+
+
+def test_skill_index_recall():
+    """
+    IVFインデックスの検索結果が総当たりのコサイン類似度検索とほぼ一致することを確認
+    """
+    print("\n" + "=" * 60)
+    print("🧪 スキル類似検索インデックスの再現率テスト")
+    print("=" * 60)
+    
+    skill_index = load_script_module('build-skill-index.py', 'build_skill_index')
+    rng = np.random.default_rng(0)
+    skills = [f'Skill {i}' for i in range(60)]
+    popularity = 1 / np.arange(1, len(skills) + 1)
+    popularity /= popularity.sum()
+    
+    def random_requirements():
+        size = rng.integers(2, 7)
+        return ', '.join(rng.choice(skills, size=size, replace=False, p=popularity))
+    
+    job_df = pd.DataFrame({
+        'Job_ID': np.arange(5000),
+        'Job_Requirements': [random_requirements() for _ in range(5000)],
+    })
+    builder = skill_index.SkillIndexBuilder(job_df)
+    builder.build_ivf(num_lists=50)
+    queries = [random_requirements() for _ in range(200)]
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        builder.save(tmpdir)
+        index = skill_index.SkillIndex.load(tmpdir)
+        
+        # 全クラスタを走査すれば総当たりと一致する
+        assert skill_index.recall_at_k(index, queries, top_k=10, nprobe=50) == 1.0
+        recall = skill_index.recall_at_k(index, queries, top_k=10, nprobe=8)
+        assert recall >= 0.9, f"Recall@10 が低すぎます: {recall:.3f}"
+        
+        # 語彙にないスキルだけのクエリは空の結果になる
+        assert index.query('Unknown Skill') == []
+        
+        # ベクトルは求人のスキルの数だけの非ゼロ要素を持つCSR形式で保存される
+        num_skills = job_df['Job_Requirements'].str.count(',').sum() + len(job_df)
+        assert len(index.vector_data) == index.vector_indptr[-1] == num_skills
+        query = index.encode(queries[0])
+        expected = np.sort(builder.vectors.toarray() @ query)[::-1][:10]
+        exact = [result['similarity'] for result in index.query_exact(queries[0], top_k=10)]
+        np.testing.assert_allclose(exact, expected, rtol=1e-5)
+    print(f"   ✅ Recall@10 (nprobe=8): {recall:.3f}")
+    
+    return True
+
 
 def test_integration_feasibility():
     """
@@ -29,9 +1317,9 @@ def test_integration_feasibility():
         print(f"   - ユニークJob_ID数: {current_df['Job_ID'].nunique()}")
         
         # スキルの種類を確認
-        all_skills = set()
-        for skills in current_df['Job_Requirements'].dropna():
-            all_skills.update(skills.split(', '))
+        vocabulary = SkillVocabulary()
+        vocabulary.encode_many(current_df['Job_Requirements'])
+        all_skills = set(vocabulary.skills)
         
         print(f"\n📊 スキル統計:")
         print(f"   - ユニークスキル数: {len(all_skills)}")
@@ -42,7 +1330,7 @@ def test_integration_feasibility():
         print(current_df.head(3).to_string())
         
         return True
-        
+    
     except FileNotFoundError:
         print("❌ Job Datsset.csvが見つかりません")
         return False
@@ -127,11 +1415,13 @@ def simulate_integration():
     
     # 統合テスト2: スキルマッチング
     print("\n🔗 統合テスト2: スキルマッチング")
+    vocabulary = SkillVocabulary()
+    
     def skill_similarity(req1, req2):
         if pd.isna(req1) or pd.isna(req2):
             return 0
-        set1 = set(str(req1).split(', '))
-        set2 = set(str(req2).split(', '))
+        set1 = set(vocabulary.encode(req1).tolist())
+        set2 = set(vocabulary.encode(req2).tolist())
         if len(set1 | set2) == 0:
             return 0
         return len(set1 & set2) / len(set1 | set2)
@@ -179,6 +1469,66 @@ def simulate_integration():
 
 
 if __name__ == '__main__':
+    # スキル語彙
+    test_skill_vocabulary()
+    
+    # スキルマッチング方式の比較
+    test_skill_matching_engines()
+    
+    # スキル集合のシグネチャ重複除去
+    test_signature_dedupe_memo()
+    
+    # 給与データの職種名マッチング
+    test_salary_title_matching()
+    
+    # 分割読み込み・ストリーミング統合
+    test_chunked_streaming_integration()
+    
+    # パーティション分割Parquetの読み戻し
+    test_partitioned_parquet_roundtrip()
+    
+    # 差分統合
+    test_incremental_integration()
+    
+    # ステージ計測
+    test_pipeline_metrics()
+    
+    # ベンチマーク結果の比較
+    test_compare_results()
+    
+    # ログ生成の再現性
+    test_log_generation_reproducible()
+    
+    # バッチ実行のチェックポイント再開
+    test_batch_checkpoint_resume()
+    
+    # Firestoreへのエクスポート
+    test_firestore_export()
+    
+    # ユーザーフィードの差分更新
+    test_user_feeds_incremental()
+    
+    # スター形式の出力
+    test_star_schema_output()
+    
+    # マッチスコアストア
+    test_match_store()
+    
+    # ログ集約の差分更新
+    test_log_compaction_incremental()
+    
+    # 学習データの負例サンプリング
+    test_training_set_sampling()
+    
+    # インタラクション再生
+    test_replay_interactions()
+    
+    # 協調フィルタリングモデル
+    test_cf_model_recommendations()
+    
+    # スキル類似検索インデックスの再現率
+    test_skill_index_recall()
+    
     # 現在のデータセットをテスト
     success = test_integration_feasibility()
     